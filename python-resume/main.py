@@ -1,20 +1,32 @@
 #!/usr/bin/env python3
 
 import argparse
+import json
 import logging
 from pathlib import Path
-from typing import Dict, Any, Optional
 import sys
 
 # Update system path to include the new 'src' directory
 sys.path.insert(0, str(Path(__file__).resolve().parent / 'src'))
 
 # Import our custom modules from the new location
-from resume_analyser.parsers import parse_resume_file_enhanced, ParseResult
-from resume_analyser.text_processor import clean_text, analyse_text_complexity
-from resume_analyser.extractors import extract_all_information
-from resume_analyser.scorers import calculate_all_scores
-from resume_analyser.reporter import generate_final_report
+from resume_analyser.parsers import ParseCache, DOCX_BACKENDS, DEFAULT_DOCX_BACKEND
+from resume_analyser.analyser import ResumeAnalyser
+from resume_analyser.reporter import REPORT_FORMATS
+from resume_analyser.job_data import JobRegistry
+from resume_analyser.stage_cache import StageCache
+from resume_analyser.pipeline import OUTPUTS
+from resume_analyser.results_store import ResultsStore
+from resume_analyser.fingerprint import DuplicateIndex, DEFAULT_THRESHOLD
+from resume_analyser.line_cache import LineCache
+from resume_analyser.taxonomy import set_taxonomy
+from resume_analyser.watch import MANIFEST_NAME, DEBOUNCE_SECONDS
+from resume_analyser.metrics import StageMetrics
+from resume_analyser.cli_batch import run_batch
+from resume_analyser.cli_watch import run_watch
+from resume_analyser.cli_triage import run_triage
+from resume_analyser.cli_query import run_query, parse_query_arguments
+from resume_analyser.cli_taxonomy import run_build_taxonomy, parse_taxonomy_arguments
 
 # Configure logging
 logging.basicConfig(
@@ -23,137 +35,6 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-class ResumeAnalyser:
-    """Main class for resume analysis workflow."""
-    
-    def __init__(self, resume_path: str):
-        """Initialize the analyser with the resume file path."""
-        self.resume_path = Path(resume_path)
-        self.parse_result: Optional[ParseResult] = None
-        self.raw_text: Optional[str] = None
-        self.cleaned_text: Optional[str] = None
-        self.parsing_metadata: Dict[str, Any] = {}
-        self.extracted_info: Dict[str, Any] = {}
-        self.scores: Dict[str, Any] = {}
-        
-    def validate_input(self) -> bool:
-        """Validate the input resume file."""
-        if not self.resume_path.exists():
-            logger.error(f"Resume file not found: {self.resume_path}")
-            return False
-        if self.resume_path.suffix.lower() not in ['.pdf', '.docx', '.txt']:
-            logger.error("Unsupported file format. Please provide a PDF, DOCX, or TXT file.")
-            return False
-        return True
-    
-    def parse_resume(self) -> bool:
-        """Parse the resume and extract raw text content with metadata."""
-        logger.info(f"Parsing resume file: {self.resume_path}")
-        
-        self.parse_result = parse_resume_file_enhanced(self.resume_path)
-        
-        if self.parse_result is None:
-            logger.error("Failed to extract text from resume file")
-            return False
-        
-        self.raw_text = self.parse_result.text
-        self.parsing_metadata = self.parse_result.metadata
-        
-        if len(self.raw_text.strip()) < 10:
-            logger.error("Very little text extracted - file may be corrupted or unsupported")
-            return False
-        
-        # Log parsing metadata
-        if self.parsing_metadata.get('has_images'):
-            logger.info(f"⚠️ Detected {self.parsing_metadata['image_count']} image(s) - ATS compatibility concern")
-        if self.parsing_metadata.get('has_columns'):
-            logger.info("⚠️ Detected multi-column layout - ATS compatibility concern")
-        if self.parsing_metadata.get('parsing_issues'):
-            for issue in self.parsing_metadata['parsing_issues']:
-                logger.warning(f"Parsing issue: {issue}")
-        
-        logger.info(f"Successfully extracted {len(self.raw_text)} characters")
-        return True
-    
-    def process_text(self) -> bool:
-        """Clean and process the extracted text."""
-        if not self.raw_text:
-            logger.error("No raw text available for processing")
-            return False
-        
-        logger.info("Cleaning and processing text...")
-        self.cleaned_text = clean_text(self.raw_text)
-        
-        if len(self.cleaned_text.strip()) < 10:
-            logger.error("Text processing resulted in very little content")
-            return False
-        
-        logger.info(f"Text processed: {len(self.cleaned_text)} characters after cleaning")
-        return True
-    
-    def extract_information(self) -> bool:
-        """Extract structured information from the resume."""
-        if not self.cleaned_text:
-            logger.error("No cleaned text available for information extraction")
-            return False
-        
-        logger.info("Extracting structured information...")
-        self.extracted_info = extract_all_information(self.cleaned_text)
-        
-        # Log summary of extracted information
-        summary = self.extracted_info.get('summary', {})
-        logger.info(f"Extraction complete: {summary.get('total_skills', 0)} skills, "
-                   f"{summary.get('total_experience_entries', 0)} experience entries, "
-                   f"{summary.get('total_education_entries', 0)} education entries")
-        
-        return True
-    
-    def calculate_scores(self) -> bool:
-        """Calculate all scoring metrics."""
-        if not self.cleaned_text or not self.extracted_info:
-            logger.error("Missing required data for scoring")
-            return False
-        
-        logger.info("Calculating scores...")
-        self.scores = calculate_all_scores(self.cleaned_text, self.extracted_info, self.parsing_metadata)
-        
-        # Log score summary
-        logger.info(f"Scoring complete: Readability={self.scores['readability']['score']}/10, "
-                   f"Formatting={self.scores['formatting']['score']:.1f}/10, "
-                   f"Job Match={self.scores['job_match']['percentage']:.1f}%")
-        
-        return True
-    
-    def generate_report(self) -> str:
-        """Generate the final feedback report."""
-        if not self.extracted_info or not self.scores:
-            logger.error("Missing required data for report generation")
-            return "Error: Cannot generate report due to missing data."
-        
-        logger.info("Generating final report...")
-        report = generate_final_report(self.extracted_info, self.scores)
-        return report
-    
-    def analyze(self) -> str:
-        """Run the complete analysis workflow."""
-        workflow_steps = [
-            ("Validating input", self.validate_input),
-            ("Parsing resume", self.parse_resume),
-            ("Processing text", self.process_text),
-            ("Extracting information", self.extract_information),
-            ("Calculating scores", self.calculate_scores)
-        ]
-        
-        for step_name, step_func in workflow_steps:
-            logger.info(f"Step: {step_name}...")
-            if not step_func():
-                error_msg = f"Analysis failed at step: {step_name}"
-                logger.error(error_msg)
-                return f"❌ {error_msg}"
-        
-        # Generate and return the final report
-        return self.generate_report()
-
 def parse_arguments():
     """Parse command line arguments."""
     parser = argparse.ArgumentParser(
@@ -162,22 +43,200 @@ def parse_arguments():
     )
     parser.add_argument(
         "resume",
-        help="Path to the resume file (PDF, DOCX, or TXT)"
+        nargs="?",
+        help="Path to the resume file (PDF, DOCX, or TXT), or a directory of resumes for batch mode"
+    )
+    parser.add_argument(
+        "--watch",
+        metavar="DIR",
+        help="Keep watching this folder and analyse resumes as they are added or changed "
+             "(reports go to --output-dir, or are appended to --output)"
+    )
+    parser.add_argument(
+        "--manifest",
+        metavar="FILE",
+        help=f"Watch mode: file recording which resume contents were analysed (default: {MANIFEST_NAME} in the folder)"
+    )
+    parser.add_argument(
+        "--debounce",
+        type=float,
+        default=DEBOUNCE_SECONDS,
+        metavar="SECONDS",
+        help=f"Watch mode: analyse a file once it has been unchanged this long (default: {DEBOUNCE_SECONDS})"
     )
     parser.add_argument(
         "--output", "-o",
         default="report.txt",
-        help="Path to save the text report file"
+        help="Path to save the text report file (combined report in batch mode)"
+    )
+    parser.add_argument(
+        "--output-dir",
+        help="Batch mode: write one report per input file into this directory instead of a combined report"
+    )
+    parser.add_argument(
+        "--jobs", "-j",
+        type=int,
+        help="Batch mode: number of worker processes (default: CPU count)"
+    )
+    parser.add_argument(
+        "--cache-dir",
+        help="Directory for caching parsed resumes between runs"
+    )
+    parser.add_argument(
+        "--cache-size",
+        type=int,
+        default=256,
+        help="Maximum size of the parse and stage caches in megabytes (default: 256)"
+    )
+    parser.add_argument(
+        "--stage-cache",
+        metavar="DIR",
+        help="Directory for memoizing every analysis stage; re-runs only recompute stages whose inputs or code changed"
+    )
+    parser.add_argument(
+        "--docx-backend",
+        choices=sorted(DOCX_BACKENDS),
+        default=DEFAULT_DOCX_BACKEND,
+        help="DOCX parser: 'python-docx' object model or 'stream' (faster on table-heavy files)"
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Clean and analyse PDF/TXT (and, with --docx-backend stream, DOCX) text line by line while it is decoded "
+             "instead of parsing the whole file first "
+             "(cannot be combined with --cache-dir or --stage-cache)"
+    )
+    parser.add_argument(
+        "--format",
+        choices=REPORT_FORMATS,
+        default="text",
+        help="Report format: the human-readable text report, or the structured JSON record "
+             "(one record per line, JSON Lines, in the combined batch output)"
+    )
+    parser.add_argument(
+        "--store",
+        metavar="DB",
+        help="Also save the extracted information and scores to this SQLite results database "
+             "(search it with: python main.py query DB ...)"
+    )
+    parser.add_argument(
+        "--taxonomy",
+        metavar="FILE",
+        help="Technical skill taxonomy replacing the built-in civil engineering one: an artifact from "
+             "`python main.py taxonomy`, or a JSON/CSV/TSV taxonomy compiled on first use"
+    )
+    parser.add_argument(
+        "--soft-taxonomy",
+        metavar="FILE",
+        help="Soft skill taxonomy replacing the built-in one (same formats as --taxonomy)"
+    )
+    parser.add_argument(
+        "--line-cache",
+        metavar="FILE",
+        help="Keep per-line analysis results in this file so re-analysing an edited version of a resume "
+             "only analyses the changed lines (single-resume runs)"
+    )
+    parser.add_argument(
+        "--dedupe",
+        metavar="DB",
+        help="Fingerprint each resume and flag near-duplicates of resumes analysed before "
+             "(fingerprints are kept in this SQLite database)"
+    )
+    parser.add_argument(
+        "--dedupe-threshold",
+        type=float,
+        default=DEFAULT_THRESHOLD,
+        help=f"Estimated text similarity (0-1) from which resumes count as near-duplicates (default: {DEFAULT_THRESHOLD})"
+    )
+    parser.add_argument(
+        "--reuse-duplicates",
+        action="store_true",
+        help="Reuse the extraction and scores of a near-duplicate instead of analysing the resume again (needs --dedupe)"
+    )
+    parser.add_argument(
+        "--triage",
+        action="store_true",
+        help="Only triage the file(s): page count, images, columns and estimated text density, read from the PDF "
+             "structure without text extraction; results are saved as JSON"
+    )
+    parser.add_argument(
+        "--outputs",
+        type=lambda value: [name.strip() for name in value.split(",") if name.strip()],
+        metavar="NAME[,NAME...]",
+        help=f"Compute only these outputs and write them as JSON instead of the report; available: {', '.join(OUTPUTS)}"
+    )
+    parser.add_argument(
+        "--pipeline-workers",
+        type=int,
+        default=1,
+        help="Threads evaluating independent outputs concurrently with --outputs (default: 1)"
+    )
+    parser.add_argument(
+        "--job",
+        help="Job to score against: a job ID from --jobs-dir or a path to a JSON/TOML job file (default: built-in job)"
+    )
+    parser.add_argument(
+        "--jobs-dir",
+        help="Directory of JSON/TOML job definitions; the file name (without extension) is the job ID"
+    )
+    parser.add_argument(
+        "--job-map",
+        help="Batch mode: JSON file mapping resume file names to job IDs, overriding --job per file"
+    )
+    parser.add_argument(
+        "--recommend-jobs",
+        type=int,
+        default=0,
+        metavar="K",
+        help="List the K best-matching jobs from --jobs-dir in the report"
+    )
+    parser.add_argument(
+        "--metrics",
+        help="Write per-stage timing histograms to this file: JSON for a .json path, Prometheus text otherwise"
     )
     parser.add_argument(
         "--verbose", "-v",
         action="store_true",
         help="Enable verbose output for debugging"
     )
-    return parser.parse_args()
+    args = parser.parse_args()
+    if (args.resume is None) == (args.watch is None):
+        parser.error("give either a resume path or --watch DIR")
+    if args.watch and not Path(args.watch).is_dir():
+        parser.error(f"--watch: {args.watch} is not a directory")
+    if args.watch and (args.triage or args.line_cache):
+        parser.error("--watch cannot be combined with --triage or --line-cache")
+    if args.watch and args.output_dir and Path(args.output_dir).resolve() == Path(args.watch).resolve():
+        parser.error("--output-dir must not be the watched folder")
+    if args.debounce < 0:
+        parser.error("--debounce must not be negative")
+    if args.stream and (args.cache_dir or args.stage_cache):
+        parser.error("--stream cannot be combined with --cache-dir or --stage-cache, which store the whole parsed text")
+    if args.outputs is not None:
+        unknown = [name for name in args.outputs if name not in OUTPUTS]
+        if unknown or not args.outputs:
+            parser.error(f"--outputs: unknown output(s) {', '.join(unknown) or '(none given)'}; available: {', '.join(OUTPUTS)}")
+    if args.format != 'text' and (args.outputs is not None or args.triage):
+        parser.error("--format applies to the full report; --outputs and --triage always write JSON")
+    if args.line_cache and args.resume and Path(args.resume).is_dir():
+        parser.error("--line-cache applies to single-resume runs")
+    if args.reuse_duplicates and not args.dedupe:
+        parser.error("--reuse-duplicates needs --dedupe")
+    if not 0 < args.dedupe_threshold <= 1:
+        parser.error("--dedupe-threshold must be greater than 0 and at most 1")
+    if args.dedupe and (args.outputs is not None or args.triage):
+        parser.error("--dedupe needs the full analysis and cannot be combined with --outputs or --triage")
+    if args.store and (args.outputs is not None or args.triage):
+        parser.error("--store needs the full analysis and cannot be combined with --outputs or --triage")
+    return args
 
 def main():
     """Main entry point for the application."""
+    if sys.argv[1:2] == ['query']:
+        return run_query(parse_query_arguments(sys.argv[2:]))
+    if sys.argv[1:2] == ['taxonomy']:
+        return run_build_taxonomy(parse_taxonomy_arguments(sys.argv[2:]))
+    
     print("🔍 Resume Analyser Tool")
     print("=" * 30)
     
@@ -189,15 +248,78 @@ def main():
         logging.getLogger('resume_analyser').setLevel(logging.DEBUG)
     
     try:
-        analyser = ResumeAnalyser(args.resume)
-        report = analyser.analyze()
+        for kind, path in (('technical', args.taxonomy), ('soft', args.soft_taxonomy)):
+            if path:
+                set_taxonomy(kind, path)
+    except (OSError, ValueError) as e:
+        logger.error(f"Could not load the skill taxonomy: {str(e)}")
+        return 1
+    
+    if args.watch:
+        return run_watch(args)
+    
+    if args.triage:
+        return run_triage(args)
+    
+    if Path(args.resume).is_dir():
+        try:
+            return run_batch(args)
+        except KeyboardInterrupt:
+            print("\n\n⚠️  Analysis interrupted by user")
+            return 130
+    
+    try:
+        parse_cache = ParseCache(args.cache_dir, args.cache_size * 1024 * 1024) if args.cache_dir else None
+        registry = JobRegistry(args.jobs_dir)
+        job = registry.get(args.job)
+        job_engine = None
+        if args.recommend_jobs > 0:
+            from resume_analyser.job_matching import JobMatchEngine
+            job_engine = JobMatchEngine(registry.load_all())
+        stage_cache = StageCache(args.stage_cache, args.cache_size * 1024 * 1024) if args.stage_cache else None
+        duplicate_index = DuplicateIndex(args.dedupe, args.dedupe_threshold) if args.dedupe else None
+        line_cache = LineCache.load(args.line_cache) if args.line_cache else None
+        analyser = ResumeAnalyser(args.resume, parse_cache=parse_cache, docx_backend=args.docx_backend,
+                                  job=job, job_engine=job_engine, recommend_jobs=args.recommend_jobs,
+                                  stage_cache=stage_cache, streaming=args.stream,
+                                  pipeline_workers=args.pipeline_workers,
+                                  duplicate_index=duplicate_index, reuse_duplicates=args.reuse_duplicates,
+                                  line_cache=line_cache)
+        report = analyser.analyze(args.outputs, report_format=args.format)
+        if args.outputs is not None:
+            report = json.dumps(report, indent=2, ensure_ascii=False) if analyser.error is None else f"❌ {analyser.error}"
+        elif args.format == 'json':
+            report = json.dumps(report, indent=2, ensure_ascii=False)
+        
+        if stage_cache:
+            logger.info(f"Reused stages: {', '.join(analyser.reused_stages) or 'none'}")
+        
+        if args.store and analyser.error is None:
+            with ResultsStore(args.store) as store:
+                store.add(args.resume, analyser.extracted_info, analyser.scores)
+            logger.info(f"Results stored in {args.store}")
+        
+        if line_cache:
+            line_cache.save(args.line_cache)
+            stats = line_cache.stats()
+            logger.info(f"Line cache: {stats['hits']} hit(s), {stats['misses']} miss(es), {stats['lines']} lines")
+        
+        if parse_cache:
+            stats = parse_cache.stats()
+            logger.info(f"Parse cache: {stats['hits']} hit(s), {stats['misses']} miss(es), {stats['entries']} entries")
         
         print("\n" + report + "\n")
 
         # Save the text report to a file
         with open(args.output, "w", encoding="utf-8") as f:
             f.write(report)
-        logger.info(f"Text report saved to {args.output}")
+        logger.info(f"{'JSON' if args.format == 'json' or args.outputs is not None else 'Text'} report saved to {args.output}")
+        
+        if args.metrics:
+            metrics = StageMetrics()
+            metrics.observe_file(analyser.timings, ok=analyser.error is None)
+            metrics.write(args.metrics)
+            logger.info(f"Metrics saved to {args.metrics}")
         
     except KeyboardInterrupt:
         print("\n\n⚠️  Analysis interrupted by user")
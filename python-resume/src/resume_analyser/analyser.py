@@ -0,0 +1,450 @@
+"""The resume analysis workflow: parse a resume, extract its information, score it and report."""
+
+import time
+import logging
+from pathlib import Path
+from typing import Dict, Any, Optional, List, Iterable, Union
+
+from .parsers import (
+    parse_resume_file_enhanced, ParseResult, ParseCache, DEFAULT_DOCX_BACKEND, ResumeSource, detect_file_type,
+    make_parse_key, stream_resume_file, resolve_source
+)
+from .text_processor import create_document, iter_clean_lines, TEXT_PROCESSOR_VERSION
+from .document import ResumeDocument, StreamedDocument
+from .text_statistics import TextStatisticsBuilder
+from .extractors import (
+    extract_all_information, extract_contact_info, with_contact_info, LineExtractor, ContactExtractor, EXTRACTOR_VERSION
+)
+from .scorers import calculate_all_scores, SCORER_VERSION
+from .reporter import build_report_record, build_error_record, render_text_report
+from .job_data import PreparedJob, get_default_job
+from .stage_cache import StageCache
+from .pipeline import AnalysisPipeline, plan
+from .fingerprint import SignatureBuilder, document_signature
+from .line_cache import LineCache
+from .taxonomy import taxonomy_key
+from .metrics import timed
+
+logger = logging.getLogger(__name__)
+
+class ResumeAnalyser:
+    """Main class for resume analysis workflow."""
+    
+    def __init__(self, resume_path: str, parse_cache: Optional[ParseCache] = None,
+                 docx_backend: str = DEFAULT_DOCX_BACKEND, content: Optional[ResumeSource] = None,
+                 job: Optional[PreparedJob] = None, job_engine=None, recommend_jobs: int = 0,
+                 stage_cache: Optional[StageCache] = None, streaming: bool = False, pipeline_workers: int = 1,
+                 duplicate_index=None, reuse_duplicates: bool = False, line_cache: Optional[LineCache] = None):
+        """
+        Initialize the analyser with the resume file path.
+        When `content` is given (e.g. an upload buffer or file object) it is analysed directly and the path is only a label.
+        The resume is scored against `job` (the built-in job if None); with a `job_engine`, the report
+        also lists the `recommend_jobs` best-matching jobs of the engine.
+        With a `stage_cache`, stages whose inputs and code version are unchanged reuse their stored output.
+        With `streaming`, the text is cleaned and analysed line by line while the file is decoded
+        (line-oriented extractors, contact details, text statistics and fingerprint), and neither
+        the raw nor the cleaned text is held in full.
+        `pipeline_workers` threads evaluate independent outputs concurrently when `analyze` is given outputs.
+        With a `duplicate_index` (fingerprint.DuplicateIndex), the cleaned text is fingerprinted and
+        near-duplicates of earlier resumes are flagged; with `reuse_duplicates`, their extraction (and
+        scores, if scored against the same job) are reused instead of being computed again.
+        With a `line_cache`, the line-oriented analyses only run on lines not seen before, e.g. the
+        edited lines of a new version of the same resume.
+        """
+        self.resume_path = Path(resume_path)
+        self.content = content
+        self.parse_cache = parse_cache
+        self.docx_backend = docx_backend
+        self.job = job
+        self.job_engine = job_engine
+        self.recommend_jobs = recommend_jobs
+        self.top_jobs: List[Dict[str, Any]] = []
+        self.stage_cache = stage_cache
+        self.streaming = streaming
+        # Results of the line-oriented extractors, when computed while streaming
+        self.line_results: Optional[Dict[str, Any]] = None
+        self.pipeline = AnalysisPipeline(max_workers=pipeline_workers)
+        self.duplicate_index = duplicate_index
+        self.reuse_duplicates = reuse_duplicates
+        self.line_cache = line_cache
+        self.signature = None
+        # Earlier resume this one nearly duplicates: its path, the similarity and the stages reused
+        self.duplicate_of: Optional[Dict[str, Any]] = None
+        self.duplicate_results: Optional[Dict[str, Any]] = None
+        self.requested_outputs: List[str] = []
+        self.outputs: Dict[str, Any] = {}
+        # Stage -> key of its output in the stage cache, and the stages whose output was reused
+        self.stage_keys: Dict[str, str] = {}
+        self.reused_stages: List[str] = []
+        self.parse_result: Optional[ParseResult] = None
+        self.raw_text: Optional[str] = None
+        self.cleaned_text: Optional[str] = None
+        self.document: Optional[ResumeDocument] = None
+        self.parsing_metadata: Dict[str, Any] = {}
+        self.extracted_info: Dict[str, Any] = {}
+        self.scores: Dict[str, Any] = {}
+        # Structured report of the last full analysis (see reporter.build_report_record)
+        self.record: Optional[Dict[str, Any]] = None
+        self.error: Optional[str] = None
+        # Nanoseconds per stage ('parse', 'extract.contact', ...) for the last analyze() run
+        self.timings: Dict[str, int] = {}
+        
+    def validate_input(self) -> bool:
+        """Validate the input resume file."""
+        if self.content is not None:
+            # Resolved the way the parsers do; a file object is read once, so keep the buffer it gave
+            resolved = resolve_source(self.content)
+            if resolved is None:
+                return False
+            self.content, content_type = resolved
+        elif not self.resume_path.exists():
+            logger.error(f"Resume file not found: {self.resume_path}")
+            return False
+        else:
+            content_type = detect_file_type(self.resume_path)
+        if content_type is None:
+            logger.error("Unsupported file format. Please provide a PDF, DOCX, or TXT file.")
+            return False
+        return True
+    
+    def parse_resume(self) -> bool:
+        """Parse the resume and extract raw text content with metadata."""
+        logger.info(f"Parsing resume file: {self.resume_path}")
+        
+        source = self.content if self.content is not None else self.resume_path
+        if self.streaming:
+            return self._parse_streaming(source)
+        
+        key = None
+        if self.stage_cache is not None:
+            key = make_parse_key(source, self.docx_backend)
+            if key is None:
+                logger.error("Failed to read resume file")
+                return False
+        
+        def parse() -> Optional[Dict[str, Any]]:
+            result = parse_resume_file_enhanced(source, cache=self.parse_cache, docx_backend=self.docx_backend)
+            return None if result is None else {'text': result.text, 'metadata': result.metadata}
+        
+        output = self._run_stage('parse', key, parse)
+        self.parse_result = None if output is None else ParseResult(output['text'], output['metadata'])
+        
+        if self.parse_result is None:
+            logger.error("Failed to extract text from resume file")
+            return False
+        
+        self.raw_text = self.parse_result.text
+        self.parsing_metadata = self.parse_result.metadata
+        
+        if len(self.raw_text.strip()) < 10:
+            logger.error("Very little text extracted - file may be corrupted or unsupported")
+            return False
+        
+        self._log_parsing_metadata()
+        logger.info(f"Successfully extracted {len(self.raw_text)} characters")
+        return True
+    
+    def _parse_streaming(self, source) -> bool:
+        """
+        Parse, clean and analyse the resume in one pass over its pages, keeping only the results:
+        the line-oriented extractors, contact details, text statistics and (for duplicate checks)
+        the fingerprint are all computed line by line.
+        """
+        stream = stream_resume_file(source, self.docx_backend)
+        if stream is None:
+            logger.error("Failed to extract text from resume file")
+            return False
+        
+        line_extractor = LineExtractor()
+        contact_extractor = ContactExtractor()
+        statistics = TextStatisticsBuilder()
+        signature = SignatureBuilder() if self.duplicate_index is not None else None
+        try:
+            for line in iter_clean_lines(stream):
+                with timed(self.timings, 'extract.lines'):
+                    line_extractor.feed(line)
+                with timed(self.timings, 'extract.contact'):
+                    contact_extractor.feed(line)
+                statistics.feed(line)
+                if signature is not None:
+                    signature.feed(line)
+        except Exception as e:
+            logger.error(f"Failed to extract text from resume file: {str(e)}")
+            return False
+        self.parsing_metadata = stream.metadata
+        
+        if stream.tally.stripped_length < 10:
+            logger.error("Very little text extracted - file may be corrupted or unsupported")
+            return False
+        
+        self.document = StreamedDocument(statistics.result())
+        if signature is not None:
+            self.signature = signature.result()
+        self.line_results = line_extractor.results()
+        self.line_results['contact'] = contact_extractor.result()
+        self._log_parsing_metadata()
+        logger.info(f"Successfully extracted {stream.tally.length} characters")
+        return True
+    
+    def _log_parsing_metadata(self):
+        """Log the ATS compatibility concerns found while parsing."""
+        if self.parsing_metadata.get('has_images'):
+            logger.info(f"⚠️ Detected {self.parsing_metadata['image_count']} image(s) - ATS compatibility concern")
+        if self.parsing_metadata.get('has_columns'):
+            logger.info("⚠️ Detected multi-column layout - ATS compatibility concern")
+        if self.parsing_metadata.get('parsing_issues'):
+            for issue in self.parsing_metadata['parsing_issues']:
+                logger.warning(f"Parsing issue: {issue}")
+    
+    def process_text(self) -> bool:
+        """Clean and process the extracted text."""
+        if self.line_results is None:
+            if not self.raw_text:
+                logger.error("No raw text available for processing")
+                return False
+            
+            logger.info("Cleaning and processing text...")
+            key = self._stage_key('process_text', TEXT_PROCESSOR_VERSION, 'parse')
+            output = self._run_stage('process_text', key, lambda: {'lines': create_document(self.raw_text).lines})
+            lines = output['lines']
+            self.document = ResumeDocument('\n'.join(lines), lines=lines)
+            self.cleaned_text = self.document.text
+            cleaned_length = len(self.cleaned_text.strip())
+        else:
+            # In streaming mode the text was already cleaned and analysed line by line while parsing
+            cleaned_length = self.document.text_statistics['stripped_length']
+        
+        if cleaned_length < 10:
+            logger.error("Text processing resulted in very little content")
+            return False
+        
+        logger.info(f"Text processed: {len(self.document)} characters after cleaning")
+        return True
+    
+    def check_duplicates(self) -> bool:
+        """Fingerprint the cleaned text and look for a near-duplicate among the resumes indexed before."""
+        if self.signature is None:
+            self.signature = document_signature(self.document)
+        matches = self.duplicate_index.find(self.signature, exclude=str(self.resume_path))
+        if not matches:
+            return True
+        
+        duplicate_path, similarity = matches[0]
+        self.duplicate_of = {'resume_path': duplicate_path, 'similarity': similarity, 'reused': []}
+        logger.info(f"Near-duplicate of {duplicate_path} ({similarity * 100:.0f}% similar)")
+        if self.reuse_duplicates:
+            self.duplicate_results = self.duplicate_index.get_results(duplicate_path)
+        return True
+    
+    def remember_fingerprint(self):
+        """Add this resume's fingerprint, with its results for later reuse, to the duplicate index."""
+        job = self.job or get_default_job()
+        self.duplicate_index.add(str(self.resume_path), self.signature,
+                                 results={'extracted_info': self.extracted_info, 'scores': self.scores},
+                                 job_hash=job.content_hash)
+    
+    def _reuse_duplicate_stage(self, stage: str):
+        self.duplicate_of['reused'].append(stage)
+        self.reused_stages.append(stage)
+        logger.info(f"Reusing the {stage} stage of {self.duplicate_of['resume_path']}")
+    
+    def extract_information(self) -> bool:
+        """Extract structured information from the resume."""
+        if self.document is None:
+            logger.error("No cleaned text available for information extraction")
+            return False
+        
+        logger.info("Extracting structured information...")
+        if self.duplicate_results is not None:
+            # Only the skills, degrees, phrases and content analysis are reused; the contact
+            # details are this resume's own
+            self.extracted_info = with_contact_info(self.duplicate_results['extracted_info'], self._contact_info())
+            self._reuse_duplicate_stage('extract')
+        else:
+            taxonomies = taxonomy_key()
+            key = self._stage_key('extract', EXTRACTOR_VERSION, 'process_text', *([taxonomies] if taxonomies else []))
+            self.extracted_info = self._run_stage('extract', key, self._extract)
+        
+        # Log summary of extracted information
+        summary = self.extracted_info.get('summary', {})
+        logger.info(f"Extraction complete: {summary.get('total_skills', 0)} skills, "
+                   f"{summary.get('total_experience_entries', 0)} experience entries, "
+                   f"{summary.get('total_education_entries', 0)} education entries")
+        
+        return True
+    
+    def _contact_info(self) -> Dict[str, Any]:
+        if self.line_results is not None and 'contact' in self.line_results:
+            return self.line_results['contact']
+        with timed(self.timings, 'extract.contact'):
+            return extract_contact_info(self.document.text)
+    
+    def _extract(self) -> Dict[str, Any]:
+        line_results = self.line_results
+        if line_results is None and self.line_cache is not None:
+            with timed(self.timings, 'extract.lines'):
+                line_results = self.line_cache.line_results(self.document.lines)
+            # The readability statistics reuse the cached line flags too
+            self.document.line_flags = line_results['line_flags']
+        return extract_all_information(self.document, timings=self.timings, line_results=line_results)
+    
+    def calculate_scores(self) -> bool:
+        """Calculate all scoring metrics."""
+        if self.document is None or not self.extracted_info:
+            logger.error("Missing required data for scoring")
+            return False
+        
+        logger.info("Calculating scores...")
+        job = self.job or get_default_job()
+        # Scores are reused if scored against the same job with the same contact details found
+        # (which the formatting score counts); only the parsing metadata is this resume's own
+        reuse_scores = (self.duplicate_results is not None
+                        and self.duplicate_results['job_hash'] == job.content_hash
+                        and self._same_contact_flags(self.duplicate_results['extracted_info']))
+        if reuse_scores:
+            self.scores = dict(self.duplicate_results['scores'], parsing_metadata=self.parsing_metadata)
+            self._reuse_duplicate_stage('score')
+        else:
+            key = self._stage_key('score', SCORER_VERSION, 'extract', job.content_hash)
+            self.scores = self._run_stage('score', key, lambda: calculate_all_scores(
+                self.document, self.extracted_info, self.parsing_metadata, timings=self.timings, job=job))
+        if self.job_engine is not None and self.recommend_jobs > 0:
+            with timed(self.timings, 'score.recommend_jobs'):
+                self.top_jobs = self.job_engine.top_k(self.extracted_info, self.recommend_jobs)
+        
+        # Log score summary
+        logger.info(f"Scoring complete: Readability={self.scores['readability']['score']}/10, "
+                   f"Formatting={self.scores['formatting']['score']:.1f}/10, "
+                   f"Job Match={self.scores['job_match']['percentage']:.1f}%")
+        
+        return True
+    
+    def _same_contact_flags(self, extracted_info: Dict[str, Any]) -> bool:
+        summary, own = extracted_info['summary'], self.extracted_info['summary']
+        return summary['has_email'] == own['has_email'] and summary['has_phone'] == own['has_phone']
+    
+    def evaluate_outputs(self) -> bool:
+        """Evaluate only the requested outputs and the extractors and scorers they depend on."""
+        logger.info(f"Evaluating outputs: {', '.join(self.requested_outputs)}")
+        known = {}
+        if self.line_results is not None:
+            # Line-oriented extractors already ran while streaming
+            known = {
+                'technical_skills': self.line_results['technical_skills'],
+                'soft_skills': self.line_results['soft_skills'],
+                'degrees': self.line_results['degrees'],
+                'key_phrases_raw': self.line_results['key_phrases'],
+                'content_analysis': self.line_results['content_analysis'],
+                'contact': self.line_results['contact']
+            }
+        self.outputs = self.pipeline.evaluate(
+            self.requested_outputs, self.document, parsing_metadata=self.parsing_metadata,
+            job=self.job, job_engine=self.job_engine, recommend_jobs=self.recommend_jobs,
+            known=known, timings=self.timings
+        )
+        return True
+    
+    def _stage_key(self, stage: str, version: str, input_stage: str, *extra_inputs: str) -> Optional[str]:
+        """
+        Key of a stage output, chained from the key of the stage it consumes; None without a stage cache
+        or when the input stage was reused from a near-duplicate rather than keyed.
+        """
+        if self.stage_cache is None or input_stage not in self.stage_keys:
+            return None
+        return StageCache.make_key(stage, version, self.stage_keys[input_stage], *extra_inputs)
+    
+    def _run_stage(self, stage: str, key: Optional[str], compute):
+        """Return a stage's stored output for `key` if there is one, otherwise compute and store it."""
+        if key is None:
+            return compute()
+        self.stage_keys[stage] = key
+        output = self.stage_cache.get(stage, key)
+        if output is not None:
+            self.reused_stages.append(stage)
+            return output
+        output = compute()
+        if output is not None:
+            self.stage_cache.put(stage, key, output)
+        return output
+    
+    def generate_report(self, report_format: str = 'text') -> Union[str, Dict[str, Any]]:
+        """
+        Generate the final feedback report: the structured record (see reporter.build_report_record),
+        rendered as text unless `report_format` is 'json'.
+        """
+        if not self.extracted_info or not self.scores:
+            logger.error("Missing required data for report generation")
+            if report_format == 'json':
+                return build_error_record(str(self.resume_path), "Missing required data for report generation")
+            return "Error: Cannot generate report due to missing data."
+        
+        logger.info("Generating final report...")
+        self.record = build_report_record(self.extracted_info, self.scores, timings=self.timings, job=self.job,
+                                          top_jobs=self.top_jobs, resume_path=str(self.resume_path),
+                                          duplicate_of=self.duplicate_of)
+        if report_format == 'json':
+            return self.record
+        return render_text_report(self.record)
+    
+    def analyze(self, outputs: Optional[Iterable[str]] = None,
+                report_format: str = 'text') -> Union[str, Dict[str, Any]]:
+        """
+        Run the complete analysis workflow, recording the time spent in each stage.
+        Returns the text report, or with `report_format` 'json' the structured report record
+        (whose timings then also cover the report stage and the total).
+        With `outputs` (names from pipeline.OUTPUTS, e.g. {'job_match'}), only those outputs and what
+        they depend on are computed, and they are returned by name instead of the report
+        (an empty dict if the analysis fails). Only parsing and cleaning use the stage cache in that case.
+        """
+        workflow_steps = [
+            ("Validating input", "validate", self.validate_input),
+            ("Parsing resume", "parse", self.parse_resume),
+            ("Processing text", "process_text", self.process_text)
+        ]
+        if outputs is None:
+            if self.duplicate_index is not None:
+                workflow_steps.append(("Checking for near-duplicates", "fingerprint", self.check_duplicates))
+            workflow_steps += [
+                ("Extracting information", "extract", self.extract_information),
+                ("Calculating scores", "score", self.calculate_scores)
+            ]
+        else:
+            self.requested_outputs = list(outputs)
+            # Reject unknown outputs before doing any work
+            plan(self.requested_outputs)
+            workflow_steps.append(("Evaluating outputs", "evaluate", self.evaluate_outputs))
+        
+        self.timings = {}
+        self.stage_keys = {}
+        self.reused_stages = []
+        started_ns = time.perf_counter_ns()
+        for step_name, stage, step_func in workflow_steps:
+            logger.info(f"Step: {step_name}...")
+            with timed(self.timings, stage):
+                succeeded = step_func()
+            if not succeeded:
+                error_msg = f"Analysis failed at step: {step_name}"
+                logger.error(error_msg)
+                self.error = error_msg
+                self.timings['total'] = time.perf_counter_ns() - started_ns
+                if outputs is not None:
+                    return {}
+                if report_format == 'json':
+                    return build_error_record(str(self.resume_path), error_msg)
+                return f"❌ {error_msg}"
+        
+        if outputs is not None:
+            self.timings['total'] = time.perf_counter_ns() - started_ns
+            return self.outputs
+        
+        if self.duplicate_index is not None:
+            with timed(self.timings, 'fingerprint'):
+                self.remember_fingerprint()
+        
+        # Generate and return the final report; the text lists the stages timed up to this point
+        with timed(self.timings, 'report'):
+            report = self.generate_report(report_format)
+        self.timings['total'] = time.perf_counter_ns() - started_ns
+        if report_format == 'json' and self.record is not None:
+            self.record['timings'] = dict(self.timings)
+        return report
@@ -0,0 +1,128 @@
+"""Size-bounded on-disk cache for analysis artefacts."""
+
+import os
+import json
+import zlib
+import hashlib
+import logging
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional, Dict, Any, Union
+
+logger = logging.getLogger(__name__)
+
+CACHE_FILE_SUFFIX = '.zjson'
+
+def hash_bytes(data: Union[bytes, bytearray, memoryview]) -> str:
+    """Return the hex SHA-256 digest of a byte buffer."""
+    return hashlib.sha256(data).hexdigest()
+
+class DiskCache:
+    """
+    Key/value store of JSON documents kept as zlib-compressed files in one directory.
+    Entries are evicted least-recently-used first once the directory exceeds `max_bytes`;
+    recency survives restarts because hits refresh the file's modification time.
+    """
+
+    def __init__(self, cache_dir: Union[str, Path], max_bytes: int = 256 * 1024 * 1024):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.total_bytes = 0
+        # key -> size in bytes, oldest access first
+        self._entries: "OrderedDict[str, int]" = OrderedDict()
+        self._load_index()
+
+    def _load_index(self):
+        """Rebuild the LRU order from the files already on disk."""
+        found = []
+        for path in self.cache_dir.glob(f'*{CACHE_FILE_SUFFIX}'):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            found.append((stat.st_mtime, path.name[:-len(CACHE_FILE_SUFFIX)], stat.st_size))
+        for _, key, size in sorted(found):
+            self._entries[key] = size
+            self.total_bytes += size
+        logger.debug(f"Cache {self.cache_dir}: {len(self._entries)} entries, {self.total_bytes} bytes")
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}{CACHE_FILE_SUFFIX}"
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return the stored document for a key, or None on a miss."""
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as file:
+                value = json.loads(zlib.decompress(file.read()))
+            os.utime(path)
+        except FileNotFoundError:
+            self.misses += 1
+            self._forget(key)
+            return None
+        except (OSError, ValueError, zlib.error) as e:
+            logger.warning(f"Discarding unreadable cache entry {key}: {str(e)}")
+            self.misses += 1
+            self.delete(key)
+            return None
+
+        self.hits += 1
+        if key in self._entries:
+            self._entries.move_to_end(key)
+        return value
+
+    def put(self, key: str, value: Dict[str, Any]):
+        """Store a JSON-serialisable document under a key, evicting old entries if needed."""
+        payload = zlib.compress(json.dumps(value, ensure_ascii=False, separators=(',', ':')).encode('utf-8'))
+        if len(payload) > self.max_bytes:
+            logger.debug(f"Not caching {key}: entry larger than the cache")
+            return
+
+        path = self._path(key)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        try:
+            with open(tmp_path, 'wb') as file:
+                file.write(payload)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Could not write cache entry {key}: {str(e)}")
+            return
+
+        self._forget(key)
+        self._entries[key] = len(payload)
+        self.total_bytes += len(payload)
+        self._evict()
+
+    def delete(self, key: str):
+        """Remove an entry if present."""
+        try:
+            self._path(key).unlink()
+        except FileNotFoundError:
+            pass
+        self._forget(key)
+
+    def _forget(self, key: str):
+        size = self._entries.pop(key, None)
+        if size is not None:
+            self.total_bytes -= size
+
+    def _evict(self):
+        while self.total_bytes > self.max_bytes and self._entries:
+            oldest_key = next(iter(self._entries))
+            self.delete(oldest_key)
+            self.evictions += 1
+            logger.debug(f"Evicted cache entry {oldest_key}")
+
+    def stats(self) -> Dict[str, int]:
+        """Return hit/miss counters and current size."""
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'entries': len(self._entries),
+            'bytes': self.total_bytes
+        }
@@ -0,0 +1,289 @@
+"""Inverted index over analysed resumes for top-k candidate ranking against a job."""
+
+import heapq
+import logging
+from collections import Counter
+from typing import Dict, Any, List, Set, Tuple, Iterable, Optional
+
+from .skill_matcher import WORD_PATTERN
+from .scorers import job_match_percentage, format_job_match_breakdown, JOB_MATCH_WEIGHTS
+from .fuzzy_match import FuzzySkillIndex, best_matches, approximate_matches
+
+logger = logging.getLogger(__name__)
+
+# Requirement kinds, in the order of the match counts kept per candidate
+DEGREE, FIELD, HARD, SOFT = range(4)
+
+# Slack for float error in accumulated partial scores; pruning only discards clear losers
+SCORE_TOLERANCE = 1e-9
+
+class CandidateIndex:
+    """
+    Inverted index from canonical skills and education tokens to stored resumes.
+
+    Resumes are added from `extract_all_information` output and can be added, replaced
+    or removed at any time. `query` ranks them against a job with the same weighted
+    formula as `calculate_job_match_score`, visiting requirements from the heaviest to
+    the lightest: once no unseen resume can reach the current k-th best score, only the
+    candidates already found are updated and the ones that can no longer make the top k
+    are dropped, so most of the corpus is never scored.
+    """
+
+    def __init__(self):
+        self._doc_numbers: Dict[str, int] = {}
+        self._resume_ids: Dict[int, str] = {}
+        self._profiles: Dict[int, Dict[str, Any]] = {}
+        self._next_doc = 0
+        # Lowercased canonical skill / degree-text token -> document numbers
+        self._skill_postings: Dict[str, Set[int]] = {}
+        self._soft_postings: Dict[str, Set[int]] = {}
+        self._token_postings: Dict[str, Set[int]] = {}
+        # Trigram index over the keys of _skill_postings, for approximate hard-skill matches
+        self._skill_index = FuzzySkillIndex()
+
+    def __len__(self) -> int:
+        return len(self._profiles)
+
+    def __contains__(self, resume_id: str) -> bool:
+        return resume_id in self._doc_numbers
+
+    def add(self, resume_id: str, extracted_info: Dict[str, Any]):
+        """Index a resume's extracted information, replacing any previous entry with the same ID."""
+        self.remove(resume_id)
+        doc = self._next_doc
+        self._next_doc += 1
+
+        degrees_text = " ".join(extracted_info.get('degrees', [])).lower()
+        profile = {
+            'degrees_text': degrees_text,
+            'technical_skills': frozenset(s.lower() for s in extracted_info.get('technical_skills', [])),
+            'soft_skills': frozenset(s.lower() for s in extracted_info.get('soft_skills', [])),
+            'tokens': frozenset(WORD_PATTERN.findall(degrees_text))
+        }
+        self._doc_numbers[resume_id] = doc
+        self._resume_ids[doc] = resume_id
+        self._profiles[doc] = profile
+        for skill in profile['technical_skills']:
+            if skill not in self._skill_postings:
+                self._skill_index.add(skill)
+        for postings, keys in self._posting_keys(profile):
+            for key in keys:
+                postings.setdefault(key, set()).add(doc)
+
+    def add_many(self, items: Iterable[Tuple[str, Dict[str, Any]]]):
+        """Index several (resume ID, extracted information) pairs."""
+        for resume_id, extracted_info in items:
+            self.add(resume_id, extracted_info)
+
+    def remove(self, resume_id: str) -> bool:
+        """Remove a resume from the index. Returns False if it was not indexed."""
+        doc = self._doc_numbers.pop(resume_id, None)
+        if doc is None:
+            return False
+        del self._resume_ids[doc]
+        profile = self._profiles.pop(doc)
+        for postings, keys in self._posting_keys(profile):
+            for key in keys:
+                docs = postings[key]
+                docs.discard(doc)
+                if not docs:
+                    del postings[key]
+                    if postings is self._skill_postings:
+                        self._skill_index.remove(key)
+        return True
+
+    def _posting_keys(self, profile: Dict[str, Any]):
+        return (
+            (self._skill_postings, profile['technical_skills']),
+            (self._soft_postings, profile['soft_skills']),
+            (self._token_postings, profile['tokens'])
+        )
+
+    def query(self, job_req: Dict[str, Any], k: int = 10) -> List[Dict[str, Any]]:
+        """
+        Return the k resumes that best match a job, best first (ties keep insertion order).
+        Each entry has the resume ID, the match percentage, the per-group scores and the
+        same breakdown text as `calculate_job_match_score`.
+        """
+        if k <= 0 or not self._profiles:
+            return []
+
+        requirements, totals = self._compile_requirements(job_req)
+        hard_terms = self._hard_terms(job_req)
+        # The job's hard terms are matched against each resume's skills as in the scorer, once per resume
+        hard_index = FuzzySkillIndex(hard_terms)
+        hard_matches: Dict[int, Dict[str, Tuple[str, float]]] = {}
+        # The job match score is linear in the requirements met, so partial scores can be
+        # accumulated as sums of requirement weights; exact scores are computed at the end
+        base_score = (JOB_MATCH_WEIGHTS['hard_skills'] * (totals[HARD] == 0) +
+                      JOB_MATCH_WEIGHTS['soft_skills'] * (totals[SOFT] == 0))
+        remaining = sum(weight for weight, _, _, _ in requirements)
+        accumulators: Dict[int, float] = {}
+        adding = True
+
+        for weight, kind, payload, _ in requirements:
+            if len(accumulators) >= k:
+                threshold = heapq.nlargest(k, accumulators.values())[-1]
+                if adding and base_score + remaining < threshold - SCORE_TOLERANCE:
+                    # No resume outside the accumulators can reach the top k any more
+                    adding = False
+                    logger.debug(f"Candidate query: stopped adding candidates at {len(accumulators)} accumulators")
+                if not adding:
+                    cutoff = threshold - remaining - SCORE_TOLERANCE
+                    accumulators = {doc: partial for doc, partial in accumulators.items() if partial >= cutoff}
+
+            if adding:
+                docs = self._matching_docs(kind, payload)
+            else:
+                docs = [doc for doc in accumulators if self._doc_matches(doc, kind, payload, hard_index, hard_matches)]
+
+            for doc in docs:
+                accumulators[doc] = accumulators.get(doc, base_score) + weight
+            remaining -= weight
+
+        # Rank the survivors that may tie with the k-th best by their exact scores
+        candidates = list(accumulators)
+        if len(candidates) > k:
+            kth_partial = heapq.nlargest(k, accumulators.values())[-1]
+            candidates = [doc for doc in candidates if accumulators[doc] >= kth_partial - SCORE_TOLERANCE]
+        scored = [(self._match_counts(doc, requirements, hard_index, hard_matches), doc) for doc in candidates]
+        ranked = sorted(((-job_match_percentage(*self._breakdown(counts, totals)), doc, counts)
+                         for counts, doc in scored))[:k]
+        if len(ranked) < k:
+            # Resumes matching no requirement all share the base score
+            empty_counts = [0, 0, 0, 0]
+            base_percentage = job_match_percentage(*self._breakdown(empty_counts, totals))
+            for doc in self._resume_ids:
+                if len(ranked) >= k:
+                    break
+                if doc not in accumulators:
+                    ranked.append((-base_percentage, doc, empty_counts))
+
+        results = []
+        for negative_percentage, doc, counts in ranked:
+            found_degree, found_field, hard_matched, hard_total, soft_matched, soft_total = self._breakdown(counts, totals)
+            results.append({
+                'resume_id': self._resume_ids[doc],
+                'percentage': -negative_percentage,
+                'scores': {
+                    'education': (0.5 * found_degree) + (0.5 * found_field),
+                    'hard_skills': hard_matched / hard_total if hard_total else 1.0,
+                    'soft_skills': soft_matched / soft_total if soft_total else 1.0
+                },
+                'feedback': format_job_match_breakdown(found_degree, found_field, hard_matched, hard_total,
+                                                       soft_matched, soft_total,
+                                                       approximate_matches(hard_terms, self._hard_matches(
+                                                           doc, hard_index, hard_matches)))
+            })
+        return results
+
+    def _match_counts(self, doc: int, requirements: List[Tuple[float, int, Any, int]], hard_index: FuzzySkillIndex,
+                      hard_matches: Dict[int, Dict[str, Tuple[str, float]]]) -> List[int]:
+        """Matches per requirement kind of one resume."""
+        counts = [0, 0, 0, 0]
+        for _, kind, payload, count in requirements:
+            if self._doc_matches(doc, kind, payload, hard_index, hard_matches):
+                counts[kind] += count
+        return counts
+
+    def _hard_matches(self, doc: int, hard_index: FuzzySkillIndex,
+                      hard_matches: Dict[int, Dict[str, Tuple[str, float]]]) -> Dict[str, Tuple[str, float]]:
+        """
+        `best_matches` of one resume's skills against the trigram index of a job's hard terms,
+        memoized in `hard_matches` for the duration of a query.
+        """
+        matches = hard_matches.get(doc)
+        if matches is None:
+            matches = hard_matches[doc] = best_matches(hard_index, self._profiles[doc]['technical_skills'])
+        return matches
+
+    @staticmethod
+    def _breakdown(counts: List[int], totals: List[int]) -> Tuple[bool, bool, int, int, int, int]:
+        """Arguments of `job_match_percentage` for the match counts of one resume."""
+        return counts[DEGREE] > 0, counts[FIELD] > 0, counts[HARD], totals[HARD], counts[SOFT], totals[SOFT]
+
+    @staticmethod
+    def _compile_requirements(job_req: Dict[str, Any]) -> Tuple[List[Tuple[float, int, Any, int]], List[int]]:
+        """
+        Flatten a job into (weight, kind, payload, count) requirements sorted heaviest first,
+        plus the number of obtainable matches per kind. Weights are fractions of the full score.
+        """
+        essential = job_req.get('essential', {})
+        degree_terms = tuple(d.lower() for d in essential.get('degrees', []))
+        field_terms = tuple(f.lower() for f in essential.get('fields_of_study', []))
+
+        hard_terms = Counter(CandidateIndex._hard_terms(job_req))
+
+        soft_map = job_req.get('soft_matches', {})
+        soft_groups = Counter(
+            frozenset({key.lower()} | {s.lower() for s in soft_map.get(key, [])})
+            for key in job_req.get('hard_matches', [])
+        )
+
+        totals = [1 if degree_terms else 0, 1 if field_terms else 0,
+                  sum(hard_terms.values()), sum(soft_groups.values())]
+        hard_total, soft_total = totals[HARD], totals[SOFT]
+
+        # The degree and the field are each half of the education score
+        weighted = []
+        if degree_terms:
+            weighted.append((0.5 * JOB_MATCH_WEIGHTS['education'], DEGREE, degree_terms, 1))
+        if field_terms:
+            weighted.append((0.5 * JOB_MATCH_WEIGHTS['education'], FIELD, field_terms, 1))
+        for term, count in hard_terms.items():
+            weighted.append((JOB_MATCH_WEIGHTS['hard_skills'] * count / hard_total, HARD, term, count))
+        for group, count in soft_groups.items():
+            weighted.append((JOB_MATCH_WEIGHTS['soft_skills'] * count / soft_total, SOFT, group, count))
+        weighted.sort(key=lambda requirement: -requirement[0])
+        return weighted, totals
+
+    @staticmethod
+    def _hard_terms(job_req: Dict[str, Any]) -> List[str]:
+        """Lowercased required hard skills of a job, in the order the job lists them."""
+        hard_skills = job_req.get('hard_skills', {})
+        return [s.lower() for group in ('software', 'engineering_disciplines', 'technical_tasks')
+                for s in hard_skills.get(group, [])]
+
+    def _matching_docs(self, kind: int, payload: Any) -> Set[int]:
+        """All indexed resumes satisfying one requirement, read from the postings."""
+        docs: Set[int] = set()
+        if kind == HARD:
+            # A resume skill satisfies a term when either contains the other or it is a close spelling
+            for skill in self._skill_index.matches(payload):
+                docs |= self._skill_postings[skill]
+        elif kind == SOFT:
+            for term in payload:
+                docs |= self._soft_postings.get(term, set())
+        else:
+            for term in payload:
+                docs |= self._education_docs(term)
+        return docs
+
+    def _education_docs(self, term: str) -> Set[int]:
+        """Resumes whose degree text contains a term, narrowed down through the token postings."""
+        words = WORD_PATTERN.findall(term)
+        if not words:
+            candidates: Iterable[int] = self._profiles
+        else:
+            # Every word of the term occurs inside some token of a matching degree text
+            word = max(words, key=len)
+            candidates = set()
+            for token, postings in self._token_postings.items():
+                if word in token:
+                    candidates |= postings
+        return {doc for doc in candidates if term in self._profiles[doc]['degrees_text']}
+
+    def _doc_matches(self, doc: int, kind: int, payload: Any, hard_index: FuzzySkillIndex,
+                     hard_matches: Dict[int, Dict[str, Tuple[str, float]]]) -> bool:
+        """Whether one stored resume satisfies one requirement."""
+        if kind == HARD:
+            return payload in self._hard_matches(doc, hard_index, hard_matches)
+        profile = self._profiles[doc]
+        if kind == SOFT:
+            return not payload.isdisjoint(profile['soft_skills'])
+        return any(term in profile['degrees_text'] for term in payload)
+
+    def get_profile(self, resume_id: str) -> Optional[Dict[str, Any]]:
+        """Return the indexed data of a resume, or None if it is not indexed."""
+        doc = self._doc_numbers.get(resume_id)
+        return None if doc is None else dict(self._profiles[doc])
@@ -0,0 +1,328 @@
+"""Batch mode: analyse a directory of resumes across a pool of warm worker processes."""
+
+import os
+import json
+import logging
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Dict, Any, Optional, List, Iterator
+
+from .analyser import ResumeAnalyser
+from .parsers import ParseCache, DEFAULT_DOCX_BACKEND, SUPPORTED_EXTENSIONS, PARSER_VERSION
+from .text_processor import TEXT_PROCESSOR_VERSION
+from .reporter import build_error_record
+from .job_data import JobRegistry
+from .stage_cache import StageCache
+from .results_store import ResultsStore, STORE_BATCH_SIZE
+from .fingerprint import DuplicateIndex, results_version
+from .taxonomy import TaxonomyMatcher, get_taxonomy, set_taxonomy, KINDS as TAXONOMY_KINDS
+from .metrics import StageMetrics
+
+logger = logging.getLogger(__name__)
+
+# Per-process state for batch workers, populated once by the pool initializer
+_WORKER_STATE: Dict[str, Any] = {}
+
+def init_batch_worker(options: Dict[str, Any]):
+    """Set up a batch worker once: warm the heavy imports and compiled matchers, open the cache."""
+    if options.get('verbose'):
+        logging.getLogger('resume_analyser').setLevel(logging.DEBUG)
+    else:
+        # Per-step progress from many workers would drown the batch output
+        logging.getLogger('resume_analyser').setLevel(logging.WARNING)
+    
+    for module_name in ('fitz', 'docx'):
+        try:
+            __import__(module_name)
+        except ImportError:
+            pass
+    
+    from .skill_matcher import get_skill_matcher
+    for kind, path in (options.get('taxonomies') or {}).items():
+        # Every worker maps the same artifact file, so its pages are shared
+        set_taxonomy(kind, path)
+    for kind in TAXONOMY_KINDS:
+        get_skill_matcher(get_taxonomy(kind))
+    
+    cache_dir = options.get('cache_dir')
+    _WORKER_STATE['parse_cache'] = ParseCache(cache_dir, options['cache_size'] * 1024 * 1024) if cache_dir else None
+    _WORKER_STATE['docx_backend'] = options.get('docx_backend', DEFAULT_DOCX_BACKEND)
+    _WORKER_STATE['streaming'] = options.get('streaming', False)
+    _WORKER_STATE['outputs'] = options.get('outputs')
+    _WORKER_STATE['pipeline_workers'] = options.get('pipeline_workers', 1)
+    _WORKER_STATE['store'] = options.get('store', False)
+    _WORKER_STATE['report_format'] = options.get('report_format', 'text')
+    dedupe_db = options.get('dedupe_db')
+    _WORKER_STATE['duplicate_index'] = DuplicateIndex(dedupe_db, options['dedupe_threshold']) if dedupe_db else None
+    _WORKER_STATE['reuse_duplicates'] = options.get('reuse_duplicates', False)
+    stage_cache_dir = options.get('stage_cache_dir')
+    _WORKER_STATE['stage_cache'] = StageCache(stage_cache_dir, options['cache_size'] * 1024 * 1024) if stage_cache_dir else None
+    # Jobs are compiled once per worker and reused for every file that targets them
+    _WORKER_STATE['job_registry'] = JobRegistry(options.get('jobs_dir'))
+    _WORKER_STATE['job'] = options.get('job')
+    _WORKER_STATE['recommend_jobs'] = options.get('recommend_jobs', 0)
+    _WORKER_STATE['job_engine'] = None
+    if _WORKER_STATE['recommend_jobs'] > 0:
+        from .job_matching import JobMatchEngine
+        _WORKER_STATE['job_engine'] = JobMatchEngine(_WORKER_STATE['job_registry'].load_all())
+    _WORKER_STATE['job_map'] = options.get('job_map') or {}
+
+def worker_settings() -> str:
+    """
+    What the results of an initialised worker depend on: the parser, extractor and scorer
+    versions, the taxonomies, the jobs scored against or recommended and the requested outputs.
+    """
+    registry = _WORKER_STATE['job_registry']
+    jobs = {registry.get(name).content_hash for name in {_WORKER_STATE['job'], *_WORKER_STATE['job_map'].values()}}
+    if _WORKER_STATE['recommend_jobs'] > 0:
+        jobs.update(job.content_hash for job in registry.load_all())
+    outputs = _WORKER_STATE.get('outputs')
+    return json.dumps({
+        'versions': [PARSER_VERSION, TEXT_PROCESSOR_VERSION, results_version()],
+        'jobs': sorted(jobs),
+        'recommend_jobs': _WORKER_STATE['recommend_jobs'],
+        'outputs': sorted(outputs) if outputs is not None else None
+    })
+
+def analyse_batch_item(resume_path: str) -> Dict[str, Any]:
+    """Analyse one file inside a batch worker; failures are reported, never raised."""
+    try:
+        job_name = _WORKER_STATE['job_map'].get(Path(resume_path).name, _WORKER_STATE['job'])
+        job = _WORKER_STATE['job_registry'].get(job_name)
+        analyser = ResumeAnalyser(resume_path, parse_cache=_WORKER_STATE.get('parse_cache'),
+                                  docx_backend=_WORKER_STATE.get('docx_backend', DEFAULT_DOCX_BACKEND),
+                                  job=job, job_engine=_WORKER_STATE.get('job_engine'),
+                                  recommend_jobs=_WORKER_STATE.get('recommend_jobs', 0),
+                                  stage_cache=_WORKER_STATE.get('stage_cache'),
+                                  streaming=_WORKER_STATE.get('streaming', False),
+                                  pipeline_workers=_WORKER_STATE.get('pipeline_workers', 1),
+                                  duplicate_index=_WORKER_STATE.get('duplicate_index'),
+                                  reuse_duplicates=_WORKER_STATE.get('reuse_duplicates', False))
+        outputs = _WORKER_STATE.get('outputs')
+        report = analyser.analyze(outputs, report_format=_WORKER_STATE.get('report_format', 'text'))
+        if outputs is not None and analyser.error is None:
+            # Written like a JSON report record, so it names the resume it belongs to
+            report = {'resume_path': resume_path, **report}
+        result = {'path': resume_path, 'ok': analyser.error is None, 'error': analyser.error, 'report': report,
+                  'timings': analyser.timings, 'reused_stages': analyser.reused_stages,
+                  'duplicate_of': analyser.duplicate_of}
+        if _WORKER_STATE.get('store') and analyser.error is None:
+            # The parent process writes results to the store, so it needs the raw results too
+            result['extracted_info'] = analyser.extracted_info
+            result['scores'] = analyser.scores
+        return result
+    except Exception as e:
+        return {'path': resume_path, 'ok': False, 'error': f"Unexpected error: {str(e)}", 'report': f"❌ Analysis failed: {str(e)}",
+                'timings': {}}
+
+def collect_resume_files(directory: Path) -> List[Path]:
+    """List the supported resume files in a directory, in name order."""
+    return sorted(
+        path for path in directory.iterdir()
+        if path.is_file() and path.suffix.lower() in SUPPORTED_EXTENSIONS
+    )
+
+def iter_batch_results(files: List[Path], options: Dict[str, Any], jobs: int) -> Iterator[Dict[str, Any]]:
+    """
+    Analyse files across a process pool, yielding each result as soon as it completes.
+    A worker dying natively (e.g. a parser segfault) breaks the whole pool; the files that
+    were in flight are then retried one at a time in a fresh pool, so only a file that
+    crashes a worker on its own is reported as failed, and the rest of the intake goes on.
+    """
+    if jobs <= 1:
+        # The worker set-up quietens the package logger; this process keeps using it afterwards
+        package_logger = logging.getLogger('resume_analyser')
+        level = package_logger.level
+        init_batch_worker(options)
+        try:
+            for path in files:
+                yield analyse_batch_item(str(path))
+        finally:
+            package_logger.setLevel(level)
+        return
+    
+    remaining = (str(path) for path in files)
+    while True:
+        lost = yield from _pool_results(remaining, options, jobs)
+        if not lost:
+            return
+        logger.warning(f"A batch worker crashed; retrying {len(lost)} unfinished file(s) one at a time")
+        for path in lost:
+            if (yield from _pool_results(iter([path]), options, 1)):
+                yield {'path': path, 'ok': False, 'error': "Worker crashed while analysing this file",
+                       'report': "❌ Analysis failed: worker crashed", 'timings': {}}
+
+def _pool_results(paths: Iterator[str], options: Dict[str, Any], jobs: int):
+    """
+    Analyse paths taken from an iterator in a new process pool, yielding results as they complete.
+    At most two files per worker are queued, so few are in flight when the pool breaks; returns
+    the paths whose analysis was lost to a broken pool (empty if none), leaving the rest in `paths`.
+    """
+    with ProcessPoolExecutor(max_workers=jobs, initializer=init_batch_worker, initargs=(options,)) as pool:
+        futures = {}
+        lost = []
+        exhausted = False
+        while True:
+            while not exhausted and not lost and len(futures) < 2 * jobs:
+                path = next(paths, None)
+                if path is None:
+                    exhausted = True
+                else:
+                    futures[pool.submit(analyse_batch_item, path)] = path
+            if not futures:
+                return lost
+            done, _ = wait(futures, return_when=FIRST_COMPLETED)
+            for future in done:
+                path = futures.pop(future)
+                try:
+                    yield future.result()
+                except BrokenProcessPool:
+                    lost.append(path)
+                except Exception as e:
+                    yield {'path': path, 'ok': False, 'error': f"Worker failed: {str(e)}",
+                           'report': f"❌ Analysis failed: {str(e)}", 'timings': {}}
+
+def load_job_map(path: str) -> Dict[str, str]:
+    """Read a JSON object mapping resume file names to the job each one targets."""
+    with open(path, encoding="utf-8") as f:
+        job_map = json.load(f)
+    if not isinstance(job_map, dict):
+        raise ValueError(f"Job map {path} must be a JSON object of file name -> job")
+    return job_map
+
+def load_batch_jobs(args) -> Optional[Dict[str, str]]:
+    """Read the job map and check every job it and --job name; returns the job map, or None (logged) if invalid."""
+    registry = JobRegistry(args.jobs_dir)
+    try:
+        job_map = load_job_map(args.job_map) if args.job_map else {}
+        # Fail fast on unknown jobs instead of failing every file that uses them
+        for job_name in {args.job, *job_map.values()}:
+            registry.get(job_name)
+    except (ValueError, OSError) as e:
+        logger.error(f"Invalid job selection: {str(e)}")
+        return None
+    return job_map
+
+def batch_options(args, job_map: Dict[str, str]) -> Dict[str, Any]:
+    """The batch worker options (see init_batch_worker) for the command line arguments."""
+    return {
+        'cache_dir': args.cache_dir,
+        'cache_size': args.cache_size,
+        'stage_cache_dir': args.stage_cache,
+        'docx_backend': args.docx_backend,
+        'streaming': args.stream,
+        'outputs': args.outputs,
+        'pipeline_workers': args.pipeline_workers,
+        'store': bool(args.store),
+        'report_format': args.format,
+        'dedupe_db': args.dedupe,
+        'dedupe_threshold': args.dedupe_threshold,
+        'reuse_duplicates': args.reuse_duplicates,
+        'jobs_dir': args.jobs_dir,
+        'job': args.job,
+        'job_map': job_map,
+        'recommend_jobs': args.recommend_jobs,
+        'taxonomies': {kind: str(get_taxonomy(kind).path) for kind in TAXONOMY_KINDS
+                       if isinstance(get_taxonomy(kind), TaxonomyMatcher)},
+        'verbose': args.verbose
+    }
+
+def batch_report_format(args) -> str:
+    """The format batch reports are written in; `--outputs` are always written as JSON records."""
+    return 'json' if args.outputs is not None else args.format
+
+def write_batch_result(result: Dict[str, Any], report_format: str, output_dir: Optional[Path], combined) -> str:
+    """Print the outcome of one batch file and write its report; returns where the report was written."""
+    path = Path(result['path'])
+    if result['ok']:
+        reused = result.get('reused_stages')
+        duplicate_of = result.get('duplicate_of')
+        notes = []
+        if duplicate_of:
+            notes.append(f"near-duplicate of {Path(duplicate_of['resume_path']).name}, "
+                         f"{duplicate_of['similarity'] * 100:.0f}% similar")
+        if reused:
+            notes.append(f"reused: {', '.join(reused)}")
+        print(f"✓ {path.name}" + (f" ({'; '.join(notes)})" if notes else ""))
+    else:
+        print(f"✗ {path.name}: {result['error']}")
+    
+    if report_format == 'json':
+        # One JSON record per line, written as soon as the resume is done
+        record = result['report'] if result['ok'] else build_error_record(result['path'], result['error'])
+        if output_dir:
+            report_path = output_dir / f"{path.name}.report.json"
+            with open(report_path, "w", encoding="utf-8") as f:
+                json.dump(record, f, indent=2, ensure_ascii=False)
+            return str(report_path)
+        combined.write(json.dumps(record, ensure_ascii=False) + "\n")
+    elif output_dir:
+        report_path = output_dir / f"{path.name}.report.txt"
+        with open(report_path, "w", encoding="utf-8") as f:
+            f.write(result['report'])
+        return str(report_path)
+    else:
+        combined.write(f"{'#' * 50}\n# {path}\n{'#' * 50}\n\n{result['report']}\n\n")
+    combined.flush()
+    return combined.name
+
+def run_batch(args) -> int:
+    """Analyse every resume in a directory, writing reports as results arrive."""
+    directory = Path(args.resume)
+    files = collect_resume_files(directory)
+    if not files:
+        logger.error(f"No PDF, DOCX or TXT files found in {directory}")
+        return 1
+    
+    job_map = load_batch_jobs(args)
+    if job_map is None:
+        return 1
+    
+    jobs = args.jobs or os.cpu_count() or 1
+    jobs = min(jobs, len(files))
+    options = batch_options(args, job_map)
+    logger.info(f"Analysing {len(files)} file(s) from {directory} with {jobs} worker(s)")
+    
+    output_dir = Path(args.output_dir) if args.output_dir else None
+    if output_dir:
+        output_dir.mkdir(parents=True, exist_ok=True)
+    report_format = batch_report_format(args)
+    combined = None if output_dir else open(args.output, "w", encoding="utf-8")
+    store = ResultsStore(args.store) if args.store else None
+    pending_records = []
+    
+    succeeded = 0
+    failed = 0
+    stored = 0
+    metrics = StageMetrics()
+    try:
+        for result in iter_batch_results(files, options, jobs):
+            metrics.observe_file(result.get('timings', {}), ok=result['ok'])
+            if result['ok']:
+                succeeded += 1
+            else:
+                failed += 1
+            write_batch_result(result, report_format, output_dir, combined)
+            
+            if store and 'scores' in result:
+                pending_records.append((result['path'], result['extracted_info'], result['scores']))
+                if len(pending_records) >= STORE_BATCH_SIZE:
+                    stored += store.add_many(pending_records)
+                    pending_records = []
+    finally:
+        if combined:
+            combined.close()
+        if store:
+            stored += store.add_many(pending_records)
+            store.close()
+    
+    throughput = metrics.to_dict()['files_per_second']
+    print(f"\nBatch complete: {succeeded} succeeded, {failed} failed ({throughput:.2f} files/s)")
+    print(f"Reports saved to {output_dir or args.output}")
+    if store:
+        print(f"{stored} result(s) stored in {args.store}")
+    if args.metrics:
+        metrics.write(args.metrics)
+        print(f"Metrics saved to {args.metrics}")
+    return 0 if failed == 0 else 1
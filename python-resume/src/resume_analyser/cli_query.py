@@ -0,0 +1,61 @@
+"""The `query` subcommand: search the analysis results stored with --store."""
+
+import json
+import argparse
+import logging
+from pathlib import Path
+from typing import List
+
+from .results_store import ResultsStore
+
+logger = logging.getLogger(__name__)
+
+def run_query(args) -> int:
+    """Search a results database and print the matching analyses, best job match first."""
+    if not Path(args.database).exists():
+        logger.error(f"Results database not found: {args.database}")
+        return 1
+    
+    with ResultsStore(args.database) as store:
+        if args.top_skills:
+            for name, count in store.skill_counts(args.top_skills):
+                print(f"{count:6d}  {name}")
+            return 0
+        results = store.query(skills=args.skill, degree=args.degree, min_job_match=args.min_match,
+                              job_id=args.job, limit=args.limit)
+    
+    if args.json:
+        print(json.dumps(results, indent=2, ensure_ascii=False))
+        return 0
+    for result in results:
+        print(f"{result['job_match']:5.1f}%  {result['resume_path']}  ({result['job_title']}; "
+              f"{result['email'] or 'no email'})")
+    print(f"\n{len(results)} matching analyses")
+    return 0
+
+def parse_query_arguments(argv: List[str]):
+    """Parse the arguments of the `query` subcommand."""
+    parser = argparse.ArgumentParser(
+        prog="main.py query",
+        description="Search stored analysis results by skill, degree and job match",
+        epilog='Example: python main.py query results.db --skill "Civil 3D" --skill HEC-RAS --min-match 70'
+    )
+    parser.add_argument("database", help="Results database written with --store")
+    parser.add_argument(
+        "--skill",
+        action="append",
+        default=[],
+        help="Required skill (canonical name, any case); repeat to require several"
+    )
+    parser.add_argument("--degree", help="Words that must all appear in a degree entry, e.g. 'civil engineering'")
+    parser.add_argument("--min-match", type=float, help="Minimum job match percentage")
+    parser.add_argument("--job", help="Only analyses scored against this job ID")
+    parser.add_argument("--limit", type=int, help="Maximum number of results")
+    parser.add_argument("--json", action="store_true", help="Print the results as JSON")
+    parser.add_argument(
+        "--top-skills",
+        type=int,
+        metavar="N",
+        help="Instead of searching, list the N most common skills across stored analyses"
+    )
+    return parser.parse_args(argv)
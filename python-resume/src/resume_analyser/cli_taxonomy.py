@@ -0,0 +1,42 @@
+"""The `taxonomy` subcommand: compile a skill taxonomy file into a matcher artifact."""
+
+import time
+import argparse
+import logging
+from pathlib import Path
+from typing import List
+
+from .taxonomy import TaxonomyMatcher, load_taxonomy, build_taxonomy_artifact, source_signature, ARTIFACT_SUFFIX
+
+logger = logging.getLogger(__name__)
+
+def run_build_taxonomy(args) -> int:
+    """Compile a taxonomy file into a matcher artifact for --taxonomy."""
+    output = args.output or args.source + ARTIFACT_SUFFIX
+    try:
+        started = time.perf_counter()
+        skill_map = load_taxonomy(args.source)
+        build_taxonomy_artifact(skill_map, output, source=source_signature(Path(args.source)))
+        built = time.perf_counter() - started
+        started = time.perf_counter()
+        matcher = TaxonomyMatcher(output)
+        opened = time.perf_counter() - started
+    except (OSError, ValueError) as e:
+        logger.error(f"Could not build the taxonomy: {str(e)}")
+        return 1
+    print(f"{len(matcher.skills)} skills, {matcher.variation_count} variations -> {output} "
+          f"(built in {built:.1f} s, opens in {opened * 1000:.1f} ms)")
+    matcher.close()
+    return 0
+
+def parse_taxonomy_arguments(argv: List[str]):
+    """Parse the arguments of the `taxonomy` subcommand."""
+    parser = argparse.ArgumentParser(
+        prog="main.py taxonomy",
+        description="Compile a skill taxonomy (JSON, CSV or TSV) into a memory-mapped matcher artifact",
+        epilog="Example: python main.py taxonomy skills.csv -o skills.skm"
+    )
+    parser.add_argument("source", help="Taxonomy file: a JSON object of skill -> variations, or a CSV/TSV with "
+                                       "skill and synonyms columns (e.g. ESCO preferredLabel/altLabels)")
+    parser.add_argument("--output", "-o", help=f"Artifact path (default: the source path + {ARTIFACT_SUFFIX})")
+    return parser.parse_args(argv)
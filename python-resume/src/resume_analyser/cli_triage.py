@@ -0,0 +1,47 @@
+"""Triage mode: quick ATS checks of one resume or a directory of them, without a full analysis."""
+
+import json
+import time
+import logging
+from pathlib import Path
+
+from .triage import triage_resume_file
+from .cli_batch import collect_resume_files
+
+logger = logging.getLogger(__name__)
+
+def run_triage(args) -> int:
+    """Triage one file or every resume in a directory, printing the ATS flags and saving them as JSON."""
+    target = Path(args.resume)
+    files = collect_resume_files(target) if target.is_dir() else [target]
+    if not files:
+        logger.error(f"No PDF, DOCX or TXT files found in {target}")
+        return 1
+    
+    results = {}
+    unreadable = 0
+    started_ns = time.perf_counter_ns()
+    for path in files:
+        result = triage_resume_file(path, docx_backend=args.docx_backend)
+        results[str(path)] = result
+        if result is None:
+            unreadable += 1
+            print(f"✗ {path.name}: could not be read")
+            continue
+        flags = [f"{result['page_count']} page(s)", f"~{result['text_density']:.0f} chars/page"]
+        if result['has_images']:
+            flags.append(f"{result['image_count']} image(s)")
+        if result['has_columns']:
+            flags.append(f"{result['column_count']} columns")
+        if result['likely_unparseable']:
+            unreadable += 1
+            print(f"✗ {path.name}: likely unparseable - {'; '.join(result['parsing_issues'])}")
+        else:
+            print(f"✓ {path.name}: {', '.join(flags)}")
+    elapsed = (time.perf_counter_ns() - started_ns) / 1e9
+    
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(f"\nTriage complete: {len(files) - unreadable} ok, {unreadable} rejected ({len(files) / elapsed if elapsed else 0:.1f} files/s)")
+    print(f"Triage results saved to {args.output}")
+    return 0 if unreadable == 0 else 1
@@ -0,0 +1,71 @@
+"""Watch mode: keep analysing the new and changed resumes of a folder with a warm analyser."""
+
+import time
+import logging
+from pathlib import Path
+from typing import Dict, Any
+
+from .results_store import ResultsStore
+from .watch import WatchManifest, watch_folder, MANIFEST_NAME
+from .metrics import StageMetrics
+from .cli_batch import (
+    init_batch_worker, analyse_batch_item, worker_settings, load_batch_jobs, batch_options, batch_report_format,
+    write_batch_result
+)
+
+logger = logging.getLogger(__name__)
+
+def run_watch(args) -> int:
+    """
+    Analyse the resumes in a folder that were not analysed before, then keep analysing new and
+    changed ones as they arrive until interrupted. The analyser is set up once and stays warm;
+    a manifest of content hashes in the folder remembers what has been analysed across runs.
+    """
+    directory = Path(args.watch)
+    job_map = load_batch_jobs(args)
+    if job_map is None:
+        return 1
+    
+    output_dir = Path(args.output_dir) if args.output_dir else None
+    if output_dir:
+        output_dir.mkdir(parents=True, exist_ok=True)
+    # Appended to, so reports from earlier runs are kept alongside the manifest that skips their files
+    combined = None if output_dir else open(args.output, "a", encoding="utf-8")
+    store = ResultsStore(args.store) if args.store else None
+    report_format = batch_report_format(args)
+    metrics = StageMetrics()
+    # Reports written into the watched folder must not be picked up as new resumes
+    exclude = {Path(combined.name)} if combined else set()
+    analysed = 0
+    
+    def analyse(path: Path) -> Dict[str, Any]:
+        nonlocal analysed
+        started = time.perf_counter()
+        result = analyse_batch_item(str(path))
+        metrics.observe_file(result.get('timings', {}), ok=result['ok'])
+        report = write_batch_result(result, report_format, output_dir, combined)
+        if store and 'scores' in result:
+            store.add(result['path'], result['extracted_info'], result['scores'])
+        analysed += 1
+        logger.debug(f"{path.name} analysed in {(time.perf_counter() - started) * 1000:.0f} ms")
+        return {'ok': result['ok'], 'error': result['error'], 'report': report}
+    
+    init_batch_worker(batch_options(args, job_map))
+    manifest = WatchManifest(args.manifest or directory / MANIFEST_NAME, settings=worker_settings())
+    print(f"👀 Watching {directory} for new or changed resumes (Ctrl-C to stop)")
+    try:
+        watch_folder(directory, analyse, manifest, debounce=args.debounce, exclude=exclude)
+    except KeyboardInterrupt:
+        print("\n\n⚠️  Watch stopped by user")
+    finally:
+        manifest.close()
+        if combined:
+            combined.close()
+        if store:
+            store.close()
+    
+    print(f"{analysed} file(s) analysed; reports saved to {output_dir or args.output}")
+    if args.metrics:
+        metrics.write(args.metrics)
+        print(f"Metrics saved to {args.metrics}")
+    return 0
@@ -0,0 +1,93 @@
+"""Shared resume document with lazily cached text views."""
+
+from functools import cached_property
+from typing import List, Optional, Tuple, Union, Dict, Any
+
+from .skill_matcher import WORD_PATTERN
+from .text_statistics import compute_text_statistics, count_character_classes
+
+class ResumeDocument:
+    """
+    Cleaned resume text created once per analysis.
+    Every view (lines, lowercase text, tokens, ...) is computed on first access and
+    then shared by all extractors and scorers instead of being recomputed by each one.
+    """
+
+    def __init__(self, text: str, lines: Optional[List[str]] = None):
+        self.text = text
+        # Readability flags of every line (text_statistics.line_flags), when already known from a line cache
+        self.line_flags: Optional[List[Tuple[bool, bool]]] = None
+        if lines is not None:
+            # Lines produced while cleaning can be reused without splitting again
+            self.__dict__['lines'] = lines
+
+    def __len__(self) -> int:
+        return len(self.text)
+
+    @cached_property
+    def lines(self) -> List[str]:
+        """Lines of the original text."""
+        return self.text.split('\n')
+
+    @cached_property
+    def lower_text(self) -> str:
+        """Lowercased text."""
+        return self.text.lower()
+
+    @cached_property
+    def lower_lines(self) -> List[str]:
+        """Lowercased lines, aligned with `lines`."""
+        return [line.lower() for line in self.lines]
+
+    @cached_property
+    def descriptive_lines(self) -> List[str]:
+        """Stripped, lowercased lines with empty lines removed."""
+        return [line.strip() for line in self.lower_lines if line.strip()]
+
+    @cached_property
+    def tokens(self) -> List[str]:
+        """Whitespace-separated tokens of the text."""
+        return self.text.split()
+
+    @cached_property
+    def lower_word_tokens(self) -> List[Tuple[str, int]]:
+        """Word tokens of the lowercased text as (token, start offset) pairs."""
+        return [(match.group(), match.start()) for match in WORD_PATTERN.finditer(self.lower_text)]
+
+    @cached_property
+    def char_classes(self) -> Dict[str, int]:
+        """Total, special and ATS-problematic character counts of the text."""
+        if 'text_statistics' in self.__dict__:
+            return self.text_statistics['char_classes']
+        return count_character_classes(self.text)
+
+    @cached_property
+    def text_statistics(self) -> Dict[str, Any]:
+        """Word, sentence, bullet, line and character-class statistics of the text."""
+        return compute_text_statistics(self.text, self.lines, self.line_flags)
+
+class StreamedDocument(ResumeDocument):
+    """
+    A resume whose cleaned lines were analysed as they were streamed and then let go. Only the
+    text statistics gathered on the way (text_statistics.TextStatisticsBuilder) are kept, so the
+    analysis needs memory for a few lines rather than the whole text; the text views are unavailable.
+    """
+
+    def __init__(self, text_statistics: Dict[str, Any]):
+        self.line_flags = None
+        self.__dict__['text_statistics'] = text_statistics
+
+    @property
+    def text(self) -> str:
+        raise AttributeError("The text of a streamed document is not kept")
+
+    def __len__(self) -> int:
+        return self.text_statistics['char_classes']['total']
+
+TextInput = Union[str, ResumeDocument]
+
+def as_document(text: TextInput) -> ResumeDocument:
+    """Wrap plain text in a ResumeDocument, passing existing documents through unchanged."""
+    if isinstance(text, ResumeDocument):
+        return text
+    return ResumeDocument(text or "")
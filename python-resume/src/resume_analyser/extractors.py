@@ -2,137 +2,264 @@
 
 import re
 import logging
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Tuple, Optional
 
-from .keywords import (
-    STRONG_ACTION_VERBS, WEAK_ACTION_VERBS, DEGREE_KEYWORDS,
-    SOFT_SKILLS, CIVIL_ENGINEERING_SKILLS
-)
+from .keywords import STRONG_ACTION_VERBS, WEAK_ACTION_VERBS, DEGREE_KEYWORDS
+from .skill_matcher import get_skill_matcher
+from .taxonomy import get_taxonomy
+from .document import TextInput, as_document
+from .text_statistics import line_flags
+from .metrics import timed
 
 logger = logging.getLogger(__name__)
 
+# Bump whenever the extracted information change so memoized stage results are not reused
+EXTRACTOR_VERSION = "1"
+
 # --- Lists for Component-Based Extraction ---
 COMMON_JOB_TITLES = ['engineer', 'intern', 'manager', 'consultant', 'assistant', 'coordinator', 'specialist', 'analyst', 'designer', 'drafter']
 COMPANY_INDICATORS = ['ltd', 'inc', 'llc', 'corp', 'corporation', 'university', 'college', 'institute', 'consultants', 'group', 'services']
 
-def extract_skills(text: str, skill_map: Dict[str, List[str]]) -> List[str]:
-    """Generic function to extract skills from text based on a provided map."""
-    found_skills = set()
-    text_lower = text.lower()
-    
-    for main_skill, variations in skill_map.items():
-        for variation in variations:
-            pattern = r'\b' + re.escape(variation) + r'\b'
-            if re.search(pattern, text_lower):
-                found_skills.add(main_skill)
-                break
-    
-    return list(found_skills)
+def extract_skills(text: TextInput, skill_map) -> List[str]:
+    """Generic function to extract skills from text based on a provided map (or compiled taxonomy matcher)."""
+    document = as_document(text)
+    return get_skill_matcher(skill_map).find_skills(document.lower_text, document.lower_word_tokens)
+
+
+def extract_skill_matches(text: TextInput, skill_map) -> Dict[str, List[Tuple[int, int]]]:
+    """Extract skills along with the (start, end) offsets of every match in the lowercased text."""
+    document = as_document(text)
+    return get_skill_matcher(skill_map).find_matches(document.lower_text, document.lower_word_tokens)
 
 
-def find_potential_degrees(text: str) -> List[str]:
+def degree_entry(line: str, line_lower: str) -> Optional[str]:
+    """Return the degree entry a line holds, or None if it mentions no degree keyword."""
+    if any(keyword in line_lower for keyword in DEGREE_KEYWORDS):
+        # Capture the whole raw line as a potential degree entry
+        return line.strip()
+    return None
+
+
+def find_potential_degrees(text: TextInput) -> List[str]:
     """Finds potential degree names in the text."""
+    document = as_document(text)
     found_degrees = set()
-    lines = text.split('\n')
-    for line in lines:
-        line_lower = line.lower()
-        if any(keyword in line_lower for keyword in DEGREE_KEYWORDS):
-            # Capture the whole raw line as a potential degree entry
-            found_degrees.add(line.strip())
+    for line, line_lower in zip(document.lines, document.lower_lines):
+        entry = degree_entry(line, line_lower)
+        if entry is not None:
+            found_degrees.add(entry)
             
     logger.info(f"Found {len(found_degrees)} potential degree entries.")
     return list(found_degrees)
 
 
-def extract_key_phrases(text: str) -> List[str]:
+# This pattern finds sequences of capitalized words, allowing lowercase joining words.
+TITLE_CASE_PATTERN = re.compile(r'\b([A-Z][a-z\'-]+(?:(?:\s+(?:and|or|the|of|in))?(\s+[A-Z][a-z\'-]+))+)\b')
+
+
+def line_key_phrases(line: str) -> List[str]:
+    """Finds the potential key phrases of a single line."""
+    phrases = []
+    for match in TITLE_CASE_PATTERN.findall(line):
+        # The pattern returns tuples, so we access the first element
+        full_match = match[0]
+        # Avoid adding overly long sentences that might accidentally match.
+        if len(full_match.split()) < 6:
+            phrases.append(full_match)
+    return phrases
+
+
+def extract_key_phrases(text: TextInput) -> List[str]:
     """Finds potential key phrases."""
     found_phrases = set()
-    lines = text.split('\n')
-    
-    # This pattern finds sequences of capitalized words, allowing lowercase joining words.
-    title_case_pattern = re.compile(r'\b([A-Z][a-z\'-]+(?:(?:\s+(?:and|or|the|of|in))?(\s+[A-Z][a-z\'-]+))+)\b')
-    for line in lines:
-        matches = title_case_pattern.findall(line)
-        for match in matches:
-            # The pattern returns tuples, so we access the first element
-            full_match = match[0]
-            # Avoid adding overly long sentences that might accidentally match.
-            if len(full_match.split()) < 6:
-                found_phrases.add(full_match)
+    for line in as_document(text).lines:
+        found_phrases.update(line_key_phrases(line))
 
     logger.info(f"Found {len(found_phrases)} potential key phrases.")
     return list(found_phrases)
 
 
-def analyse_resume_content(text: str) -> Dict[str, Any]:
+# Verbs are matched against whole tokens, so 'cut' no longer fires inside 'executed'
+STRONG_VERB_SET = frozenset(STRONG_ACTION_VERBS)
+WEAK_VERB_SET = frozenset(WEAK_ACTION_VERBS)
+
+# One tokenizer pass per line yields both quantifiers and words
+LINE_TOKEN_PATTERN = re.compile(r'(?P<quantifier>\b\d+[%kmgtb]?\b|\$[\d,.]+)|(?P<word>[^\W\d_]+)')
+NON_DIGIT_TABLE = {ord(c): None for c in '$,.%kmgtb'}
+
+
+def is_meaningful_quantifier(token: str) -> bool:
+    """Check whether a numeric token is a real quantity rather than a year."""
+    numeric_part = token.translate(NON_DIGIT_TABLE)
+    if not numeric_part.isdigit():
+        return False
+    return not (len(numeric_part) == 4 and 1900 <= int(numeric_part) <= 2099)
+
+
+def classify_line(line: str) -> Dict[str, Any]:
+    """Tokenise a lowercased line once, reporting action verb hits and quantified spans."""
+    strong_verbs = []
+    weak_verbs = []
+    quantified_spans = []
+
+    for match in LINE_TOKEN_PATTERN.finditer(line):
+        word = match.group('word')
+        if word is not None:
+            if word in STRONG_VERB_SET:
+                strong_verbs.append(word)
+            elif word in WEAK_VERB_SET:
+                weak_verbs.append(word)
+        elif is_meaningful_quantifier(match.group('quantifier')):
+            quantified_spans.append(match.span())
+
+    return {
+        'line': line,
+        'strong_verbs': strong_verbs,
+        'weak_verbs': weak_verbs,
+        'quantified_spans': quantified_spans
+    }
+
+
+class ContentAnalysis:
+    """Accumulates the achievement-language analysis one descriptive (stripped, lowercased) line at a time."""
+    def __init__(self):
+        self.line_hits: List[Dict[str, Any]] = []
+        self._strong_lines = set()
+        self._weak_lines = set()
+
+    def add_line(self, line: str):
+        self.add_classified_line(classify_line(line))
+
+    def add_classified_line(self, line_info: Dict[str, Any]):
+        """Add a line already classified by classify_line."""
+        line = line_info['line']
+        if line_info['strong_verbs'] or line_info['weak_verbs'] or line_info['quantified_spans']:
+            self.line_hits.append(line_info)
+
+        if line_info['strong_verbs'] and line_info['quantified_spans']:
+            self._strong_lines.add(line)
+        elif line_info['weak_verbs']:
+            self._weak_lines.add(line)
+
+    def result(self) -> Dict[str, Any]:
+        return {
+            'strong_action_lines': sorted(list(self._strong_lines), key=len, reverse=True),
+            'weak_action_lines': sorted(list(self._weak_lines), key=len, reverse=True),
+            'line_hits': self.line_hits
+        }
+
+
+def analyse_resume_content(text: TextInput) -> Dict[str, Any]:
     """Analyses the entire resume for achievement-oriented language."""
-    analysis = {
-        'strong_action_lines': [],
-        'weak_action_lines': [],
+    analysis = ContentAnalysis()
+    for line in as_document(text).descriptive_lines:
+        analysis.add_line(line)
+    return analysis.result()
+
+
+def analyse_line(line: str) -> Dict[str, Any]:
+    """
+    Run every line-oriented analysis on one cleaned line: skills, degree entry, key phrases,
+    achievement language (None for blank lines) and the readability line flags.
+    The result depends on nothing but the line, so it can be cached by the line's content.
+    """
+    line_lower = line.lower()
+    descriptive_line = line_lower.strip()
+    is_bullet, is_very_long = line_flags(line)
+    return {
+        # Skill variations never span lines, so matching line by line finds the same skills
+        'technical_skills': list(get_skill_matcher(get_taxonomy('technical')).find_matches(line_lower)),
+        'soft_skills': list(get_skill_matcher(get_taxonomy('soft')).find_matches(line_lower)),
+        'degree': degree_entry(line, line_lower),
+        'key_phrases': line_key_phrases(line),
+        'content': classify_line(descriptive_line) if descriptive_line else None,
+        'bullet': is_bullet,
+        'very_long': is_very_long
     }
-    
-    lines = text.split('\n')
-    descriptive_lines = [line.strip().lower() for line in lines if line.strip()]
-
-    quantified_pattern = re.compile(r'\b\d+[%kmgtb]?\b|\$[\d,.]+')
-
-    strong_lines_set = set()
-    weak_lines_set = set()
-
-    for line in descriptive_lines:
-        has_strong_verb = any(keyword in line for keyword in STRONG_ACTION_VERBS)
-        has_weak_verb = any(keyword in line for keyword in WEAK_ACTION_VERBS)
-        
-        quantifiers_in_line = quantified_pattern.findall(line)
-        is_quantified = False
-        if quantifiers_in_line:
-            for q in quantifiers_in_line:
-                numeric_part = re.sub(r'\D', '', q)
-                if numeric_part.isdigit():
-                    num = int(numeric_part)
-                    if not (1900 <= num <= 2099 and len(numeric_part) == 4):
-                        is_quantified = True
-                        break 
-
-
-        if has_strong_verb and is_quantified:
-            strong_lines_set.add(line)
-        elif has_weak_verb:
-            weak_lines_set.add(line)
-
-
-    analysis['strong_action_lines'] = sorted(list(strong_lines_set), key=len, reverse=True)
-    analysis['weak_action_lines'] = sorted(list(weak_lines_set), key=len, reverse=True)
-            
-    return analysis
 
 
-def extract_all_information(text: str) -> Dict[str, Any]:
-    """Extract all structured and unstructured information from the resume text."""
+class LineExtractor:
+    """
+    Incremental form of the line-oriented extractors (skills, degrees, key phrases and achievement
+    language) for text that arrives line by line, e.g. cleaned while a PDF is still being decoded.
+    Feeding every cleaned line and calling `results()` gives the same values as running the
+    extractors on the whole text; none of the lines are kept.
+    """
+    def __init__(self):
+        self._technical_matcher = get_skill_matcher(get_taxonomy('technical'))
+        self._soft_matcher = get_skill_matcher(get_taxonomy('soft'))
+        self._technical_skills = set()
+        self._soft_skills = set()
+        self._degrees = set()
+        self._key_phrases = set()
+        self._content = ContentAnalysis()
+
+    def feed(self, line: str):
+        """Process one cleaned line."""
+        self.feed_analysis(analyse_line(line))
+
+    def feed_analysis(self, analysis: Dict[str, Any]):
+        """Process the analyse_line result of the next line, e.g. taken from a line cache."""
+        self._technical_skills.update(analysis['technical_skills'])
+        self._soft_skills.update(analysis['soft_skills'])
+        if analysis['degree'] is not None:
+            self._degrees.add(analysis['degree'])
+        self._key_phrases.update(analysis['key_phrases'])
+        if analysis['content'] is not None:
+            self._content.add_classified_line(analysis['content'])
+
+    def results(self) -> Dict[str, Any]:
+        """Skills (in taxonomy order), degrees, key phrases and content analysis of the lines fed so far."""
+        logger.info(f"Found {len(self._degrees)} potential degree entries.")
+        logger.info(f"Found {len(self._key_phrases)} potential key phrases.")
+        return {
+            'technical_skills': self._technical_matcher.sort_skills(self._technical_skills),
+            'soft_skills': self._soft_matcher.sort_skills(self._soft_skills),
+            'degrees': list(self._degrees),
+            'key_phrases': list(self._key_phrases),
+            'content_analysis': self._content.result()
+        }
+
+
+def extract_all_information(text: TextInput, timings: Optional[Dict[str, int]] = None,
+                            line_results: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Extract all structured and unstructured information from the resume text.
+    If `timings` is given, the nanoseconds spent in each extractor are recorded in it.
+    `line_results` may supply the `LineExtractor.results()` of the text's lines, computed while
+    it was streamed, so only the whole-text extractors run here; its 'contact' entry, if any,
+    supplies the ContactExtractor result as well.
+    """
     logger.info("Extracting all information from cleaned text...")
+    document = as_document(text)
 
-    contact_info = extract_contact_info(text)
-    technical_skills = extract_skills(text, CIVIL_ENGINEERING_SKILLS)
-    soft_skills = extract_skills(text, SOFT_SKILLS)
-    degrees = find_potential_degrees(text)
-    key_phrases_raw = extract_key_phrases(text)
+    if line_results is not None and 'contact' in line_results:
+        contact_info = line_results['contact']
+    else:
+        with timed(timings, 'extract.contact'):
+            contact_info = extract_contact_info(document.text)
+    if line_results is not None:
+        technical_skills = line_results['technical_skills']
+        soft_skills = line_results['soft_skills']
+        degrees = line_results['degrees']
+        key_phrases_raw = line_results['key_phrases']
+    else:
+        with timed(timings, 'extract.technical_skills'):
+            technical_skills = extract_skills(document, get_taxonomy('technical'))
+        with timed(timings, 'extract.soft_skills'):
+            soft_skills = extract_skills(document, get_taxonomy('soft'))
+        with timed(timings, 'extract.degrees'):
+            degrees = find_potential_degrees(document)
+        with timed(timings, 'extract.key_phrases'):
+            key_phrases_raw = extract_key_phrases(document)
 
-    # Filter out phrases that are already skills
-    all_skills_lower = {s.lower() for s in technical_skills} | {s.lower() for s in soft_skills}
-    key_phrases = [phrase for phrase in key_phrases_raw if phrase.lower() not in all_skills_lower]
-    if len(key_phrases_raw) != len(key_phrases):
-        logger.info(f"Filtered key phrases, removed {len(key_phrases_raw) - len(key_phrases)} phrases that were also skills.")
+    key_phrases = filter_key_phrases(key_phrases_raw, technical_skills, soft_skills)
     
-    content_analysis = analyse_resume_content(text)
-
-    summary = {
-        'has_email': bool(contact_info.get('emails')),
-        'has_phone': bool(contact_info.get('phones')),
-        'total_technical_skills': len(technical_skills),
-        'total_soft_skills': len(soft_skills),
-        'total_key_phrases': len(key_phrases),
-        'total_degrees': len(degrees)
-    }
+    if line_results is not None:
+        content_analysis = line_results['content_analysis']
+    else:
+        with timed(timings, 'extract.content_analysis'):
+            content_analysis = analyse_resume_content(document)
 
     return {
         'contact': contact_info,
@@ -141,19 +268,100 @@ def extract_all_information(text: str) -> Dict[str, Any]:
         'key_phrases': key_phrases,
         'degrees': degrees,
         'content_analysis': content_analysis,
-        'summary': summary
+        'summary': summarise_extraction(contact_info, technical_skills, soft_skills, key_phrases, degrees)
     }
 
 
+def with_contact_info(extracted_info: Dict[str, Any], contact_info: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    A copy of `extract_all_information` output with another resume's contact details and a summary
+    recomputed for them, for reusing the extraction of a near-duplicate resume.
+    """
+    return dict(extracted_info, contact=contact_info, summary=summarise_extraction(
+        contact_info, extracted_info['technical_skills'], extracted_info['soft_skills'],
+        extracted_info['key_phrases'], extracted_info['degrees']))
+
+
+def filter_key_phrases(key_phrases: List[str], technical_skills: List[str], soft_skills: List[str]) -> List[str]:
+    """Filter out phrases that are already skills."""
+    all_skills_lower = {s.lower() for s in technical_skills} | {s.lower() for s in soft_skills}
+    filtered = [phrase for phrase in key_phrases if phrase.lower() not in all_skills_lower]
+    if len(key_phrases) != len(filtered):
+        logger.info(f"Filtered key phrases, removed {len(key_phrases) - len(filtered)} phrases that were also skills.")
+    return filtered
+
+
+def summarise_extraction(contact_info: Dict[str, Any], technical_skills: List[str], soft_skills: List[str],
+                         key_phrases: List[str], degrees: List[str]) -> Dict[str, Any]:
+    """Counts and flags summarising the extracted information."""
+    return {
+        'has_email': bool(contact_info.get('emails')),
+        'has_phone': bool(contact_info.get('phones')),
+        'total_technical_skills': len(technical_skills),
+        'total_soft_skills': len(soft_skills),
+        'total_key_phrases': len(key_phrases),
+        'total_degrees': len(degrees)
+    }
+
+
+EMAIL_PATTERN = re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b')
+PHONE_PATTERN = re.compile(r'[\d\s()-]{9,}')
+# Runs of phone characters of any length, for text that arrives line by line
+PHONE_RUN_PATTERN = re.compile(r'[\d\s()-]+')
+NON_DIGIT_PATTERN = re.compile(r'\D')
+MIN_PHONE_DIGITS = 9
+
+
 def extract_contact_info(text: str) -> dict:
     """Extract contact information from resume text with relaxed phone number parsing."""
     contact_info = {}
-    email_pattern = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
-    contact_info['emails'] = list(set(re.findall(email_pattern, text)))
+    contact_info['emails'] = list(set(EMAIL_PATTERN.findall(text)))
     
-    phone_pattern = r'[\d\s()-]{9,}'
-    potential_phones = re.findall(phone_pattern, text)
-    contact_info['phones'] = [re.sub(r'\D', '', p) for p in potential_phones if len(re.sub(r'\D', '', p)) >= 9]
+    potential_phones = PHONE_PATTERN.findall(text)
+    contact_info['phones'] = [NON_DIGIT_PATTERN.sub('', p) for p in potential_phones
+                              if len(NON_DIGIT_PATTERN.sub('', p)) >= MIN_PHONE_DIGITS]
     
     logger.debug(f"Extracted contact info: {len(contact_info['emails'])} emails, {len(contact_info['phones'])} phones")
-    return contact_info
\ No newline at end of file
+    return contact_info
+
+
+class ContactExtractor:
+    """
+    Computes extract_contact_info for a text fed one line at a time (the lines it would be split into).
+    Emails never span lines; a phone number may run on across line breaks, so only the digits of
+    the run still open at the end of the last line are carried over to the next.
+    """
+
+    def __init__(self):
+        self._emails = set()
+        self._phones: List[str] = []
+        self._run_digits = ""
+        self._lines = 0
+
+    def feed(self, line: str):
+        """Process the next line."""
+        self._emails.update(EMAIL_PATTERN.findall(line))
+        # Lines after the first are joined to the text by a line break, itself a phone character
+        chunk = line if self._lines == 0 else '\n' + line
+        self._lines += 1
+        run_end = None
+        for match in PHONE_RUN_PATTERN.finditer(chunk):
+            if match.start() > 0:
+                self._end_run()
+            self._run_digits += NON_DIGIT_PATTERN.sub('', match.group())
+            run_end = match.end()
+        if run_end != len(chunk):
+            self._end_run()
+
+    def _end_run(self):
+        if len(self._run_digits) >= MIN_PHONE_DIGITS:
+            self._phones.append(self._run_digits)
+        self._run_digits = ""
+
+    def result(self) -> Dict[str, Any]:
+        """The contact information of the lines fed so far."""
+        phones = list(self._phones)
+        if len(self._run_digits) >= MIN_PHONE_DIGITS:
+            phones.append(self._run_digits)
+        logger.debug(f"Extracted contact info: {len(self._emails)} emails, {len(phones)} phones")
+        return {'emails': list(self._emails), 'phones': phones}
@@ -0,0 +1,265 @@
+"""Near-duplicate resume detection with MinHash signatures and an LSH index."""
+
+import json
+import time
+import zlib
+import sqlite3
+import logging
+from pathlib import Path
+from typing import Dict, Any, List, Tuple, Iterable, Optional, Union
+
+import numpy as np
+
+from .document import ResumeDocument
+from .skill_matcher import WORD_PATTERN
+from .extractors import EXTRACTOR_VERSION
+from .scorers import SCORER_VERSION
+from .taxonomy import taxonomy_key
+
+logger = logging.getLogger(__name__)
+
+# Bump whenever signatures change (shingling, hashing or permutations) so stored ones are discarded
+FINGERPRINT_VERSION = "1"
+
+SHINGLE_SIZE = 5
+NUM_PERM = 128
+DEFAULT_THRESHOLD = 0.9
+
+# Candidates are verified against the threshold, so a missed duplicate costs more than an extra candidate
+FALSE_NEGATIVE_WEIGHT = 0.9
+
+# Permutations a * x + b (mod 2^32, odd a) of the 32-bit shingle hashes. uint32 arithmetic wraps
+# for free; on resume-sized texts this estimates similarity as well as hashing modulo a prime
+_random = np.random.RandomState(1)
+_PERM_A = _random.randint(0, 1 << 32, size=NUM_PERM, dtype=np.uint64).astype(np.uint32) | np.uint32(1)
+_PERM_B = _random.randint(0, 1 << 32, size=NUM_PERM, dtype=np.uint64).astype(np.uint32)
+# Multipliers combining the token hashes of a shingle
+_SHINGLE_MULTIPLIERS = _random.randint(0, 1 << 32, size=SHINGLE_SIZE, dtype=np.uint64).astype(np.uint32) | np.uint32(1)
+
+def _token_hashes(tokens: List[str]) -> np.ndarray:
+    return np.fromiter((zlib.crc32(token.encode('utf-8')) for token in tokens), dtype=np.uint32, count=len(tokens))
+
+def _combine_shingles(token_hashes: np.ndarray, size: int) -> np.ndarray:
+    """Hashes of every run of `size` consecutive token hashes."""
+    count = len(token_hashes) - size + 1
+    hashes = np.zeros(count, dtype=np.uint32)
+    for offset in range(size):
+        hashes += token_hashes[offset:offset + count] * _SHINGLE_MULTIPLIERS[offset]
+    return hashes
+
+def _min_hashes(hashes: np.ndarray) -> np.ndarray:
+    if len(hashes) == 0:
+        return np.full(NUM_PERM, np.iinfo(np.uint32).max, dtype=np.uint32)
+    return (np.outer(hashes, _PERM_A) + _PERM_B).min(axis=0)
+
+def shingle_hashes(tokens: List[str], size: int = SHINGLE_SIZE) -> np.ndarray:
+    """
+    Distinct 32-bit hashes of every run of `size` consecutive tokens (the whole text if it is shorter).
+    Each token is hashed once (CRC-32) and the shingle hashes are combined from them with numpy.
+    """
+    size = min(size, len(tokens))
+    if not size:
+        return np.zeros(0, dtype=np.uint32)
+    return np.unique(_combine_shingles(_token_hashes(tokens), size))
+
+def minhash_signature(tokens: List[str]) -> np.ndarray:
+    """MinHash signature (NUM_PERM values) of the token shingles; equal positions estimate Jaccard similarity."""
+    return _min_hashes(shingle_hashes(tokens))
+
+def document_signature(document: ResumeDocument) -> np.ndarray:
+    """MinHash signature of a cleaned resume's lowercased words."""
+    return minhash_signature([token for token, _ in document.lower_word_tokens])
+
+class SignatureBuilder:
+    """
+    Computes document_signature for a text fed one line at a time (the lines it would be split into).
+    Shingles run on across lines, so the hashes of the last SHINGLE_SIZE - 1 tokens are carried
+    over; otherwise only the running minimum of every permutation is kept.
+    """
+
+    def __init__(self):
+        self._tail = np.zeros(0, dtype=np.uint32)
+        self._token_count = 0
+        self._signature = _min_hashes(self._tail)
+
+    def feed(self, line: str):
+        """Process the next line."""
+        tokens = WORD_PATTERN.findall(line.lower())
+        if not tokens:
+            return
+        token_hashes = np.concatenate((self._tail, _token_hashes(tokens)))
+        self._token_count += len(tokens)
+        if len(token_hashes) >= SHINGLE_SIZE:
+            np.minimum(self._signature, _min_hashes(_combine_shingles(token_hashes, SHINGLE_SIZE)), out=self._signature)
+        self._tail = token_hashes[-(SHINGLE_SIZE - 1):]
+
+    def result(self) -> np.ndarray:
+        """The signature of the lines fed so far."""
+        if self._token_count < SHINGLE_SIZE:
+            # Shorter than a shingle: the whole text is the only one
+            return _min_hashes(_combine_shingles(self._tail, self._token_count) if self._token_count else self._tail)
+        return self._signature.copy()
+
+def estimate_similarity(signature: np.ndarray, other: np.ndarray) -> float:
+    """Estimated Jaccard similarity of the shingle sets behind two signatures."""
+    return float(np.count_nonzero(signature == other)) / len(signature)
+
+def lsh_parameters(threshold: float, num_perm: int = NUM_PERM) -> Tuple[int, int]:
+    """
+    Choose (bands, rows per band) so that pairs around `threshold` become candidates: minimises the
+    weighted chance of missing pairs above the threshold plus the chance of pairing ones below it.
+    """
+    similarities = np.linspace(0.0, 1.0, 201)
+    best = None
+    for rows in range(1, num_perm + 1):
+        bands = num_perm // rows
+        candidate = 1.0 - (1.0 - similarities ** rows) ** bands
+        false_positives = candidate[similarities < threshold].sum()
+        false_negatives = (1.0 - candidate[similarities >= threshold]).sum()
+        error = (1.0 - FALSE_NEGATIVE_WEIGHT) * false_positives + FALSE_NEGATIVE_WEIGHT * false_negatives
+        if best is None or error < best[0]:
+            best = (error, bands, rows)
+    return best[1], best[2]
+
+def results_version() -> str:
+    """Identifies the extractor and scorer code and the taxonomies that stored results were computed with."""
+    return f"{EXTRACTOR_VERSION}:{SCORER_VERSION}:{taxonomy_key() or 'builtin'}"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    name TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS fingerprints (
+    key TEXT PRIMARY KEY,
+    signature BLOB NOT NULL,
+    job_hash TEXT,
+    results BLOB,
+    added_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS buckets (
+    band INTEGER NOT NULL,
+    bucket INTEGER NOT NULL,
+    key TEXT NOT NULL,
+    PRIMARY KEY (band, bucket, key)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS buckets_key ON buckets (key);
+"""
+
+class DuplicateIndex:
+    """
+    LSH index of MinHash signatures kept in SQLite (in memory by default, or in a file shared
+    by batch workers and later runs). Each signature is split into bands, and resumes sharing
+    a band are candidates; candidates whose estimated similarity reaches `threshold` are
+    near-duplicates. The analysis results of each resume can be stored with its signature
+    so a near-duplicate can reuse them instead of being analysed again, as long as they were
+    computed by the current extractors, scorers and taxonomies.
+    """
+
+    def __init__(self, db_path: Union[str, Path] = ':memory:', threshold: float = DEFAULT_THRESHOLD):
+        if not 0.0 < threshold <= 1.0:
+            raise ValueError(f"Similarity threshold must be in (0, 1], got {threshold}")
+        self.threshold = threshold
+        self.bands, self.rows = lsh_parameters(threshold)
+        self.connection = sqlite3.connect(str(db_path), timeout=30)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript(SCHEMA)
+        self._check_layout()
+
+    def _check_layout(self):
+        """Drop signatures from another fingerprint version and re-band stored ones for this threshold."""
+        meta = dict(self.connection.execute("SELECT name, value FROM meta"))
+        layout = f"{self.bands}x{self.rows}"
+        with self.connection:
+            if meta.get('version') != FINGERPRINT_VERSION:
+                self.connection.execute("DELETE FROM fingerprints")
+                self.connection.execute("DELETE FROM buckets")
+            elif meta.get('layout') != layout:
+                logger.info(f"Re-banding stored signatures for threshold {self.threshold} ({layout})")
+                self.connection.execute("DELETE FROM buckets")
+                rows = self.connection.execute("SELECT key, signature FROM fingerprints").fetchall()
+                self.connection.executemany("INSERT OR IGNORE INTO buckets VALUES (?, ?, ?)", [
+                    bucket + (key,) for key, blob in rows for bucket in self._buckets(self._decode(blob))])
+            self.connection.executemany("INSERT OR REPLACE INTO meta VALUES (?, ?)",
+                                        [('version', FINGERPRINT_VERSION), ('layout', layout)])
+
+    def close(self):
+        self.connection.close()
+
+    def __enter__(self) -> "DuplicateIndex":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __len__(self) -> int:
+        return self.connection.execute("SELECT COUNT(*) FROM fingerprints").fetchone()[0]
+
+    @staticmethod
+    def _decode(blob: bytes) -> np.ndarray:
+        return np.frombuffer(blob, dtype=np.uint32)
+
+    def _buckets(self, signature: np.ndarray) -> List[Tuple[int, int]]:
+        return [(band, zlib.crc32(signature[band * self.rows:(band + 1) * self.rows].tobytes()))
+                for band in range(self.bands)]
+
+    def add(self, key: str, signature: np.ndarray, results: Optional[Dict[str, Any]] = None,
+            job_hash: Optional[str] = None):
+        """Index a resume's signature, replacing any previous entry with the same key, with optional results to reuse."""
+        blob = None if results is None else zlib.compress(json.dumps(
+            dict(results, version=results_version()), ensure_ascii=False, separators=(',', ':')).encode('utf-8'), 1)
+        with self.connection:
+            self.connection.execute("DELETE FROM buckets WHERE key = ?", (key,))
+            self.connection.execute("INSERT OR REPLACE INTO fingerprints VALUES (?, ?, ?, ?, ?)",
+                                    (key, signature.astype(np.uint32).tobytes(), job_hash, blob, time.time()))
+            self.connection.executemany("INSERT OR IGNORE INTO buckets VALUES (?, ?, ?)",
+                                        [bucket + (key,) for bucket in self._buckets(signature)])
+
+    def find(self, signature: np.ndarray, exclude: Optional[str] = None) -> List[Tuple[str, float]]:
+        """Return (key, estimated similarity) of the indexed near-duplicates of a signature, most similar first."""
+        buckets = self._buckets(signature)
+        candidates = self.connection.execute(
+            "SELECT f.key, f.signature FROM fingerprints f WHERE f.key IN ("
+            "SELECT b.key FROM buckets b JOIN (VALUES " + ", ".join(["(?, ?)"] * len(buckets)) + ") AS v "
+            "ON b.band = v.column1 AND b.bucket = v.column2)",
+            [value for bucket in buckets for value in bucket]).fetchall()
+        matches = []
+        for key, blob in candidates:
+            if key == exclude:
+                continue
+            similarity = estimate_similarity(signature, self._decode(blob))
+            if similarity >= self.threshold:
+                matches.append((key, similarity))
+        matches.sort(key=lambda match: (-match[1], match[0]))
+        logger.debug(f"Duplicate index: {len(candidates)} candidate(s), {len(matches)} near-duplicate(s)")
+        return matches
+
+    def get_results(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Return the results stored with a resume (plus the hash of the job they were scored against),
+        or None if there are none or they were computed by other extractor, scorer or taxonomy versions.
+        """
+        row = self.connection.execute("SELECT results, job_hash FROM fingerprints WHERE key = ?", (key,)).fetchone()
+        if row is None or row[0] is None:
+            return None
+        results = json.loads(zlib.decompress(row[0]).decode('utf-8'))
+        if results.pop('version', None) != results_version():
+            logger.info(f"Stored results of {key} are from another extractor, scorer or taxonomy version")
+            return None
+        results['job_hash'] = row[1]
+        return results
+
+def find_near_duplicates(documents: Iterable[Tuple[str, ResumeDocument]],
+                         threshold: float = DEFAULT_THRESHOLD) -> List[Tuple[str, str, float]]:
+    """Return (key, earlier key, similarity) for every document that nearly duplicates an earlier one."""
+    index = DuplicateIndex(threshold=threshold)
+    duplicates = []
+    for key, document in documents:
+        signature = document_signature(document)
+        matches = index.find(signature)
+        if matches:
+            duplicates.append((key, matches[0][0], matches[0][1]))
+        index.add(key, signature)
+    index.close()
+    return duplicates
@@ -0,0 +1,202 @@
+"""Approximate skill name matching with a trigram index and bounded edit distance."""
+
+import logging
+from collections import Counter
+from typing import Dict, List, Set, Tuple, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+GRAM_SIZE = 3
+PAD = '\0'
+
+def word_edit_budget(word: str) -> int:
+    """
+    Edits allowed between two versions of a word of this length: none for short words and
+    words with digits ('pile' is not 'pipe', '2d' is not '3d'), one up to 10 characters
+    ('modeling'/'modelling'), two beyond ('organisation'/'organizaton').
+    """
+    if len(word) <= 4 or any(char.isdigit() for char in word):
+        return 0
+    return 1 if len(word) <= 10 else 2
+
+def bounded_edit_distance(a: str, b: str, limit: int) -> Optional[int]:
+    """
+    Edit distance (insertions, deletions, substitutions and adjacent transpositions) between
+    two strings, or None as soon as it is known to exceed `limit`.
+    """
+    if abs(len(a) - len(b)) > limit:
+        return None
+    previous_row = None
+    row = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        before, previous_row, row = previous_row, row, [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            row[j] = min(previous_row[j] + 1, row[j - 1] + 1, previous_row[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                row[j] = min(row[j], before[j - 2] + 1)
+        if min(row) > limit:
+            return None
+    return row[-1] if row[-1] <= limit else None
+
+def fuzzy_distance(a: str, b: str) -> Optional[int]:
+    """
+    Total edits between two lowercased skill names with the same number of words, each pair of
+    words within the smaller budget of the two (word_edit_budget); None if they are further apart.
+    """
+    words_a = a.split()
+    words_b = b.split()
+    if len(words_a) != len(words_b):
+        return None
+    total = 0
+    for word_a, word_b in zip(words_a, words_b):
+        if word_a == word_b:
+            continue
+        distance = bounded_edit_distance(word_a, word_b, min(word_edit_budget(word_a), word_edit_budget(word_b)))
+        if distance is None:
+            return None
+        total += distance
+    return total
+
+def match_confidence(a: str, b: str) -> float:
+    """
+    How well two lowercased skill names match: 1.0 when equal or when either contains the
+    other, 1 - edits / length for spelling variants and typos within the edit budget, else 0.0.
+    """
+    if a in b or b in a:
+        return 1.0
+    distance = fuzzy_distance(a, b)
+    return 0.0 if distance is None else 1.0 - distance / max(len(a), len(b))
+
+def _grams(term: str) -> Counter:
+    padded = PAD * (GRAM_SIZE - 1) + term + PAD * (GRAM_SIZE - 1)
+    return Counter(padded[i:i + GRAM_SIZE] for i in range(len(padded) - GRAM_SIZE + 1))
+
+class FuzzySkillIndex:
+    """
+    Trigram index over lowercased skill names. `matches(term)` returns every indexed name with
+    a non-zero match_confidence against the term, without comparing the term to each name:
+    names containing the term must hold all of its trigrams, names inside it can only hold its
+    trigrams, and names within k edits share at least len + 2 - 4k padded trigrams with it
+    (a transposition changes up to four), so only names passing those counts are verified.
+    Names can be added and removed at any time.
+    """
+
+    def __init__(self, terms: Iterable[str] = ()):
+        # Padded trigram -> {name: occurrences}
+        self._postings: Dict[str, Dict[str, int]] = {}
+        self._grams: Dict[str, Counter] = {}
+        # Distinct trigrams of each name that contain no padding
+        self._inner_counts: Dict[str, int] = {}
+        # Names too short to have an inner trigram
+        self._short: Set[str] = set()
+        # Names with repeated or outer whitespace, which fuzzy_distance ignores but trigrams do not
+        self._spaced: Set[str] = set()
+        self._memo: Dict[str, Dict[str, float]] = {}
+        for term in terms:
+            self.add(term)
+
+    def __len__(self) -> int:
+        return len(self._grams)
+
+    def __contains__(self, term: str) -> bool:
+        return term in self._grams
+
+    def add(self, term: str):
+        """Index a lowercased skill name."""
+        if term in self._grams:
+            return
+        grams = _grams(term)
+        self._grams[term] = grams
+        for gram, count in grams.items():
+            self._postings.setdefault(gram, {})[term] = count
+        self._inner_counts[term] = sum(1 for gram in grams if PAD not in gram)
+        if len(term) < GRAM_SIZE:
+            self._short.add(term)
+        if ' '.join(term.split()) != term:
+            self._spaced.add(term)
+        self._memo.clear()
+
+    def remove(self, term: str) -> bool:
+        """Remove a name from the index. Returns False if it was not indexed."""
+        grams = self._grams.pop(term, None)
+        if grams is None:
+            return False
+        for gram in grams:
+            postings = self._postings[gram]
+            del postings[term]
+            if not postings:
+                del self._postings[gram]
+        del self._inner_counts[term]
+        self._short.discard(term)
+        self._spaced.discard(term)
+        self._memo.clear()
+        return True
+
+    def matches(self, term: str) -> Dict[str, float]:
+        """Indexed names matching a lowercased term, with their match_confidence."""
+        found = self._memo.get(term)
+        if found is None:
+            found = {name: 1.0 for name in self._containing(term) | self._contained_in(term)}
+            for name, confidence in self._near(term).items():
+                found.setdefault(name, confidence)
+            self._memo[term] = found
+        return found
+
+    def _containing(self, term: str) -> Set[str]:
+        inner = [gram for gram in _grams(term) if PAD not in gram]
+        if not inner:
+            return {name for name in self._grams if term in name}
+        postings = sorted((self._postings.get(gram, {}) for gram in inner), key=len)
+        candidates = set(postings[0])
+        for names in postings[1:]:
+            candidates.intersection_update(names)
+            if not candidates:
+                break
+        return {name for name in candidates if term in name}
+
+    def _contained_in(self, term: str) -> Set[str]:
+        shared: Dict[str, int] = {}
+        for gram in _grams(term):
+            if PAD not in gram:
+                for name in self._postings.get(gram, ()):
+                    shared[name] = shared.get(name, 0) + 1
+        found = {name for name, count in shared.items() if count == self._inner_counts[name] and name in term}
+        found.update(name for name in self._short if name in term)
+        return found
+
+    def _near(self, term: str) -> Dict[str, float]:
+        limit = sum(word_edit_budget(word) for word in term.split())
+        # fuzzy_distance only compares words, so bound the trigrams of the single-spaced term
+        words = ' '.join(term.split())
+        if limit == 0 and words == term and not self._spaced:
+            return {}
+        shared: Dict[str, int] = {}
+        for gram, count in _grams(words).items():
+            for name, name_count in self._postings.get(gram, {}).items():
+                shared[name] = shared.get(name, 0) + min(count, name_count)
+        required = len(words) + GRAM_SIZE - 1 - (GRAM_SIZE + 1) * limit
+        candidates = {name for name, count in shared.items()
+                      if count >= required and abs(len(name) - len(words)) <= limit}
+        near = {}
+        for name in candidates | self._spaced:
+            distance = fuzzy_distance(term, name)
+            if distance is not None:
+                near[name] = 1.0 - distance / max(len(term), len(name))
+        return near
+
+def best_matches(index: FuzzySkillIndex, skills: Iterable[str]) -> Dict[str, Tuple[str, float]]:
+    """
+    For every indexed name some skill matches, the best-matching skill and its confidence
+    (ties go to the alphabetically first skill).
+    """
+    best: Dict[str, Tuple[str, float]] = {}
+    for skill in sorted(skills):
+        for name, confidence in index.matches(skill).items():
+            if name not in best or confidence > best[name][1]:
+                best[name] = (skill, confidence)
+    return best
+
+def approximate_matches(terms: Iterable[str], best: Dict[str, Tuple[str, float]]) -> List[Tuple[str, str, float]]:
+    """(term, skill, confidence) of the terms, in order and without repeats, matched only approximately."""
+    return [(term, *best[term]) for term in dict.fromkeys(terms) if term in best and best[term][1] < 1.0]
@@ -1,5 +1,16 @@
 """Job description data for resume matching."""
 
+import json
+import logging
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Any, List, Optional, FrozenSet, Union
+
+from .cache import hash_bytes
+from .fuzzy_match import FuzzySkillIndex
+
+logger = logging.getLogger(__name__)
+
 # New job description based on user-provided keywords and structure
 JOB_DESCRIPTION = {
     "title": "Civil Engineer - Early Career (Generic)",
@@ -55,4 +66,150 @@ JOB_DESCRIPTION = {
 
 def get_job_requirements():
     """Get the current job requirements for matching."""
-    return JOB_DESCRIPTION 
\ No newline at end of file
+    return JOB_DESCRIPTION 
+
+# --- Job registry ---
+
+DEFAULT_JOB_ID = "default"
+JOB_FILE_SUFFIXES = ('.json', '.toml')
+
+class PreparedJob:
+    """
+    Job requirements compiled once for matching: every requirement list is lowercased
+    and merged up front instead of on every resume that is scored against the job.
+    """
+
+    def __init__(self, job_id: str, requirements: Dict[str, Any]):
+        self.job_id = job_id
+        self.requirements = requirements
+        self.title = requirements.get('title', job_id)
+        # Identifies the requirements themselves, whatever file or ID they came from
+        self.content_hash = hash_bytes(json.dumps(requirements, sort_keys=True).encode('utf-8'))
+
+        essential = requirements.get('essential', {})
+        self.degree_terms = [d.lower() for d in essential.get('degrees', [])]
+        self.field_terms = [f.lower() for f in essential.get('fields_of_study', [])]
+
+        hard_skills = requirements.get('hard_skills', {})
+        self.hard_terms = [s.lower() for group in ('software', 'engineering_disciplines', 'technical_tasks')
+                           for s in hard_skills.get(group, [])]
+        # Resume skills are matched against the hard terms through this index (exact, containment or fuzzy)
+        self.hard_index = FuzzySkillIndex(self.hard_terms)
+
+        # One set of search terms (the skill and its synonyms) per required soft skill
+        soft_map = requirements.get('soft_matches', {})
+        self.soft_groups: List[FrozenSet[str]] = [
+            frozenset({key.lower()} | {s.lower() for s in soft_map.get(key, [])})
+            for key in requirements.get('hard_matches', [])
+        ]
+
+def prepare_job(job: Union[Dict[str, Any], PreparedJob], job_id: str = DEFAULT_JOB_ID) -> PreparedJob:
+    """Compile a job requirements dict, passing already prepared jobs through unchanged."""
+    if isinstance(job, PreparedJob):
+        return job
+    return PreparedJob(job_id, job)
+
+_DEFAULT_JOB: Optional[PreparedJob] = None
+
+def get_default_job() -> PreparedJob:
+    """Get the built-in job requirements, compiled once."""
+    global _DEFAULT_JOB
+    if _DEFAULT_JOB is None:
+        _DEFAULT_JOB = PreparedJob(DEFAULT_JOB_ID, JOB_DESCRIPTION)
+    return _DEFAULT_JOB
+
+def _decode_job(path: Path, data: bytes) -> Dict[str, Any]:
+    """Parse a JSON or TOML job definition read from `path`."""
+    if path.suffix.lower() == '.toml':
+        try:
+            import tomllib
+        except ImportError:
+            raise ValueError(f"Cannot read {path}: TOML job files need Python 3.11 or newer")
+        requirements = tomllib.loads(data.decode('utf-8'))
+    else:
+        requirements = json.loads(data)
+    if not isinstance(requirements, dict):
+        raise ValueError(f"Job file {path} must contain a single object of job requirements")
+    return requirements
+
+class JobRegistry:
+    """
+    Job definitions loaded from a directory of JSON/TOML files (one job per file, the file
+    stem is the job ID), plus the built-in job under DEFAULT_JOB_ID.
+
+    Compiled jobs are kept in an LRU cache bounded by the total size of their source files.
+    A cached job is reused while its file's mtime and size are unchanged; otherwise the file
+    is re-read and only recompiled if its content hash differs.
+    """
+
+    def __init__(self, jobs_dir: Optional[Union[str, Path]] = None, max_bytes: int = 32 * 1024 * 1024):
+        self.jobs_dir = Path(jobs_dir) if jobs_dir else None
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.total_bytes = 0
+        # Resolved path -> cache entry, least recently used first
+        self._entries: "OrderedDict[Path, Dict[str, Any]]" = OrderedDict()
+
+    def list_jobs(self) -> List[str]:
+        """IDs of all available jobs, the built-in job first."""
+        job_ids = [DEFAULT_JOB_ID]
+        if self.jobs_dir and self.jobs_dir.is_dir():
+            job_ids.extend(sorted(path.stem for path in self.jobs_dir.iterdir()
+                                  if path.is_file() and path.suffix.lower() in JOB_FILE_SUFFIXES))
+        return job_ids
+
+    def resolve(self, job: str) -> Optional[Path]:
+        """Map a job ID or path to its definition file; None for the built-in job."""
+        if job == DEFAULT_JOB_ID:
+            return None
+        path = Path(job)
+        if path.suffix.lower() in JOB_FILE_SUFFIXES and path.is_file():
+            return path.resolve()
+        if self.jobs_dir:
+            for suffix in JOB_FILE_SUFFIXES:
+                candidate = self.jobs_dir / f"{job}{suffix}"
+                if candidate.is_file():
+                    return candidate.resolve()
+        raise ValueError(f"Unknown job '{job}'" + (f" (not found in {self.jobs_dir})" if self.jobs_dir else ""))
+
+    def get(self, job: Optional[str] = None) -> PreparedJob:
+        """Get the compiled job for an ID or file path (the built-in job if None)."""
+        path = self.resolve(job or DEFAULT_JOB_ID)
+        if path is None:
+            return get_default_job()
+
+        stat = path.stat()
+        entry = self._entries.get(path)
+        if entry is not None and entry['mtime_ns'] == stat.st_mtime_ns and entry['size'] == stat.st_size:
+            self.hits += 1
+            self._entries.move_to_end(path)
+            return entry['job']
+
+        data = path.read_bytes()
+        content_hash = hash_bytes(data)
+        if entry is not None and entry['hash'] == content_hash:
+            # Touched but not changed
+            self.hits += 1
+            entry['mtime_ns'] = stat.st_mtime_ns
+            self._entries.move_to_end(path)
+            return entry['job']
+
+        self.misses += 1
+        prepared = PreparedJob(path.stem, _decode_job(path, data))
+        logger.debug(f"Compiled job '{prepared.job_id}' from {path}")
+        self._forget(path)
+        self._entries[path] = {'mtime_ns': stat.st_mtime_ns, 'size': len(data), 'hash': content_hash, 'job': prepared}
+        self.total_bytes += len(data)
+        while self.total_bytes > self.max_bytes and len(self._entries) > 1:
+            self._forget(next(iter(self._entries)))
+        return prepared
+
+    def load_all(self) -> List[PreparedJob]:
+        """Compile every available job."""
+        return [self.get(job_id) for job_id in self.list_jobs()]
+
+    def _forget(self, path: Path):
+        entry = self._entries.pop(path, None)
+        if entry is not None:
+            self.total_bytes -= entry['size']
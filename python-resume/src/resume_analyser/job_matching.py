@@ -0,0 +1,231 @@
+"""Vectorized matching of one resume against many job descriptions."""
+
+import logging
+from typing import Dict, Any, List, Sequence, Tuple, Union
+
+import numpy as np
+
+from .scorers import JOB_MATCH_WEIGHTS, format_job_match_breakdown
+from .job_data import PreparedJob
+from .fuzzy_match import FuzzySkillIndex, best_matches, approximate_matches
+
+logger = logging.getLogger(__name__)
+
+class TermVocabulary:
+    """Assigns a dense integer ID to every distinct (lowercased) requirement term."""
+    def __init__(self):
+        self.ids: Dict[str, int] = {}
+        self.terms: List[str] = []
+
+    def add(self, term: str) -> int:
+        term_id = self.ids.get(term)
+        if term_id is None:
+            term_id = len(self.terms)
+            self.ids[term] = term_id
+            self.terms.append(term)
+        return term_id
+
+    def __len__(self) -> int:
+        return len(self.terms)
+
+class SparseRows:
+    """
+    Row-compressed sparse matrix (CSR layout: indptr / indices / data) built row by row.
+    Repeated column IDs in a row are summed into a multiplicity in `data`.
+    """
+    def __init__(self):
+        self._indptr = [0]
+        self._indices: List[int] = []
+        self._data: List[int] = []
+
+    def add_row(self, column_ids: Sequence[int]):
+        counts: Dict[int, int] = {}
+        for column_id in column_ids:
+            counts[column_id] = counts.get(column_id, 0) + 1
+        self._indices.extend(counts.keys())
+        self._data.extend(counts.values())
+        self._indptr.append(len(self._indices))
+
+    def freeze(self):
+        """Convert the accumulated rows into NumPy arrays."""
+        self.indptr = np.asarray(self._indptr, dtype=np.int64)
+        self.indices = np.asarray(self._indices, dtype=np.int64)
+        self.data = np.asarray(self._data, dtype=np.float64)
+        self.row_count = len(self._indptr) - 1
+        # Row number of every stored entry, for bincount-based row sums
+        self.row_ids = np.repeat(np.arange(self.row_count, dtype=np.int64), np.diff(self.indptr))
+        self.row_totals = np.bincount(self.row_ids, weights=self.data, minlength=self.row_count)
+        del self._indptr, self._indices, self._data
+
+    def matched(self, column_hits: np.ndarray) -> np.ndarray:
+        """Per row, the number of entries (with multiplicity) whose column is a hit."""
+        weights = self.data * column_hits[self.indices]
+        return np.bincount(self.row_ids, weights=weights, minlength=self.row_count)
+
+class JobMatchEngine:
+    """
+    Scores a resume against every job at once.
+
+    All requirement terms of all jobs are compiled into vocabularies, and each job into
+    sparse rows of term IDs. Scoring a resume resolves each distinct term once into a
+    hit vector, then the per-job counts for every job are a single sparse product.
+    Scores and breakdowns are identical to `calculate_job_match_score` per job.
+    """
+
+    def __init__(self, jobs: Sequence[Union[Dict[str, Any], PreparedJob]]):
+        self.job_ids = [job.job_id if isinstance(job, PreparedJob) else None for job in jobs]
+        self.titles = [job.title if isinstance(job, PreparedJob) else job.get('title', f"Job {index + 1}")
+                       for index, job in enumerate(jobs)]
+        self.jobs = [job.requirements if isinstance(job, PreparedJob) else job for job in jobs]
+
+        self.education_terms = TermVocabulary()
+        self.hard_terms = TermVocabulary()
+        self.soft_terms = TermVocabulary()
+        # A soft requirement is met when any of its search terms (key + synonyms) was found
+        self._soft_group_ids: Dict[Tuple[int, ...], int] = {}
+        self.soft_groups = SparseRows()
+
+        self.degree_rows = SparseRows()
+        self.field_rows = SparseRows()
+        self.hard_rows = SparseRows()
+        self.soft_rows = SparseRows()
+
+        for job in self.jobs:
+            self._add_job(job)
+
+        self.soft_groups.freeze()
+        for rows in (self.degree_rows, self.field_rows, self.hard_rows, self.soft_rows):
+            rows.freeze()
+
+        self._hard_index = FuzzySkillIndex(self.hard_terms.terms)
+        # Resume skill -> IDs of the hard terms it satisfies, filled on first use
+        self._hard_hits_by_skill: Dict[str, np.ndarray] = {}
+
+        logger.debug(f"Compiled job match engine: {len(self.jobs)} jobs, {len(self.hard_terms)} hard terms, "
+                     f"{len(self.soft_terms)} soft terms, {len(self.education_terms)} education terms")
+
+    def __len__(self) -> int:
+        return len(self.jobs)
+
+    def _add_job(self, job: Dict[str, Any]):
+        essential = job.get('essential', {})
+        self.degree_rows.add_row([self.education_terms.add(d.lower()) for d in essential.get('degrees', [])])
+        self.field_rows.add_row([self.education_terms.add(f.lower()) for f in essential.get('fields_of_study', [])])
+
+        hard_skills = job.get('hard_skills', {})
+        hard_terms = [s.lower() for group in ('software', 'engineering_disciplines', 'technical_tasks')
+                      for s in hard_skills.get(group, [])]
+        self.hard_rows.add_row([self.hard_terms.add(term) for term in hard_terms])
+
+        soft_map = job.get('soft_matches', {})
+        group_ids = []
+        for key in job.get('hard_matches', []):
+            search_terms = {key.lower()} | {s.lower() for s in soft_map.get(key, [])}
+            term_ids = tuple(sorted(self.soft_terms.add(term) for term in search_terms))
+            group_id = self._soft_group_ids.get(term_ids)
+            if group_id is None:
+                group_id = len(self._soft_group_ids)
+                self._soft_group_ids[term_ids] = group_id
+                self.soft_groups.add_row(term_ids)
+            group_ids.append(group_id)
+        self.soft_rows.add_row(group_ids)
+
+    def _hard_hits_for(self, skill: str) -> np.ndarray:
+        """IDs of the hard terms a resume skill satisfies: equal, either one containing the other, or a spelling variant."""
+        hits = self._hard_hits_by_skill.get(skill)
+        if hits is None:
+            hits = np.fromiter(sorted(self.hard_terms.ids[term] for term in self._hard_index.matches(skill)), dtype=np.int64)
+            self._hard_hits_by_skill[skill] = hits
+        return hits
+
+    def score_all(self, extracted_info: Dict[str, Any]) -> Dict[str, np.ndarray]:
+        """
+        Score a resume against every job.
+        Returns arrays indexed by job: 'percentage', the per-group scores and the raw match counts.
+        """
+        degrees_text = " ".join(extracted_info.get('degrees', [])).lower()
+        education_hits = np.fromiter((term in degrees_text for term in self.education_terms.terms),
+                                     dtype=np.float64, count=len(self.education_terms))
+
+        hard_hits = np.zeros(len(self.hard_terms), dtype=np.float64)
+        for skill in {s.lower() for s in extracted_info.get('technical_skills', [])}:
+            hard_hits[self._hard_hits_for(skill)] = 1.0
+
+        soft_hits = np.zeros(len(self.soft_terms), dtype=np.float64)
+        for skill in {s.lower() for s in extracted_info.get('soft_skills', [])}:
+            term_id = self.soft_terms.ids.get(skill)
+            if term_id is not None:
+                soft_hits[term_id] = 1.0
+        group_hits = (self.soft_groups.matched(soft_hits) > 0).astype(np.float64)
+
+        found_degree = self.degree_rows.matched(education_hits) > 0
+        found_field = self.field_rows.matched(education_hits) > 0
+        hard_matched = self.hard_rows.matched(hard_hits)
+        soft_matched = self.soft_rows.matched(group_hits)
+        hard_total = self.hard_rows.row_totals
+        soft_total = self.soft_rows.row_totals
+
+        education = 0.5 * found_degree + 0.5 * found_field
+        with np.errstate(divide='ignore', invalid='ignore'):
+            hard = np.where(hard_total > 0, hard_matched / hard_total, 1.0)
+            soft = np.where(soft_total > 0, soft_matched / soft_total, 1.0)
+
+        percentage = np.minimum(100, (education * JOB_MATCH_WEIGHTS['education'] +
+                                      hard * JOB_MATCH_WEIGHTS['hard_skills'] +
+                                      soft * JOB_MATCH_WEIGHTS['soft_skills']) * 100)
+        return {
+            'percentage': percentage,
+            'education': education,
+            'hard_skills': hard,
+            'soft_skills': soft,
+            'found_degree': found_degree,
+            'found_field': found_field,
+            'hard_matched': hard_matched,
+            'hard_total': hard_total,
+            'soft_matched': soft_matched,
+            'soft_total': soft_total
+        }
+
+    def top_k(self, extracted_info: Dict[str, Any], k: int = 10) -> List[Dict[str, Any]]:
+        """
+        Return the k best-matching jobs, best first (ties keep job order).
+        Each entry has the job index, ID (for prepared jobs) and title, the match percentage, the per-group
+        scores and the same breakdown text as `calculate_job_match_score`.
+        """
+        if not self.jobs or k <= 0:
+            return []
+        results = self.score_all(extracted_info)
+        percentage = results['percentage']
+
+        k = min(k, len(self.jobs))
+        candidates = np.argpartition(-percentage, k - 1)[:k] if k < len(self.jobs) else np.arange(len(self.jobs))
+        # Jobs tied with the k-th score may have been left out arbitrarily; take all of them
+        threshold = percentage[candidates].min()
+        candidates = np.flatnonzero(percentage >= threshold)
+        ranked = candidates[np.lexsort((candidates, -percentage[candidates]))][:k]
+
+        # Best resume skill per hard term, to name the approximate matches in the breakdowns
+        hard_matches = best_matches(self._hard_index, {s.lower() for s in extracted_info.get('technical_skills', [])})
+        top = []
+        for index in ranked:
+            index = int(index)
+            row = self.hard_rows.indices[self.hard_rows.indptr[index]:self.hard_rows.indptr[index + 1]]
+            feedback = format_job_match_breakdown(
+                bool(results['found_degree'][index]), bool(results['found_field'][index]),
+                int(results['hard_matched'][index]), int(results['hard_total'][index]),
+                int(results['soft_matched'][index]), int(results['soft_total'][index]),
+                approximate_matches((self.hard_terms.terms[term_id] for term_id in row), hard_matches)
+            )
+            top.append({
+                'job_index': index,
+                'job_id': self.job_ids[index],
+                'title': self.titles[index],
+                'percentage': float(percentage[index]),
+                'scores': {
+                    'education': float(results['education'][index]),
+                    'hard_skills': float(results['hard_skills'][index]),
+                    'soft_skills': float(results['soft_skills'][index])
+                },
+                'feedback': feedback
+            })
+        return top
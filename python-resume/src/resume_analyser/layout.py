@@ -0,0 +1,76 @@
+"""Layout analysis helpers shared by the layout-aware parsers."""
+
+import heapq
+import logging
+from typing import Dict, Any, List, Sequence, Set
+
+logger = logging.getLogger(__name__)
+
+# A bounding box as (x0, y0, x1, y1), the order PyMuPDF uses
+BBox = Sequence[float]
+
+def detect_columns(bboxes: Sequence[BBox], min_vertical_overlap: float = 50.0,
+                   min_horizontal_separation: float = 100.0) -> Dict[str, Any]:
+    """
+    Detect side-by-side text columns from block bounding boxes.
+
+    Two blocks indicate columns when they overlap vertically by more than
+    `min_vertical_overlap` and their left edges are more than `min_horizontal_separation`
+    apart. Blocks are swept top to bottom while the blocks still tall enough to overlap
+    the current one are kept in heaps ordered by left edge, so only the leftmost and
+    rightmost candidates need checking: O(n log n) instead of comparing every pair.
+    """
+    order = sorted(range(len(bboxes)), key=lambda index: bboxes[index][1])
+
+    active: Set[int] = set()
+    expiry_heap = []    # (y1, index): blocks leave the sweep once they can no longer overlap enough
+    left_heap = []      # (x0, index): leftmost active block
+    right_heap = []     # (-x0, index): rightmost active block
+    involved: Set[int] = set()
+
+    for index in order:
+        x0, y0, _, y1 = bboxes[index][:4]
+
+        # y0 only increases during the sweep, so expired blocks never return
+        while expiry_heap and expiry_heap[0][0] - y0 <= min_vertical_overlap:
+            active.discard(heapq.heappop(expiry_heap)[1])
+
+        if y1 - y0 <= min_vertical_overlap:
+            # Too short to overlap any block by the required amount
+            continue
+
+        while left_heap and left_heap[0][1] not in active:
+            heapq.heappop(left_heap)
+        while right_heap and right_heap[0][1] not in active:
+            heapq.heappop(right_heap)
+
+        if left_heap and x0 - left_heap[0][0] > min_horizontal_separation:
+            involved.update((index, left_heap[0][1]))
+        if right_heap and -right_heap[0][0] - x0 > min_horizontal_separation:
+            involved.update((index, right_heap[0][1]))
+
+        active.add(index)
+        heapq.heappush(expiry_heap, (y1, index))
+        heapq.heappush(left_heap, (x0, index))
+        heapq.heappush(right_heap, (-x0, index))
+
+    if not involved:
+        if not bboxes:
+            return {'has_columns': False, 'column_count': 0, 'column_ranges': []}
+        full_range = [round(min(bbox[0] for bbox in bboxes), 1), round(max(bbox[2] for bbox in bboxes), 1)]
+        return {'has_columns': False, 'column_count': 1, 'column_ranges': [full_range]}
+
+    column_ranges = _group_column_ranges([bboxes[index] for index in involved], min_horizontal_separation)
+    return {'has_columns': True, 'column_count': len(column_ranges), 'column_ranges': column_ranges}
+
+def _group_column_ranges(bboxes: List[BBox], min_horizontal_separation: float) -> List[List[float]]:
+    """Group blocks into columns by left edge and return each column's [x0, x1] range."""
+    columns = []
+    for bbox in sorted(bboxes, key=lambda bbox: bbox[0]):
+        if columns and bbox[0] - columns[-1]['start'] <= min_horizontal_separation:
+            column = columns[-1]
+            column['x0'] = min(column['x0'], bbox[0])
+            column['x1'] = max(column['x1'], bbox[2])
+        else:
+            columns.append({'start': bbox[0], 'x0': bbox[0], 'x1': bbox[2]})
+    return [[round(column['x0'], 1), round(column['x1'], 1)] for column in columns]
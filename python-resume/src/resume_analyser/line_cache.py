@@ -0,0 +1,102 @@
+"""Per-line memoization of the line-oriented analyses for incremental re-analysis."""
+
+import json
+import zlib
+import logging
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Any, List, Iterable, Union
+
+from .extractors import analyse_line, LineExtractor
+from .taxonomy import taxonomy_key
+
+logger = logging.getLogger(__name__)
+
+# Bump whenever analyse_line changes so saved line results are discarded
+LINE_ANALYSIS_VERSION = "1"
+
+DEFAULT_MAX_LINES = 100_000
+
+class LineCache:
+    """
+    Results of `extractors.analyse_line` keyed by the line (a dict hashes it once), least-recently-used
+    lines evicted beyond `max_lines`. Re-analysing an edited resume only runs the line
+    analyses on added or changed lines; every other line's results are taken from the
+    cache and merged in document order. The cache can be saved to and loaded from a
+    compressed JSON file to carry it across runs.
+    """
+
+    def __init__(self, max_lines: int = DEFAULT_MAX_LINES):
+        self.max_lines = max_lines
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def analyse(self, lines: Iterable[str]) -> List[Dict[str, Any]]:
+        """Return the analyse_line result of every line, computing only the ones not cached."""
+        analyses = []
+        entries = self._entries
+        for line in lines:
+            analysis = entries.get(line)
+            if analysis is None:
+                self.misses += 1
+                analysis = analyse_line(line)
+                entries[line] = analysis
+                if len(entries) > self.max_lines:
+                    entries.popitem(last=False)
+            else:
+                self.hits += 1
+                entries.move_to_end(line)
+            analyses.append(analysis)
+        return analyses
+
+    def line_results(self, lines: List[str]) -> Dict[str, Any]:
+        """
+        The LineExtractor results of the lines (skills, degrees, key phrases, content analysis)
+        plus their readability line flags under 'line_flags'.
+        """
+        extractor = LineExtractor()
+        analyses = self.analyse(lines)
+        for analysis in analyses:
+            extractor.feed_analysis(analysis)
+        results = extractor.results()
+        results['line_flags'] = [(analysis['bullet'], analysis['very_long']) for analysis in analyses]
+        logger.debug(f"Line cache: {self.hits} hit(s), {self.misses} miss(es), {len(self._entries)} lines")
+        return results
+
+    def stats(self) -> Dict[str, int]:
+        """Return hit/miss counters and current size."""
+        return {'hits': self.hits, 'misses': self.misses, 'lines': len(self._entries)}
+
+    def save(self, path: Union[str, Path]):
+        """Write the cached line results to a compressed JSON file."""
+        data = json.dumps({'version': LINE_ANALYSIS_VERSION, 'taxonomy': taxonomy_key(),
+                           'entries': list(self._entries.items())},
+                          ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        with open(path, 'wb') as file:
+            file.write(zlib.compress(data, 1))
+
+    @classmethod
+    def load(cls, path: Union[str, Path], max_lines: int = DEFAULT_MAX_LINES) -> "LineCache":
+        """Read a cache written by `save`; a missing, unreadable or outdated file gives an empty cache."""
+        cache = cls(max_lines)
+        try:
+            with open(path, 'rb') as file:
+                data = json.loads(zlib.decompress(file.read()).decode('utf-8'))
+        except FileNotFoundError:
+            return cache
+        except (OSError, ValueError, zlib.error) as e:
+            logger.warning(f"Ignoring unreadable line cache {path}: {str(e)}")
+            return cache
+        if data.get('version') != LINE_ANALYSIS_VERSION:
+            logger.info(f"Line cache {path} is from another analysis version; starting empty")
+            return cache
+        if data.get('taxonomy') != taxonomy_key():
+            logger.info(f"Line cache {path} was built with other skill taxonomies; starting empty")
+            return cache
+        for line, analysis in data['entries'][-max_lines:]:
+            cache._entries[line] = analysis
+        return cache
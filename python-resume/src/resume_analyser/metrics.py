@@ -0,0 +1,138 @@
+"""Per-stage timing instrumentation and batch-level metrics export."""
+
+import json
+import time
+import logging
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Any, Optional, Iterator, Union
+
+logger = logging.getLogger(__name__)
+
+# Histogram bucket upper bounds in seconds
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+METRIC_PREFIX = "resume_analyser"
+
+@contextmanager
+def timed(timings: Optional[Dict[str, int]], name: str) -> Iterator[None]:
+    """Add the wall time of the block, in nanoseconds, to timings[name]. No-op when timings is None."""
+    if timings is None:
+        yield
+        return
+    start = time.perf_counter_ns()
+    try:
+        yield
+    finally:
+        timings[name] = timings.get(name, 0) + (time.perf_counter_ns() - start)
+
+def format_timings(timings: Dict[str, int]) -> Dict[str, float]:
+    """Convert nanosecond timings to milliseconds rounded for display."""
+    return {name: round(ns / 1_000_000, 3) for name, ns in timings.items()}
+
+class StageHistogram:
+    """Cumulative-bucket histogram of one stage's durations."""
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.bucket_counts = [0] * len(buckets)
+        self.count = 0
+        self.sum_ns = 0
+        self.min_ns: Optional[int] = None
+        self.max_ns: Optional[int] = None
+
+    def observe(self, duration_ns: int):
+        self.count += 1
+        self.sum_ns += duration_ns
+        self.min_ns = duration_ns if self.min_ns is None else min(self.min_ns, duration_ns)
+        self.max_ns = duration_ns if self.max_ns is None else max(self.max_ns, duration_ns)
+        seconds = duration_ns / 1e9
+        for index, bound in enumerate(self.buckets):
+            if seconds <= bound:
+                self.bucket_counts[index] += 1
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Durations in milliseconds; the cumulative bucket counts stay keyed by their upper bound in seconds."""
+        return {
+            'count': self.count,
+            'sum_ms': round(self.sum_ns / 1e6, 3),
+            'mean_ms': round(self.sum_ns / self.count / 1e6, 3) if self.count else 0.0,
+            'min_ms': round((self.min_ns or 0) / 1e6, 3),
+            'max_ms': round((self.max_ns or 0) / 1e6, 3),
+            'buckets_seconds': {str(bound): count for bound, count in zip(self.buckets, self.bucket_counts)}
+        }
+
+class StageMetrics:
+    """Aggregates per-file stage timings across a run into histograms and throughput counters."""
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.stages: Dict[str, StageHistogram] = {}
+        self.files_ok = 0
+        self.files_failed = 0
+        self.started_ns = time.perf_counter_ns()
+
+    def observe(self, stage: str, duration_ns: int):
+        """Record one duration for a stage."""
+        if stage not in self.stages:
+            self.stages[stage] = StageHistogram(self.buckets)
+        self.stages[stage].observe(duration_ns)
+
+    def observe_file(self, timings: Dict[str, int], ok: bool = True):
+        """Record all stage timings of one analysed file."""
+        for stage, duration_ns in timings.items():
+            self.observe(stage, duration_ns)
+        if ok:
+            self.files_ok += 1
+        else:
+            self.files_failed += 1
+
+    def elapsed_seconds(self) -> float:
+        return (time.perf_counter_ns() - self.started_ns) / 1e9
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the metrics as a JSON-serialisable dictionary."""
+        elapsed = self.elapsed_seconds()
+        files_total = self.files_ok + self.files_failed
+        return {
+            'files': {'ok': self.files_ok, 'failed': self.files_failed, 'total': files_total},
+            'elapsed_seconds': round(elapsed, 3),
+            'files_per_second': round(files_total / elapsed, 3) if elapsed > 0 else 0.0,
+            'stages': {stage: histogram.to_dict() for stage, histogram in sorted(self.stages.items())}
+        }
+
+    def to_prometheus(self) -> str:
+        """Return the metrics in the Prometheus text exposition format."""
+        name = f"{METRIC_PREFIX}_stage_duration_seconds"
+        lines = [
+            f"# HELP {name} Time spent in each analysis stage.",
+            f"# TYPE {name} histogram"
+        ]
+        for stage, histogram in sorted(self.stages.items()):
+            for bound, count in zip(histogram.buckets, histogram.bucket_counts):
+                lines.append(f'{name}_bucket{{stage="{stage}",le="{bound}"}} {count}')
+            lines.append(f'{name}_bucket{{stage="{stage}",le="+Inf"}} {histogram.count}')
+            lines.append(f'{name}_sum{{stage="{stage}"}} {histogram.sum_ns / 1e9:.9f}')
+            lines.append(f'{name}_count{{stage="{stage}"}} {histogram.count}')
+
+        files_name = f"{METRIC_PREFIX}_files_total"
+        lines.append(f"# HELP {files_name} Resumes analysed, by outcome.")
+        lines.append(f"# TYPE {files_name} counter")
+        lines.append(f'{files_name}{{status="ok"}} {self.files_ok}')
+        lines.append(f'{files_name}{{status="failed"}} {self.files_failed}')
+
+        elapsed = self.elapsed_seconds()
+        throughput_name = f"{METRIC_PREFIX}_files_per_second"
+        lines.append(f"# HELP {throughput_name} Resumes analysed per second of wall time.")
+        lines.append(f"# TYPE {throughput_name} gauge")
+        files_total = self.files_ok + self.files_failed
+        lines.append(f"{throughput_name} {files_total / elapsed if elapsed > 0 else 0.0:.6f}")
+        return "\n".join(lines) + "\n"
+
+    def write(self, path: Union[str, Path]):
+        """Write the metrics to a file: JSON for a .json path, Prometheus text otherwise."""
+        path = Path(path)
+        if path.suffix.lower() == '.json':
+            content = json.dumps(self.to_dict(), indent=2)
+        else:
+            content = self.to_prometheus()
+        path.write_text(content, encoding='utf-8')
+        logger.debug(f"Metrics saved to {path}")
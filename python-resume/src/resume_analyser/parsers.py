@@ -1,98 +1,265 @@
 """Enhanced resume file parsers with ATS compatibility analysis."""
 
+import io
+import mmap
+import codecs
 import logging
+import zipfile
 from pathlib import Path
-from typing import Optional, Dict, Any, Tuple
+from xml.etree import ElementTree
+from typing import Optional, Dict, Any, Tuple, Union, List, BinaryIO, Iterator
+
+from .cache import DiskCache, hash_bytes
+from .layout import detect_columns
+from .text_statistics import count_special_characters
 
 logger = logging.getLogger(__name__)
 
+# Bump whenever parser output changes so cached results are not reused
+PARSER_VERSION = "4"
+
+SUPPORTED_EXTENSIONS = ('.pdf', '.docx', '.txt')
+
+# Anything the parsers can read: a path, an in-memory buffer or a binary file-like object
+ResumeSource = Union[Path, str, bytes, bytearray, memoryview, mmap.mmap, BinaryIO]
+Buffer = Union[bytes, bytearray, memoryview, mmap.mmap]
+
+# How much of the input is inspected when sniffing the content type
+SNIFF_BYTES = 8192
+
 class ParseResult:
     """Class to hold parsing results with metadata."""
     def __init__(self, text: str, metadata: Dict[str, Any]):
         self.text = text
         self.metadata = metadata
 
-def parse_pdf_enhanced(file_path: Path) -> Optional[ParseResult]:
-    """Parse PDF file with enhanced analysis for ATS compatibility."""
+class ParseCache:
+    """Content-addressed cache of parse results, keyed by file hash and parser version."""
+    def __init__(self, cache_dir: Union[str, Path], max_bytes: int = 256 * 1024 * 1024):
+        self.store = DiskCache(cache_dir, max_bytes)
+
+    @staticmethod
+    def make_key(content_hash: str, variant: str) -> str:
+        """Build the cache key for a file's content hash and parser variant."""
+        return hash_bytes(f"{content_hash}:{variant}:{PARSER_VERSION}".encode('utf-8'))
+
+    def get(self, key: str) -> Optional[ParseResult]:
+        """Return a cached ParseResult, or None on a miss."""
+        entry = self.store.get(key)
+        if entry is None:
+            return None
+        return ParseResult(entry['text'], entry['metadata'])
+
+    def put(self, key: str, result: ParseResult):
+        """Store a ParseResult."""
+        self.store.put(key, {'text': result.text, 'metadata': result.metadata})
+
+    @property
+    def hits(self) -> int:
+        return self.store.hits
+
+    @property
+    def misses(self) -> int:
+        return self.store.misses
+
+    def stats(self) -> Dict[str, int]:
+        """Return hit/miss counters and current size."""
+        return self.store.stats()
+
+def text_from_blocks(text_blocks: List[Dict[str, Any]]) -> str:
+    """Join the spans of PyMuPDF "dict" text blocks into plain text, one line per text line."""
+    return "".join(
+        "".join(span["text"] for span in line["spans"]) + "\n"
+        for block in text_blocks
+        for line in block["lines"]
+    )
+
+def pdf_stream(buffer: Buffer) -> bytes:
+    """Return a bytes object PyMuPDF can open, avoiding a copy whenever the buffer already wraps one."""
+    if isinstance(buffer, bytes):
+        return buffer
+    if isinstance(buffer, memoryview) and isinstance(buffer.obj, bytes) and buffer.c_contiguous \
+            and buffer.nbytes == len(buffer.obj):
+        return buffer.obj
+    # PyMuPDF only accepts bytes, so other buffers (bytearray, mmap, slices) need one copy
+    return bytes(buffer)
+
+class TextTally:
+    """Running length, stripped length and special-character count of text seen chunk by chunk."""
+    def __init__(self):
+        self.length = 0
+        self.special_count = 0
+        # Offsets of the first and one past the last non-whitespace character
+        self._first: Optional[int] = None
+        self._last_end = 0
+
+    def add(self, chunk: str):
+        stripped_left = chunk.lstrip()
+        if stripped_left:
+            if self._first is None:
+                self._first = self.length + len(chunk) - len(stripped_left)
+            self._last_end = self.length + len(chunk.rstrip())
+        self.length += len(chunk)
+        self.special_count += count_special_characters(chunk)
+
+    @property
+    def stripped_length(self) -> int:
+        """Length the whole text would have after str.strip()."""
+        return 0 if self._first is None else self._last_end - self._first
+
+class ParseStream:
+    """
+    Resume text delivered in chunks as it is decoded: PDF pages, DOCX paragraphs or lines of a text file.
+    Joining the chunks gives exactly the text of the corresponding ParseResult. The metadata
+    and the tally are filled in while the chunks are consumed and are complete once they are exhausted.
+    """
+    def __init__(self, chunks: Iterator[str], metadata: Dict[str, Any], tally: TextTally):
+        self._chunks = chunks
+        self.metadata = metadata
+        self.tally = tally
+
+    def __iter__(self) -> Iterator[str]:
+        return self._chunks
+
+    def read(self) -> ParseResult:
+        """Consume the remaining chunks into a ParseResult."""
+        return ParseResult("".join(self), self.metadata)
+
+def stream_pdf_pages(file_path: Union[Path, Buffer]) -> Optional[ParseStream]:
+    """
+    Open a PDF for page-by-page text extraction with ATS compatibility analysis.
+    Returns None if the PDF cannot be opened; errors while reading pages are raised to the consumer.
+    """
     try:
         import fitz  # PyMuPDF
         
-        doc = fitz.open(file_path)
-        text_content = []
-        metadata = {
-            'has_images': False,
-            'image_count': 0,
-            'has_columns': False,
-            'page_count': len(doc),
-            'parsing_issues': []
-        }
-        
+        if isinstance(file_path, Path):
+            doc = fitz.open(file_path)
+        else:
+            doc = fitz.open(stream=pdf_stream(file_path), filetype="pdf")
+    except ImportError:
+        logger.error("PyMuPDF (fitz) not installed. Please install it to parse PDF files.")
+        return None
+    except Exception as e:
+        logger.error(f"Error parsing PDF file: {str(e)}")
+        return None
+    
+    metadata = {
+        'has_images': False,
+        'image_count': 0,
+        'has_columns': False,
+        'column_count': 0,
+        'page_layouts': [],
+        'page_count': len(doc),
+        'parsing_issues': []
+    }
+    tally = TextTally()
+    return ParseStream(_iter_pdf_pages(doc, metadata, tally), metadata, tally)
+
+def _iter_pdf_pages(doc, metadata: Dict[str, Any], tally: TextTally) -> Iterator[str]:
+    """Yield the text of each page (pages after the first prefixed with their separator) while filling metadata."""
+    try:
         for page_num in range(len(doc)):
             page = doc.load_page(page_num)
             
-            # Extract text
-            text = page.get_text()
-            text_content.append(text)
+            # One structured extraction per page supplies text, geometry and images
+            blocks = page.get_text("dict")["blocks"]
+            text_blocks = [block for block in blocks if block.get("type") == 0]
+            image_blocks = [block for block in blocks if block.get("type") == 1]
             
             # Check for images
-            images = page.get_images()
-            if images:
+            if image_blocks:
                 metadata['has_images'] = True
-                metadata['image_count'] += len(images)
-                logger.debug(f"Found {len(images)} images on page {page_num + 1}")
+                metadata['image_count'] += len(image_blocks)
+                logger.debug(f"Found {len(image_blocks)} images on page {page_num + 1}")
             
             # Check for columns (heuristic: text blocks with significant horizontal separation)
-            blocks = page.get_text("dict")["blocks"]
-            text_blocks = [block for block in blocks if "lines" in block]
+            layout = detect_columns([block["bbox"] for block in text_blocks])
+            metadata['page_layouts'].append({
+                'page': page_num + 1,
+                'column_count': layout['column_count'],
+                'column_ranges': layout['column_ranges']
+            })
+            metadata['column_count'] = max(metadata['column_count'], layout['column_count'])
+            if layout['has_columns']:
+                metadata['has_columns'] = True
+                logger.debug(f"Detected {layout['column_count']} potential columns on page {page_num + 1}")
             
-            if len(text_blocks) >= 2:
-                # Check if text blocks are side by side (potential columns)
-                x_positions = [block["bbox"][0] for block in text_blocks]
-                y_positions = [block["bbox"][1] for block in text_blocks]
-                
-                # Simple column detection: multiple text blocks at similar y-levels but different x-levels
-                for i, block1 in enumerate(text_blocks):
-                    for j, block2 in enumerate(text_blocks[i+1:], i+1):
-                        y_overlap = min(block1["bbox"][3], block2["bbox"][3]) - max(block1["bbox"][1], block2["bbox"][1])
-                        x_separation = abs(block1["bbox"][0] - block2["bbox"][0])
-                        
-                        # If blocks overlap vertically but are far apart horizontally, likely columns
-                        if y_overlap > 50 and x_separation > 100:
-                            metadata['has_columns'] = True
-                            logger.debug(f"Detected potential columns on page {page_num + 1}")
-                            break
-                    if metadata['has_columns']:
-                        break
-        
+            # Rebuild the plain text exactly as page.get_text() lays it out; pages are joined by newlines
+            page_text = text_from_blocks(text_blocks)
+            chunk = page_text if page_num == 0 else "\n" + page_text
+            tally.add(chunk)
+            yield chunk
+    finally:
         doc.close()
-        full_text = "\n".join(text_content)
-        
-        # Additional parsing quality checks
-        if len(full_text.strip()) < 50:
-            metadata['parsing_issues'].append("Very little text extracted - possible parsing problems")
-        
-        # Check for excessive special characters (often indicates formatting issues)
-        special_char_ratio = sum(1 for char in full_text if not char.isalnum() and not char.isspace()) / len(full_text) if full_text else 0
-        if special_char_ratio > 0.3:
-            metadata['parsing_issues'].append("High ratio of special characters detected")
-        
-        logger.debug(f"PDF parsing complete: {len(full_text)} chars, {metadata['image_count']} images, columns: {metadata['has_columns']}")
-        return ParseResult(full_text, metadata)
-        
-    except ImportError:
-        logger.error("PyMuPDF (fitz) not installed. Please install it to parse PDF files.")
+    
+    # Additional parsing quality checks
+    if tally.stripped_length < 50:
+        metadata['parsing_issues'].append("Very little text extracted - possible parsing problems")
+    
+    # Check for excessive special characters (often indicates formatting issues)
+    special_char_ratio = tally.special_count / tally.length if tally.length else 0
+    if special_char_ratio > 0.3:
+        metadata['parsing_issues'].append("High ratio of special characters detected")
+    
+    logger.debug(f"PDF parsing complete: {tally.length} chars, {metadata['image_count']} images, columns: {metadata['has_columns']}")
+
+def parse_pdf_enhanced(file_path: Union[Path, Buffer]) -> Optional[ParseResult]:
+    """Parse PDF file with enhanced analysis for ATS compatibility."""
+    stream = stream_pdf_pages(file_path)
+    if stream is None:
         return None
+    try:
+        return stream.read()
     except Exception as e:
         logger.error(f"Error parsing PDF file: {str(e)}")
         return None
 
-def parse_docx_enhanced(file_path: Path) -> Optional[ParseResult]:
+class _MappedFile(io.RawIOBase):
+    """Seekable read-only file view over a memory map, so zip readers need not copy it."""
+    def __init__(self, mapped: mmap.mmap):
+        self._view = memoryview(mapped)
+        self._pos = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        chunk = self._view[self._pos:self._pos + len(buffer)]
+        buffer[:len(chunk)] = chunk
+        self._pos += len(chunk)
+        return len(chunk)
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        base = {io.SEEK_SET: 0, io.SEEK_CUR: self._pos, io.SEEK_END: len(self._view)}[whence]
+        self._pos = max(0, base + offset)
+        return self._pos
+
+    def tell(self) -> int:
+        return self._pos
+
+    def close(self):
+        self._view.release()
+        super().close()
+
+def _binary_file(source: Union[Path, Buffer]) -> Union[Path, BinaryIO]:
+    """Return a path or seekable binary file object for libraries that read zip archives."""
+    if isinstance(source, Path):
+        return source
+    if isinstance(source, mmap.mmap):
+        return io.BufferedReader(_MappedFile(source))
+    return io.BytesIO(source)
+
+def parse_docx_enhanced(file_path: Union[Path, Buffer]) -> Optional[ParseResult]:
     """Parse DOCX file with enhanced analysis for ATS compatibility."""
     try:
         from docx import Document
         from docx.shared import Inches
         
-        doc = Document(file_path)
+        doc = Document(_binary_file(file_path))
         text_content = []
         metadata = {
             'has_images': False,
@@ -153,52 +320,509 @@ def parse_docx_enhanced(file_path: Path) -> Optional[ParseResult]:
         logger.error(f"Error parsing DOCX file: {str(e)}")
         return None
 
-def parse_txt_enhanced(file_path: Path) -> Optional[ParseResult]:
+WORD_NAMESPACE = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+RELATIONSHIP_NAMESPACE = '{http://schemas.openxmlformats.org/package/2006/relationships}'
+OFFICE_DOCUMENT_REL_TYPE = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument'
+
+W_BODY = WORD_NAMESPACE + 'body'
+W_P = WORD_NAMESPACE + 'p'
+W_R = WORD_NAMESPACE + 'r'
+W_HYPERLINK = WORD_NAMESPACE + 'hyperlink'
+W_TBL = WORD_NAMESPACE + 'tbl'
+W_TR = WORD_NAMESPACE + 'tr'
+W_TC = WORD_NAMESPACE + 'tc'
+W_TCPR = WORD_NAMESPACE + 'tcPr'
+W_TBLGRID = WORD_NAMESPACE + 'tblGrid'
+W_GRIDCOL = WORD_NAMESPACE + 'gridCol'
+W_GRIDSPAN = WORD_NAMESPACE + 'gridSpan'
+W_VMERGE = WORD_NAMESPACE + 'vMerge'
+W_PPR = WORD_NAMESPACE + 'pPr'
+W_SECTPR = WORD_NAMESPACE + 'sectPr'
+W_COLS = WORD_NAMESPACE + 'cols'
+W_VAL = WORD_NAMESPACE + 'val'
+W_NUM = WORD_NAMESPACE + 'num'
+W_TYPE = WORD_NAMESPACE + 'type'
+
+# Text equivalents of run content, matching python-docx's Run.text
+RUN_CONTENT_TAGS = {
+    WORD_NAMESPACE + 't', WORD_NAMESPACE + 'tab', WORD_NAMESPACE + 'ptab',
+    WORD_NAMESPACE + 'br', WORD_NAMESPACE + 'cr', WORD_NAMESPACE + 'noBreakHyphen'
+}
+
+def _run_content_text(elem) -> str:
+    """Return the text equivalent of a run content element."""
+    tag = elem.tag
+    if tag == WORD_NAMESPACE + 't':
+        return elem.text or ""
+    if tag in (WORD_NAMESPACE + 'tab', WORD_NAMESPACE + 'ptab'):
+        return "\t"
+    if tag == WORD_NAMESPACE + 'br':
+        return "\n" if elem.get(W_TYPE, 'textWrapping') == 'textWrapping' else ""
+    if tag == WORD_NAMESPACE + 'cr':
+        return "\n"
+    return "-"
+
+def _docx_main_part_name(archive: zipfile.ZipFile) -> str:
+    """Find the main document part from the package relationships."""
+    try:
+        with archive.open('_rels/.rels') as rels_file:
+            for rel in ElementTree.parse(rels_file).getroot():
+                if rel.get('Type') == OFFICE_DOCUMENT_REL_TYPE:
+                    return rel.get('Target', '').lstrip('/')
+    except KeyError:
+        pass
+    return 'word/document.xml'
+
+def _count_docx_image_rels(archive: zipfile.ZipFile, part_name: str) -> int:
+    """Count relationships of the main document part that point at images."""
+    directory, _, file_name = part_name.rpartition('/')
+    rels_name = f"{directory}/_rels/{file_name}.rels" if directory else f"_rels/{file_name}.rels"
+    try:
+        with archive.open(rels_name) as rels_file:
+            rels = ElementTree.parse(rels_file).getroot()
+    except KeyError:
+        return 0
+    return sum(1 for rel in rels if rel.tag == RELATIONSHIP_NAMESPACE + 'Relationship' and "image" in rel.get('Target', ''))
+
+class _StreamingTable:
+    """Accumulates one top-level table and lays out its cells like python-docx does."""
+    def __init__(self):
+        self.column_count = 0
+        self.row_count = 0
+        self.cells: List[str] = []
+        # Index of the first cell of each row, for tables without a w:tblGrid
+        self.row_starts: List[int] = [0]
+        self.cell_paragraphs: List[str] = []
+        self.grid_span = 1
+        self.vmerge: Optional[str] = None
+
+    def end_cell(self):
+        cell_text = "\n".join(self.cell_paragraphs)
+        for grid_span_idx in range(self.grid_span):
+            if self.vmerge == 'continue':
+                self.cells.append(self._cell_above())
+            elif grid_span_idx > 0:
+                self.cells.append(self.cells[-1])
+            else:
+                self.cells.append(cell_text)
+        self.cell_paragraphs = []
+        self.grid_span = 1
+        self.vmerge = None
+
+    def end_row(self):
+        self.row_count += 1
+        self.row_starts.append(len(self.cells))
+
+    def _cell_above(self) -> str:
+        """Text of the grid cell above the next one, which a vMerge-continue cell repeats."""
+        if self.column_count:
+            return self.cells[-self.column_count]
+        # No grid: take the cell in the same position of the previous row, if it has one
+        above = self.row_starts[-2] + len(self.cells) - self.row_starts[-1] if len(self.row_starts) > 1 else None
+        return self.cells[above] if above is not None and above < self.row_starts[-1] else ""
+
+    def row_texts(self) -> List[str]:
+        """Non-empty cell texts in the order table.rows/row.cells yields them."""
+        texts = []
+        for row_idx in range(self.row_count):
+            if self.column_count:
+                start, end = row_idx * self.column_count, (row_idx + 1) * self.column_count
+            else:
+                start, end = self.row_starts[row_idx], self.row_starts[row_idx + 1]
+            for cell_text in self.cells[start:end]:
+                if cell_text.strip():
+                    texts.append(cell_text)
+        return texts
+
+def stream_docx(file_path: Union[Path, Buffer]) -> Optional[ParseStream]:
+    """
+    Open a DOCX file for streaming word/document.xml instead of building the python-docx object model.
+    Body paragraphs are delivered as soon as they are parsed and table texts after them, giving the
+    same text and metadata as parse_docx_enhanced in a single pass over the XML.
+    Returns None if the file cannot be opened; errors while reading it are raised to the consumer.
+    """
+    try:
+        archive = zipfile.ZipFile(_binary_file(file_path))
+    except Exception as e:
+        logger.error(f"Error parsing DOCX file: {str(e)}")
+        return None
+    
+    metadata = {
+        'has_images': False,
+        'image_count': 0,
+        'has_columns': False,
+        'has_tables': False,
+        'table_count': 0,
+        'parsing_issues': []
+    }
+    tally = TextTally()
+    return ParseStream(_iter_docx_paragraphs(archive, metadata, tally), metadata, tally)
+
+def _iter_docx_paragraphs(archive: zipfile.ZipFile, metadata: Dict[str, Any], tally: TextTally) -> Iterator[str]:
+    """Yield the body paragraphs of a DOCX package, then its table texts, while filling metadata."""
+    with archive:
+        part_name = _docx_main_part_name(archive)
+        # Tables are laid out after all body paragraphs, so only their text is held until the end
+        table_texts: List[str] = []
+        # Chunks after the first start with the separator joining them
+        separator = ""
+
+        # Tags of the currently open elements, outermost first
+        stack: List[str] = []
+        body = None
+        table: Optional[_StreamingTable] = None
+        table_depth = 0
+        paragraph_parts: List[str] = []
+        paragraph_depth = 0
+
+        with archive.open(part_name) as document_xml:
+            for event, elem in ElementTree.iterparse(document_xml, events=('start', 'end')):
+                tag = elem.tag
+                if event == 'start':
+                    depth = len(stack)
+                    stack.append(tag)
+                    if tag == W_BODY and depth == 1:
+                        body = elem
+                    elif body is None:
+                        continue
+                    elif tag == W_TBL and depth == 2:
+                        table = _StreamingTable()
+                        table_depth = depth
+                    elif tag == W_P and (depth == 2 or (table is not None and depth == table_depth + 3
+                                                        and stack[-2] == W_TC and stack[-3] == W_TR)):
+                        paragraph_parts = []
+                        paragraph_depth = depth
+                    continue
+
+                stack.pop()
+                depth = len(stack)
+                if body is None:
+                    continue
+
+                if tag in RUN_CONTENT_TAGS:
+                    # Run content counts when its run sits directly, or via a hyperlink, in the open paragraph
+                    if paragraph_depth and stack[-1] == W_R:
+                        if depth == paragraph_depth + 2 or (depth == paragraph_depth + 3 and stack[-2] == W_HYPERLINK):
+                            paragraph_parts.append(_run_content_text(elem))
+                elif tag == W_P and paragraph_depth and depth == paragraph_depth:
+                    paragraph_text = "".join(paragraph_parts)
+                    if table is not None and depth > 2:
+                        table.cell_paragraphs.append(paragraph_text)
+                    elif paragraph_text.strip():
+                        chunk = separator + paragraph_text
+                        separator = "\n"
+                        tally.add(chunk)
+                        yield chunk
+                    paragraph_depth = 0
+                elif table is not None and depth > table_depth:
+                    relative_depth = depth - table_depth
+                    if tag == W_TC and relative_depth == 2 and stack[-1] == W_TR:
+                        table.end_cell()
+                    elif tag == W_TR and relative_depth == 1:
+                        table.end_row()
+                    elif tag == W_GRIDCOL and relative_depth == 2 and stack[-1] == W_TBLGRID:
+                        table.column_count += 1
+                    elif tag == W_GRIDSPAN and relative_depth == 4 and stack[-1] == W_TCPR and stack[-2] == W_TC:
+                        table.grid_span = int(elem.get(W_VAL, '1'))
+                    elif tag == W_VMERGE and relative_depth == 4 and stack[-1] == W_TCPR and stack[-2] == W_TC:
+                        table.vmerge = elem.get(W_VAL, 'continue')
+                elif tag == W_TBL and table is not None and depth == table_depth:
+                    metadata['has_tables'] = True
+                    metadata['table_count'] += 1
+                    table_texts.extend(table.row_texts())
+                    table = None
+                elif tag == W_SECTPR and (depth == 2 or (depth == 4 and stack[-1] == W_PPR and stack[-2] == W_P)):
+                    # Check for columns (look at section formatting)
+                    cols_element = elem.find('.//' + W_COLS)
+                    if cols_element is not None and cols_element.get(W_NUM):
+                        num_cols = int(cols_element.get(W_NUM, '1'))
+                        if num_cols > 1:
+                            metadata['has_columns'] = True
+                            logger.debug(f"Document has {num_cols} columns")
+
+                if depth == 2:
+                    # Body-level element finished: release it to keep memory flat
+                    body.remove(elem)
+
+        image_count = _count_docx_image_rels(archive, part_name)
+        if image_count:
+            metadata['has_images'] = True
+            metadata['image_count'] = image_count
+
+    for table_text in table_texts:
+        chunk = separator + table_text
+        separator = "\n"
+        tally.add(chunk)
+        yield chunk
+
+    # Additional parsing quality checks
+    if tally.stripped_length < 50:
+        metadata['parsing_issues'].append("Very little text extracted")
+
+    logger.debug(f"Streaming DOCX parsing complete: {tally.length} chars, {metadata['image_count']} images, columns: {metadata['has_columns']}")
+
+def parse_docx_streaming(file_path: Union[Path, Buffer]) -> Optional[ParseResult]:
+    """
+    Parse a DOCX file by streaming word/document.xml instead of building the python-docx object model.
+    Produces the same text and metadata as parse_docx_enhanced in a single pass over the XML.
+    """
+    stream = stream_docx(file_path)
+    if stream is None:
+        return None
+    try:
+        return stream.read()
+    except Exception as e:
+        logger.error(f"Error parsing DOCX file: {str(e)}")
+        return None
+
+# Selectable DOCX parsing backends; both produce the same text and metadata
+DOCX_BACKENDS = {
+    'python-docx': parse_docx_enhanced,
+    'stream': parse_docx_streaming
+}
+DEFAULT_DOCX_BACKEND = 'python-docx'
+
+def stream_txt_lines(file_path: Union[Path, Buffer]) -> Optional[ParseStream]:
+    """Open a text file for line-by-line reading with basic analysis."""
+    try:
+        # Universal-newline text mode normalises \r\n and \r to \n for files and buffers alike
+        if isinstance(file_path, Path):
+            file = open(file_path, 'r', encoding='utf-8')
+        else:
+            file = io.TextIOWrapper(_binary_file(file_path), encoding='utf-8')
+    except Exception as e:
+        logger.error(f"Error reading text file: {str(e)}")
+        return None
+    
+    metadata = {
+        'has_images': False,
+        'image_count': 0,
+        'has_columns': False,
+        'parsing_issues': []
+    }
+    tally = TextTally()
+    return ParseStream(_iter_txt_lines(file, metadata, tally), metadata, tally)
+
+def _iter_txt_lines(file: io.TextIOBase, metadata: Dict[str, Any], tally: TextTally) -> Iterator[str]:
+    """Yield the lines of a text file (with their newlines) while filling metadata."""
+    line_count = 1
+    short_lines = 0
+    with file:
+        for line in file:
+            tally.add(line)
+            if line.endswith('\n'):
+                line_count += 1
+            # Simple column detection for text files (heuristic: many short lines)
+            if 5 < len(line.strip()) < 40:
+                short_lines += 1
+            yield line
+    
+    if line_count > 10 and short_lines / line_count > 0.6:
+        metadata['has_columns'] = True
+        metadata['parsing_issues'].append("Text appears to be formatted in columns")
+    
+    logger.debug(f"Text file parsing complete: {tally.length} chars")
+
+def parse_txt_enhanced(file_path: Union[Path, Buffer]) -> Optional[ParseResult]:
     """Parse text file with basic analysis."""
+    stream = stream_txt_lines(file_path)
+    if stream is None:
+        return None
     try:
-        with open(file_path, 'r', encoding='utf-8') as file:
-            text = file.read()
-        
-        metadata = {
-            'has_images': False,
-            'image_count': 0,
-            'has_columns': False,
-            'parsing_issues': []
-        }
-        
-        # Simple column detection for text files (heuristic: many short lines)
-        lines = text.split('\n')
-        short_lines = sum(1 for line in lines if 5 < len(line.strip()) < 40)
-        if len(lines) > 10 and short_lines / len(lines) > 0.6:
-            metadata['has_columns'] = True
-            metadata['parsing_issues'].append("Text appears to be formatted in columns")
-        
-        logger.debug(f"Text file parsing complete: {len(text)} chars")
-        return ParseResult(text, metadata)
-        
+        return stream.read()
     except Exception as e:
         logger.error(f"Error reading text file: {str(e)}")
         return None
 
-def parse_resume_file(file_path: Path) -> Optional[str]:
+def parse_resume_file(file_path: ResumeSource) -> Optional[str]:
     """Legacy function for backward compatibility - returns only text."""
     result = parse_resume_file_enhanced(file_path)
     return result.text if result else None
 
-def parse_resume_file_enhanced(file_path: Path) -> Optional[ParseResult]:
-    """Parse resume file with enhanced analysis based on file extension."""
-    if not file_path.exists():
-        logger.error(f"File does not exist: {file_path}")
+def detect_content_type(head: Buffer, buffer: Optional[Union[Path, Buffer]] = None) -> Optional[str]:
+    """
+    Detect the resume format from its leading bytes, returning '.pdf', '.docx', '.txt' or None.
+    `buffer` (the whole input) lets zip archives be confirmed as Word documents.
+    """
+    head = bytes(head[:SNIFF_BYTES])
+    if b'%PDF-' in head[:1024]:
+        return '.pdf'
+    if head.startswith(b'PK\x03\x04'):
+        if buffer is None:
+            return '.docx'
+        try:
+            with zipfile.ZipFile(_binary_file(buffer)) as archive:
+                names = set(archive.namelist())
+        except zipfile.BadZipFile:
+            return None
+        return '.docx' if 'word/document.xml' in names or '_rels/.rels' in names else None
+    if b'\x00' in head:
         return None
-    
+    try:
+        # Incremental decoding tolerates a multi-byte character cut off at the end of the sample
+        codecs.getincrementaldecoder('utf-8')().decode(head, final=False)
+    except UnicodeDecodeError:
+        return None
+    return '.txt'
+
+def detect_file_type(file_path: Path) -> Optional[str]:
+    """
+    Detect a resume file's format. Only files with a supported extension are resumes (as in
+    batch and watch mode); their content decides the format, falling back to the extension.
+    """
     extension = file_path.suffix.lower()
+    if extension not in SUPPORTED_EXTENSIONS:
+        return None
+    try:
+        with open(file_path, 'rb') as file:
+            head = file.read(SNIFF_BYTES)
+    except OSError as e:
+        logger.error(f"Error reading file: {str(e)}")
+        return None
+    
+    content_type = detect_content_type(head, file_path)
+    if content_type is None:
+        return extension
+    if content_type != extension:
+        logger.warning(f"{file_path.name} looks like {content_type} content despite its {extension} extension")
+    return content_type
+
+def _as_buffer(source: ResumeSource) -> Optional[Buffer]:
+    """
+    Return the in-memory buffer behind a non-path source; other file objects are read once.
+    None for a text-mode file object, whose bytes are no longer available.
+    """
+    if isinstance(source, (bytes, bytearray, memoryview, mmap.mmap)):
+        return source
+    if isinstance(source, io.BytesIO):
+        # getvalue() shares the underlying buffer instead of copying it
+        return source.getvalue()
+    data = source.read()
+    if not isinstance(data, (bytes, bytearray)):
+        logger.error("Resume file objects must be opened in binary mode")
+        return None
+    return data
+
+def resolve_source(file_path: ResumeSource) -> Optional[Tuple[Union[Path, Buffer], str]]:
+    """
+    Turn any resume source into a path or buffer plus its detected file type. Paths need a
+    .pdf, .docx or .txt extension (see detect_file_type); in-memory content has no name, so
+    its type is detected from the content alone.
+    """
+    if isinstance(file_path, str):
+        file_path = Path(file_path)
     
+    if isinstance(file_path, Path):
+        if not file_path.exists():
+            logger.error(f"File does not exist: {file_path}")
+            return None
+        source = file_path
+        extension = detect_file_type(file_path)
+    else:
+        source = _as_buffer(file_path)
+        if source is None:
+            return None
+        extension = detect_content_type(source, source)
+    
+    if extension is None:
+        logger.error("Unsupported file format: expected a .pdf, .docx or .txt file holding PDF, DOCX or UTF-8 text")
+        return None
+    return source, extension
+
+def _source_parse_key(source: Union[Path, Buffer], extension: str, docx_backend: str) -> Optional[str]:
+    """Hash a resolved source into its parse cache key."""
+    try:
+        content_hash = hash_bytes(source.read_bytes() if isinstance(source, Path) else source)
+    except OSError as e:
+        logger.error(f"Error reading file for cache lookup: {str(e)}")
+        return None
+    
+    variant = f"{extension}:{docx_backend}" if extension == '.docx' else extension
+    return ParseCache.make_key(content_hash, variant)
+
+def make_parse_key(file_path: ResumeSource, docx_backend: str = DEFAULT_DOCX_BACKEND) -> Optional[str]:
+    """
+    Return the key identifying the parse output of a resume: its content hash, detected
+    type, DOCX backend and PARSER_VERSION. None if the source cannot be read or is unsupported.
+    """
+    resolved = resolve_source(file_path)
+    if resolved is None:
+        return None
+    return _source_parse_key(resolved[0], resolved[1], docx_backend)
+
+def parse_resume_file_enhanced(file_path: ResumeSource, cache: Optional[ParseCache] = None,
+                               docx_backend: str = DEFAULT_DOCX_BACKEND) -> Optional[ParseResult]:
+    """
+    Parse a resume with enhanced analysis.
+    Accepts a path, bytes-like buffer, memory-mapped file or binary file object, and
+    dispatches on the detected content type rather than on the file extension alone.
+    """
+    if docx_backend not in DOCX_BACKENDS:
+        logger.error(f"Unknown DOCX backend: {docx_backend}")
+        return None
+    
+    resolved = resolve_source(file_path)
+    if resolved is None:
+        return None
+    source, extension = resolved
+    
+    if cache is None:
+        return parse_by_extension(source, extension, docx_backend)
+    
+    key = _source_parse_key(source, extension, docx_backend)
+    if key is None:
+        return None
+    result = cache.get(key)
+    if result is not None:
+        logger.debug(f"Parse cache hit for {file_path if isinstance(file_path, Path) else 'in-memory input'}")
+        return result
+    
+    result = parse_by_extension(source, extension, docx_backend)
+    if result is not None:
+        cache.put(key, result)
+    return result
+
+def parse_by_extension(file_path: Union[Path, Buffer], extension: str, docx_backend: str = DEFAULT_DOCX_BACKEND) -> Optional[ParseResult]:
+    """Dispatch to the parser for a file extension."""
     if extension == '.pdf':
         return parse_pdf_enhanced(file_path)
     elif extension == '.docx':
-        return parse_docx_enhanced(file_path)
+        return DOCX_BACKENDS[docx_backend](file_path)
     elif extension == '.txt':
         return parse_txt_enhanced(file_path)
     else:
         logger.error(f"Unsupported file format: {extension}")
-        return None 
\ No newline at end of file
+        return None
+
+def stream_resume_file(file_path: ResumeSource, docx_backend: str = DEFAULT_DOCX_BACKEND) -> Optional[ParseStream]:
+    """
+    Open a resume for incremental reading: PDFs yield one chunk per page, text files one per line and
+    DOCX files (with the 'stream' backend) one per paragraph, so consumers can process the text while
+    the rest is still being decoded. With the python-docx backend a DOCX file is parsed whole and
+    delivered as a single chunk.
+    """
+    if docx_backend not in DOCX_BACKENDS:
+        logger.error(f"Unknown DOCX backend: {docx_backend}")
+        return None
+    
+    resolved = resolve_source(file_path)
+    if resolved is None:
+        return None
+    source, extension = resolved
+    
+    if extension == '.pdf':
+        return stream_pdf_pages(source)
+    elif extension == '.txt':
+        return stream_txt_lines(source)
+    elif extension == '.docx' and DOCX_BACKENDS[docx_backend] is parse_docx_streaming:
+        return stream_docx(source)
+    elif extension == '.docx':
+        result = DOCX_BACKENDS[docx_backend](source)
+        if result is None:
+            return None
+        tally = TextTally()
+        tally.add(result.text)
+        return ParseStream(iter([result.text]), result.metadata, tally)
+    else:
+        logger.error(f"Unsupported file format: {extension}")
+        return None
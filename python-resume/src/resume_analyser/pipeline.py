@@ -0,0 +1,233 @@
+"""Demand-driven evaluation of the analysis as a dependency graph of named outputs."""
+
+import logging
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Dict, Any, List, Callable, Iterable, NamedTuple, Optional, Tuple
+
+from .taxonomy import get_taxonomy
+from .extractors import (
+    extract_contact_info, extract_skills, find_potential_degrees, extract_key_phrases,
+    analyse_resume_content, filter_key_phrases, summarise_extraction
+)
+from .scorers import calculate_formatting_score, calculate_content_score, calculate_job_match_score
+from .text_processor import analyse_text_complexity
+from .job_data import get_default_job
+from .metrics import timed
+
+logger = logging.getLogger(__name__)
+
+# Values supplied by the caller rather than computed by a node
+INPUTS = ('document', 'parsing_metadata', 'job', 'job_engine', 'recommend_jobs')
+
+class Node(NamedTuple):
+    """One named output: the outputs or inputs it is computed from, and the timing it is recorded under."""
+    name: str
+    dependencies: Tuple[str, ...]
+    compute: Callable[..., Any]
+    timing: Optional[str]
+
+NODES: Dict[str, Node] = {}
+
+def _node(name: str, *dependencies: str, timing: Optional[str] = None):
+    """Register a function as the node computing `name` from its dependencies (passed positionally)."""
+    def register(compute: Callable[..., Any]) -> Callable[..., Any]:
+        NODES[name] = Node(name, dependencies, compute, timing)
+        return compute
+    return register
+
+# --- Extraction ---
+
+@_node('contact', 'document', timing='extract.contact')
+def _contact(document):
+    return extract_contact_info(document.text)
+
+@_node('technical_skills', 'document', timing='extract.technical_skills')
+def _technical_skills(document):
+    return extract_skills(document, get_taxonomy('technical'))
+
+@_node('soft_skills', 'document', timing='extract.soft_skills')
+def _soft_skills(document):
+    return extract_skills(document, get_taxonomy('soft'))
+
+@_node('degrees', 'document', timing='extract.degrees')
+def _degrees(document):
+    return find_potential_degrees(document)
+
+@_node('key_phrases_raw', 'document', timing='extract.key_phrases')
+def _key_phrases_raw(document):
+    return extract_key_phrases(document)
+
+@_node('key_phrases', 'key_phrases_raw', 'technical_skills', 'soft_skills')
+def _key_phrases(key_phrases_raw, technical_skills, soft_skills):
+    return filter_key_phrases(key_phrases_raw, technical_skills, soft_skills)
+
+@_node('content_analysis', 'document', timing='extract.content_analysis')
+def _content_analysis(document):
+    return analyse_resume_content(document)
+
+@_node('summary', 'contact', 'technical_skills', 'soft_skills', 'key_phrases', 'degrees')
+def _summary(contact, technical_skills, soft_skills, key_phrases, degrees):
+    return summarise_extraction(contact, technical_skills, soft_skills, key_phrases, degrees)
+
+@_node('extracted_info', 'contact', 'technical_skills', 'soft_skills', 'key_phrases', 'degrees',
+       'content_analysis', 'summary')
+def _extracted_info(contact, technical_skills, soft_skills, key_phrases, degrees, content_analysis, summary):
+    # Same structure as extract_all_information
+    return {
+        'contact': contact,
+        'technical_skills': technical_skills,
+        'soft_skills': soft_skills,
+        'key_phrases': key_phrases,
+        'degrees': degrees,
+        'content_analysis': content_analysis,
+        'summary': summary
+    }
+
+# --- Scoring ---
+
+@_node('ats_flags', 'document', 'parsing_metadata')
+def _ats_flags(document, parsing_metadata):
+    parsing_metadata = parsing_metadata or {}
+    char_classes = document.char_classes
+    total_chars = char_classes['total']
+    return {
+        'has_images': parsing_metadata.get('has_images', False),
+        'image_count': parsing_metadata.get('image_count', 0),
+        'has_columns': parsing_metadata.get('has_columns', False),
+        'has_tables': parsing_metadata.get('has_tables', False),
+        'parsing_issues': parsing_metadata.get('parsing_issues', []),
+        'special_ratio': char_classes['special'] / total_chars if total_chars > 0 else 0.0,
+        'problematic_ratio': char_classes['problematic'] / total_chars if total_chars > 0 else 0.0
+    }
+
+@_node('readability', 'document', 'parsing_metadata', timing='score.readability')
+def _readability(document, parsing_metadata):
+    score, feedback = analyse_text_complexity(document, parsing_metadata)
+    return {'score': score, 'max_score': 10, 'feedback': feedback}
+
+@_node('formatting', 'contact', 'degrees', 'key_phrases', 'technical_skills', 'soft_skills',
+       timing='score.formatting')
+def _formatting(contact, degrees, key_phrases, technical_skills, soft_skills):
+    score, feedback = calculate_formatting_score({
+        'contact': contact, 'degrees': degrees, 'key_phrases': key_phrases,
+        'technical_skills': technical_skills, 'soft_skills': soft_skills
+    })
+    return {'score': score, 'max_score': 10, 'feedback': feedback}
+
+@_node('content', 'content_analysis', timing='score.content')
+def _content(content_analysis):
+    score, feedback = calculate_content_score({'content_analysis': content_analysis})
+    return {'score': score, 'max_score': 10, 'feedback': feedback}
+
+@_node('job_match', 'degrees', 'technical_skills', 'soft_skills', 'job', timing='score.job_match')
+def _job_match(degrees, technical_skills, soft_skills, job):
+    job = job or get_default_job()
+    percentage, feedback = calculate_job_match_score(
+        {'degrees': degrees, 'technical_skills': technical_skills, 'soft_skills': soft_skills}, job)
+    return {'percentage': percentage, 'feedback': feedback, 'job_id': job.job_id, 'job_title': job.title}
+
+@_node('top_jobs', 'degrees', 'technical_skills', 'soft_skills', 'job_engine', 'recommend_jobs',
+       timing='score.recommend_jobs')
+def _top_jobs(degrees, technical_skills, soft_skills, job_engine, recommend_jobs):
+    if job_engine is None or not recommend_jobs:
+        return []
+    return job_engine.top_k({'degrees': degrees, 'technical_skills': technical_skills, 'soft_skills': soft_skills},
+                            recommend_jobs)
+
+@_node('scores', 'readability', 'formatting', 'content', 'job_match', 'parsing_metadata')
+def _scores(readability, formatting, content, job_match, parsing_metadata):
+    # Same structure as calculate_all_scores
+    return {
+        'readability': readability,
+        'formatting': formatting,
+        'content': content,
+        'job_match': job_match,
+        'parsing_metadata': parsing_metadata or {}
+    }
+
+OUTPUTS = tuple(NODES)
+
+def plan(outputs: Iterable[str], known: Iterable[str] = ()) -> List[str]:
+    """
+    Return the nodes needed for `outputs`, dependencies first, skipping values already known.
+    Raises ValueError for an unknown output name.
+    """
+    known = set(INPUTS) | set(known)
+    order: List[str] = []
+    visited = set()
+
+    def visit(name: str):
+        if name in visited or name in known:
+            return
+        node = NODES.get(name)
+        if node is None:
+            raise ValueError(f"Unknown analysis output: {name} (available: {', '.join(OUTPUTS)})")
+        visited.add(name)
+        for dependency in node.dependencies:
+            visit(dependency)
+        order.append(name)
+
+    for name in outputs:
+        visit(name)
+    return order
+
+class AnalysisPipeline:
+    """
+    Evaluates only the parts of the analysis needed for the requested outputs. For example,
+    'job_match' needs the skills and degrees but no contact details, key phrases,
+    content analysis or readability. With `max_workers` > 1, nodes whose dependencies
+    are ready run concurrently on a thread pool.
+    """
+
+    def __init__(self, max_workers: int = 1):
+        self.max_workers = max_workers
+
+    def evaluate(self, outputs: Iterable[str], document, parsing_metadata: Optional[Dict[str, Any]] = None,
+                 job=None, job_engine=None, recommend_jobs: int = 0, known: Optional[Dict[str, Any]] = None,
+                 timings: Optional[Dict[str, int]] = None) -> Dict[str, Any]:
+        """
+        Compute the requested outputs for a cleaned ResumeDocument.
+        `known` may supply node values computed elsewhere (e.g. by a LineExtractor while streaming).
+        If `timings` is given, the nanoseconds spent in each timed node are recorded in it.
+        Returns the requested outputs by name.
+        """
+        outputs = list(outputs)
+        values: Dict[str, Any] = {
+            'document': document,
+            'parsing_metadata': parsing_metadata,
+            'job': job,
+            'job_engine': job_engine,
+            'recommend_jobs': recommend_jobs
+        }
+        values.update(known or {})
+        order = plan(outputs, values)
+        logger.debug(f"Evaluating {len(order)} node(s) for {', '.join(outputs)}: {', '.join(order)}")
+
+        if self.max_workers <= 1 or len(order) <= 1:
+            for name in order:
+                values[name] = self._run(NODES[name], values, timings)
+        else:
+            self._run_concurrently(order, values, timings)
+        return {name: values[name] for name in outputs}
+
+    def _run_concurrently(self, order: List[str], values: Dict[str, Any], timings: Optional[Dict[str, int]]):
+        """Run the planned nodes on a thread pool, submitting each one as soon as its dependencies are done."""
+        pending = list(order)
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            running = {}
+            while pending or running:
+                for name in [name for name in pending
+                             if all(dependency in values for dependency in NODES[name].dependencies)]:
+                    pending.remove(name)
+                    running[pool.submit(self._run, NODES[name], values, timings)] = name
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    values[running.pop(future)] = future.result()
+
+    @staticmethod
+    def _run(node: Node, values: Dict[str, Any], timings: Optional[Dict[str, int]]) -> Any:
+        arguments = [values[dependency] for dependency in node.dependencies]
+        if node.timing is None:
+            return node.compute(*arguments)
+        with timed(timings, node.timing):
+            return node.compute(*arguments)
@@ -1,66 +1,162 @@
 """Report generation for resume analysis results."""
 
 import logging
-from typing import Dict, Any, List
-from .job_data import get_job_requirements
+from typing import Dict, Any, List, Optional
+from .job_data import PreparedJob, get_default_job
+from .metrics import format_timings
 
 logger = logging.getLogger(__name__)
 
-def format_job_requirements(job_req: Dict[str, Any]) -> str:
-    """Formats the job requirements into a displayable string."""
+# Bump whenever the fields of the report record change
+REPORT_RECORD_VERSION = 2
+
+# 'text' renders the human-readable report, 'json' keeps the structured record
+REPORT_FORMATS = ('text', 'json')
+
+def job_keywords(job_req: Dict[str, Any]) -> Dict[str, List[str]]:
+    """Collects the education, technical and soft skill keywords of the job requirements."""
+    essential = job_req.get('essential', {})
+    hard_skills = job_req.get('hard_skills', {})
+    return {
+        'education': essential.get('degrees', []) + essential.get('fields_of_study', []),
+        'technical': hard_skills.get('software', []) + hard_skills.get('engineering_disciplines', []) + hard_skills.get('technical_tasks', []),
+        'soft': job_req.get('hard_matches', [])
+    }
+
+def format_job_keywords(keywords: Dict[str, List[str]]) -> str:
+    """Formats the job keywords (from job_keywords) into a displayable string."""
     lines = []
     lines.append("🎯 KEYWORDS FROM JOB DESCRIPTION")
     lines.append("-" * 35)
 
     # Education
-    essential = job_req.get('essential', {})
-    degrees = essential.get('degrees', [])
-    fields = essential.get('fields_of_study', [])
-    if degrees or fields:
-        education_keywords = degrees + fields
+    education_keywords = keywords.get('education', [])
+    if education_keywords:
         lines.append(f"Education: {', '.join(education_keywords)}")
 
     # Hard Skills
-    hard_skills = job_req.get('hard_skills', {})
-    all_hard_skills = hard_skills.get('software', []) + hard_skills.get('engineering_disciplines', []) + hard_skills.get('technical_tasks', [])
+    all_hard_skills = keywords.get('technical', [])
     if all_hard_skills:
         display_skills = all_hard_skills[:12]
         lines.append(f"Technical Keywords: {', '.join(display_skills)}{'...' if len(all_hard_skills) > 12 else ''}")
 
     # Soft Skills
-    soft_skills = job_req.get('hard_matches', [])
+    soft_skills = keywords.get('soft', [])
     if soft_skills:
         lines.append(f"Soft Skill Keywords: {', '.join(soft_skills)}")
     
     lines.append("") # for spacing
     return "\n".join(lines)
 
-def generate_final_report(extracted_info: Dict[str, Any], scores: Dict[str, Any]) -> str:
-    """Generate a comprehensive final report with scores and feedback."""
+def format_job_requirements(job_req: Dict[str, Any]) -> str:
+    """Formats the job requirements into a displayable string."""
+    return format_job_keywords(job_keywords(job_req))
+
+def format_processing_times(timings: Dict[str, int]) -> str:
+    """Formats per-stage timings (nanoseconds) into a displayable string."""
+    lines = []
+    lines.append("⏱️ PROCESSING TIMES")
+    lines.append("-" * 20)
+    for stage, milliseconds in format_timings(timings).items():
+        lines.append(f"{stage}: {milliseconds:.3f} ms")
+    lines.append("")
+    return "\n".join(lines)
+
+def format_job_recommendations(top_jobs: List[Dict[str, Any]]) -> str:
+    """Formats the best-matching jobs from the job match engine into a displayable string."""
+    lines = []
+    lines.append("🧭 BEST-MATCHING OPENINGS")
+    lines.append("-" * 25)
+    for rank, match in enumerate(top_jobs, 1):
+        lines.append(f"{rank}. {match['title']}: {match['percentage']:.1f}%")
+        lines.extend(f"   {line}" for line in match['feedback'].split("\n")[1:])
+    lines.append("")
+    return "\n".join(lines)
+
+def calculate_overall_score(scores: Dict[str, Any]) -> float:
+    """Weighted overall score (0-100) from the readability, formatting, content and job match scores."""
+    readability = scores.get('readability', {}).get('score', 0)
+    formatting = scores.get('formatting', {}).get('score', 0)
+    content = scores.get('content', {}).get('score', 0)
+    job_match = scores.get('job_match', {}).get('percentage', 0) / 10
+    
+    return (readability * 0.15 + formatting * 0.20 + content * 0.30 + job_match * 0.35) * 10
+
+def overall_fit(overall_score: float) -> str:
+    """Classifies an overall score as 'excellent', 'good' or 'moderate' fit."""
+    if overall_score >= 80: return 'excellent'
+    elif overall_score >= 65: return 'good'
+    else: return 'moderate'
+
+FIT_LABELS = {'excellent': "🟢 Excellent fit", 'good': "🟡 Good fit", 'moderate': "🟠 Moderate fit"}
+
+def build_report_record(extracted_info: Dict[str, Any], scores: Dict[str, Any],
+                        timings: Optional[Dict[str, int]] = None, job: Optional[PreparedJob] = None,
+                        top_jobs: Optional[List[Dict[str, Any]]] = None,
+                        resume_path: Optional[str] = None,
+                        duplicate_of: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Build the structured report against `job` (the built-in job if None): a JSON-serialisable
+    dict with the scores, overall assessment, extracted information, parsing metadata,
+    best-matching jobs, recommendations and per-stage timings (nanoseconds).
+    `duplicate_of` describes the earlier resume this one nearly duplicates, if any.
+    The text report is rendered from it by render_text_report.
+    """
+    job = job or get_default_job()
+    overall_score = calculate_overall_score(scores)
+    return {
+        'record_version': REPORT_RECORD_VERSION,
+        'resume_path': resume_path,
+        'duplicate_of': duplicate_of,
+        'job': {'job_id': job.job_id, 'title': job.title, 'keywords': job_keywords(job.requirements)},
+        'overall_score': overall_score,
+        'fit': overall_fit(overall_score),
+        'scores': {name: scores[name] for name in ('readability', 'formatting', 'content', 'job_match') if name in scores},
+        'parsing_metadata': scores.get('parsing_metadata') or {},
+        'extracted_info': extracted_info,
+        'top_jobs': top_jobs or [],
+        'recommendations': generate_recommendations(scores, extracted_info),
+        'timings': dict(timings) if timings else {},
+        'error': None
+    }
+
+def build_error_record(resume_path: Optional[str], error: str) -> Dict[str, Any]:
+    """The record of a resume whose analysis failed."""
+    return {'record_version': REPORT_RECORD_VERSION, 'resume_path': resume_path, 'error': error}
+
+def generate_final_report(extracted_info: Dict[str, Any], scores: Dict[str, Any],
+                          timings: Optional[Dict[str, int]] = None, job: Optional[PreparedJob] = None,
+                          top_jobs: Optional[List[Dict[str, Any]]] = None) -> str:
+    """
+    Generate a comprehensive final report with scores and feedback against `job` (the built-in job if None).
+    `top_jobs` (from the job match engine) adds a section of best-matching openings.
+    If `timings` is given, the per-stage processing times are appended as metadata.
+    """
+    return render_text_report(build_report_record(extracted_info, scores, timings=timings, job=job, top_jobs=top_jobs))
+
+def render_text_report(record: Dict[str, Any]) -> str:
+    """Render the human-readable report from a record built by build_report_record."""
+    scores = record['scores']
+    extracted_info = record['extracted_info']
     
     report_lines = []
     
     # --- Header ---
     report_lines.append("🔍 RESUME ANALYSIS REPORT")
     report_lines.append("=" * 50)
-    report_lines.append(f"Job Target: Civil Engineer - Early Career (COSVEC)")
+    report_lines.append(f"Job Target: {record['job']['title']}")
+    duplicate_of = record.get('duplicate_of')
+    if duplicate_of:
+        reused = f"; reused its {' and '.join(duplicate_of['reused'])} results" if duplicate_of['reused'] else ""
+        report_lines.append(f"Near-duplicate of: {duplicate_of['resume_path']} "
+                            f"({duplicate_of['similarity'] * 100:.0f}% similar{reused})")
     report_lines.append("")
     
     # --- Executive Summary ---
     report_lines.append("📊 EXECUTIVE SUMMARY")
     report_lines.append("-" * 20)
     
-    readability = scores.get('readability', {}).get('score', 0)
-    formatting = scores.get('formatting', {}).get('score', 0)
-    content = scores.get('content', {}).get('score', 0)
-    job_match = scores.get('job_match', {}).get('percentage', 0) / 10
-    
-    overall_score = (readability * 0.15 + formatting * 0.20 + content * 0.30 + job_match * 0.35) * 10
-    
-    if overall_score >= 80: assessment = f"🟢 Excellent fit ({overall_score:.1f}%)"
-    elif overall_score >= 65: assessment = f"🟡 Good fit ({overall_score:.1f}%)"
-    else: assessment = f"🟠 Moderate fit ({overall_score:.1f}%)"
-        
+    assessment = f"{FIT_LABELS[record['fit']]} ({record['overall_score']:.1f}%)"
     report_lines.append(f"Overall Assessment: {assessment}")
     report_lines.append("")
     
@@ -92,9 +188,11 @@ def generate_final_report(extracted_info: Dict[str, Any], scores: Dict[str, Any]
     report_lines.append(f"   {jm_score.get('feedback', 'N/A')}")
     report_lines.append("")
     
+    if record['top_jobs']:
+        report_lines.append(format_job_recommendations(record['top_jobs']))
+    
     # --- Keywords from Job Description ---
-    job_req = get_job_requirements()
-    report_lines.append(format_job_requirements(job_req))
+    report_lines.append(format_job_keywords(record['job']['keywords']))
     
     # --- Extracted Information ---
     report_lines.append("--- KEY INFORMATION EXTRACTED FROM RESUME ---")
@@ -126,10 +224,13 @@ def generate_final_report(extracted_info: Dict[str, Any], scores: Dict[str, Any]
     # --- Key Recommendations ---
     report_lines.append("💡 KEY RECOMMENDATIONS")
     report_lines.append("-" * 25)
-    recommendations = generate_recommendations(scores, extracted_info)
-    report_lines.extend([f"• {rec}" for rec in recommendations])
+    report_lines.extend([f"• {rec}" for rec in record['recommendations']])
     report_lines.append("")
     
+    # --- Processing Metadata ---
+    if record['timings']:
+        report_lines.append(format_processing_times(record['timings']))
+    
     report_lines.append("=" * 50)
     report_lines.append("Analysis complete. Good luck with your application! 🚀")
     
@@ -0,0 +1,246 @@
+"""Persistent SQLite store of analysis results, queryable by skill, degree and score."""
+
+import json
+import time
+import zlib
+import sqlite3
+import logging
+from pathlib import Path
+from typing import Dict, Any, List, Tuple, Iterable, Optional, Union
+
+from .skill_matcher import WORD_PATTERN
+
+logger = logging.getLogger(__name__)
+
+# Analyses written per transaction by add_many
+STORE_BATCH_SIZE = 1000
+
+# Fast zlib level for the stored JSON details; higher levels save little on this text and cost 3x the time
+DETAILS_COMPRESSION_LEVEL = 1
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS analyses (
+    id INTEGER PRIMARY KEY,
+    resume_path TEXT NOT NULL,
+    job_id TEXT NOT NULL,
+    job_title TEXT,
+    analysed_at REAL NOT NULL,
+    job_match REAL,
+    readability REAL,
+    formatting REAL,
+    content REAL,
+    email TEXT,
+    phone TEXT,
+    has_images INTEGER NOT NULL DEFAULT 0,
+    has_columns INTEGER NOT NULL DEFAULT 0,
+    details BLOB
+);
+CREATE UNIQUE INDEX IF NOT EXISTS analyses_resume_job ON analyses (resume_path, job_id);
+CREATE INDEX IF NOT EXISTS analyses_job_match ON analyses (job_match);
+CREATE INDEX IF NOT EXISTS analyses_job_id_match ON analyses (job_id, job_match);
+
+CREATE TABLE IF NOT EXISTS skills (
+    analysis_id INTEGER NOT NULL REFERENCES analyses (id) ON DELETE CASCADE,
+    kind TEXT NOT NULL,
+    skill TEXT NOT NULL,
+    name TEXT NOT NULL,
+    PRIMARY KEY (analysis_id, kind, skill)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS skills_skill ON skills (skill, analysis_id);
+
+CREATE TABLE IF NOT EXISTS degrees (
+    analysis_id INTEGER NOT NULL REFERENCES analyses (id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    degree TEXT NOT NULL,
+    PRIMARY KEY (analysis_id, position)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS degree_tokens (
+    analysis_id INTEGER NOT NULL REFERENCES analyses (id) ON DELETE CASCADE,
+    token TEXT NOT NULL,
+    PRIMARY KEY (analysis_id, token)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS degree_tokens_token ON degree_tokens (token, analysis_id);
+"""
+
+SUMMARY_COLUMNS = ('id', 'resume_path', 'job_id', 'job_title', 'analysed_at', 'job_match',
+                   'readability', 'formatting', 'content', 'email', 'phone', 'has_images', 'has_columns')
+
+class ResultsStore:
+    """
+    Normalized SQLite tables of analysis results: one row per (resume, target job) in
+    `analyses` with the scores, and one row per skill, degree entry and degree word in
+    `skills`, `degrees` and `degree_tokens`, each indexed for lookups by value. The full
+    extracted information and scores are kept as compressed JSON for `get`.
+
+    The database runs in WAL mode so queries can run while a batch is writing, and
+    `add_many` inserts in large transactions with `executemany`. Storing a resume again
+    for the same job replaces its previous analysis.
+    """
+
+    def __init__(self, db_path: Union[str, Path]):
+        self.db_path = Path(db_path)
+        if self.db_path.parent != Path(''):
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.connection = sqlite3.connect(str(self.db_path))
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        # Durable at checkpoints; a crash can only lose the last transactions, never corrupt the file
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.execute("PRAGMA foreign_keys=ON")
+        self.connection.executescript(SCHEMA)
+        logger.debug(f"Results store {self.db_path}: {self.count()} analyses")
+
+    def close(self):
+        self.connection.close()
+
+    def __enter__(self) -> "ResultsStore":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def add(self, resume_path: str, extracted_info: Dict[str, Any], scores: Dict[str, Any]) -> int:
+        """Store one analysis. Returns the number of analyses written (1)."""
+        return self.add_many([(resume_path, extracted_info, scores)])
+
+    def add_many(self, items: Iterable[Tuple[str, Dict[str, Any], Dict[str, Any]]],
+                 batch_size: int = STORE_BATCH_SIZE) -> int:
+        """
+        Store (resume path, extract_all_information output, calculate_all_scores output) triples,
+        `batch_size` per transaction. Returns the number of analyses written.
+        """
+        written = 0
+        batch: List[Tuple[str, Dict[str, Any], Dict[str, Any]]] = []
+        for item in items:
+            batch.append(item)
+            if len(batch) >= batch_size:
+                written += self._insert_batch(batch)
+                batch = []
+        if batch:
+            written += self._insert_batch(batch)
+        return written
+
+    def _insert_batch(self, batch: List[Tuple[str, Dict[str, Any], Dict[str, Any]]]) -> int:
+        # A later analysis of the same resume and job in the batch wins; paths are stored absolute,
+        # so a resume analysed through a relative and an absolute path replaces its earlier analysis
+        latest: Dict[Tuple[str, str], Tuple[Dict[str, Any], Dict[str, Any]]] = {}
+        for resume_path, extracted_info, scores in batch:
+            job_id = scores.get('job_match', {}).get('job_id') or ''
+            key = (str(Path(resume_path).resolve()), job_id)
+            latest.pop(key, None)
+            latest[key] = (extracted_info, scores)
+
+        analysed_at = time.time()
+        analysis_rows = []
+        skill_rows = []
+        degree_rows = []
+        token_rows = []
+        with self.connection:
+            self.connection.executemany("DELETE FROM analyses WHERE resume_path = ? AND job_id = ?", list(latest))
+            next_id = self.connection.execute("SELECT COALESCE(MAX(id), 0) + 1 FROM analyses").fetchone()[0]
+            for analysis_id, ((resume_path, job_id), (extracted_info, scores)) in enumerate(latest.items(), next_id):
+                analysis_rows.append(self._analysis_row(analysis_id, resume_path, job_id, analysed_at,
+                                                        extracted_info, scores))
+                for kind in ('technical', 'soft'):
+                    for name in extracted_info.get(f'{kind}_skills', []):
+                        skill_rows.append((analysis_id, kind, name.lower(), name))
+                tokens = set()
+                for position, degree in enumerate(extracted_info.get('degrees', [])):
+                    degree_rows.append((analysis_id, position, degree))
+                    tokens.update(WORD_PATTERN.findall(degree.lower()))
+                token_rows.extend((analysis_id, token) for token in tokens)
+
+            self.connection.executemany(
+                f"INSERT INTO analyses ({', '.join(SUMMARY_COLUMNS)}, details) "
+                f"VALUES ({', '.join('?' * (len(SUMMARY_COLUMNS) + 1))})", analysis_rows)
+            self.connection.executemany("INSERT OR IGNORE INTO skills VALUES (?, ?, ?, ?)", skill_rows)
+            self.connection.executemany("INSERT INTO degrees VALUES (?, ?, ?)", degree_rows)
+            self.connection.executemany("INSERT INTO degree_tokens VALUES (?, ?)", token_rows)
+        logger.debug(f"Stored {len(analysis_rows)} analyses with {len(skill_rows)} skills")
+        return len(analysis_rows)
+
+    @staticmethod
+    def _analysis_row(analysis_id: int, resume_path: str, job_id: str, analysed_at: float,
+                      extracted_info: Dict[str, Any], scores: Dict[str, Any]) -> tuple:
+        contact = extracted_info.get('contact', {})
+        metadata = scores.get('parsing_metadata') or {}
+        job_match = scores.get('job_match', {})
+        details = zlib.compress(json.dumps({'extracted_info': extracted_info, 'scores': scores},
+                                           ensure_ascii=False, separators=(',', ':')).encode('utf-8'),
+                                DETAILS_COMPRESSION_LEVEL)
+        return (
+            analysis_id, resume_path, job_id, job_match.get('job_title'), analysed_at,
+            job_match.get('percentage'),
+            scores.get('readability', {}).get('score'),
+            scores.get('formatting', {}).get('score'),
+            scores.get('content', {}).get('score'),
+            (contact.get('emails') or [None])[0],
+            (contact.get('phones') or [None])[0],
+            int(bool(metadata.get('has_images'))),
+            int(bool(metadata.get('has_columns'))),
+            details
+        )
+
+    def query(self, skills: Iterable[str] = (), degree: Optional[str] = None, min_job_match: Optional[float] = None,
+              job_id: Optional[str] = None, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Return the stored analyses that have all of `skills` (canonical names, any case), whose
+        degree entries contain every word of `degree`, and whose job match is at least
+        `min_job_match` percent (for `job_id` if given); best job match first.
+        """
+        conditions = []
+        parameters: List[Any] = []
+        skills = sorted({skill.lower() for skill in skills})
+        if skills:
+            conditions.append("a.id IN (" + " INTERSECT ".join(
+                ["SELECT analysis_id FROM skills WHERE skill = ?"] * len(skills)) + ")")
+            parameters.extend(skills)
+        tokens = sorted(set(WORD_PATTERN.findall(degree.lower()))) if degree else []
+        if tokens:
+            conditions.append("a.id IN (" + " INTERSECT ".join(
+                ["SELECT analysis_id FROM degree_tokens WHERE token = ?"] * len(tokens)) + ")")
+            parameters.extend(tokens)
+        if min_job_match is not None:
+            conditions.append("a.job_match >= ?")
+            parameters.append(min_job_match)
+        if job_id is not None:
+            conditions.append("a.job_id = ?")
+            parameters.append(job_id)
+
+        sql = f"SELECT {', '.join('a.' + column for column in SUMMARY_COLUMNS)} FROM analyses a"
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        sql += " ORDER BY a.job_match DESC, a.id"
+        if limit is not None:
+            sql += " LIMIT ?"
+            parameters.append(limit)
+        rows = self.connection.execute(sql, parameters).fetchall()
+        return [self._summary(row) for row in rows]
+
+    @staticmethod
+    def _summary(row: tuple) -> Dict[str, Any]:
+        summary = dict(zip(SUMMARY_COLUMNS, row))
+        summary['has_images'] = bool(summary['has_images'])
+        summary['has_columns'] = bool(summary['has_columns'])
+        return summary
+
+    def get(self, analysis_id: int) -> Optional[Dict[str, Any]]:
+        """Return a stored analysis with its full extracted information and scores, or None."""
+        row = self.connection.execute(
+            f"SELECT {', '.join(SUMMARY_COLUMNS)}, details FROM analyses WHERE id = ?", (analysis_id,)).fetchone()
+        if row is None:
+            return None
+        summary = self._summary(row[:-1])
+        summary.update(json.loads(zlib.decompress(row[-1]).decode('utf-8')))
+        return summary
+
+    def skill_counts(self, limit: int = 20) -> List[Tuple[str, int]]:
+        """Return the most common skills across stored analyses as (name, count), most common first."""
+        rows = self.connection.execute(
+            "SELECT MIN(name), COUNT(*) AS analyses FROM skills GROUP BY skill "
+            "ORDER BY analyses DESC, skill LIMIT ?", (limit,)).fetchall()
+        return [(name, count) for name, count in rows]
+
+    def count(self) -> int:
+        """Number of stored analyses."""
+        return self.connection.execute("SELECT COUNT(*) FROM analyses").fetchone()[0]
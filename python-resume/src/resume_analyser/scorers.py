@@ -1,12 +1,18 @@
 """Scoring algorithms for resume analysis."""
 
 import logging
-from typing import Dict, Any, Tuple
+from typing import Dict, Any, List, Tuple, Optional, Union
 from .text_processor import analyse_text_complexity
-from .job_data import get_job_requirements
+from .document import TextInput
+from .metrics import timed
+from .job_data import PreparedJob, prepare_job, get_default_job
+from .fuzzy_match import best_matches, approximate_matches
 
 logger = logging.getLogger(__name__)
 
+# Bump whenever the scores change so memoized stage results are not reused
+SCORER_VERSION = "2"
+
 def calculate_formatting_score(extracted_info: Dict[str, Any]) -> Tuple[float, str]:
     """
     Calculates formatting score based on the successful extraction of key components.
@@ -73,95 +79,96 @@ def calculate_content_score(extracted_info: Dict[str, Any]) -> Tuple[float, str]
 
     return score, detailed_feedback
 
-def calculate_job_match_score(extracted_info: Dict[str, Any], job_req: Dict[str, Any]) -> Tuple[float, str]:
-    """Calculates a detailed job match score based on the new job data structure."""
-    
-    weights = {'education': 0.25, 'hard_skills': 0.5, 'soft_skills': 0.25}
-    scores = {'education': 0.0, 'hard_skills': 0.0, 'soft_skills': 0.0}
+# Weight of each requirement group in the job match percentage
+JOB_MATCH_WEIGHTS = {'education': 0.25, 'hard_skills': 0.5, 'soft_skills': 0.25}
+
+def job_match_percentage(found_degree: bool, found_field: bool, hard_matched: int, hard_total: int,
+                         soft_matched: int, soft_total: int) -> float:
+    """Combines requirement match counts into the weighted job match percentage."""
+    education_score = (0.5 * found_degree) + (0.5 * found_field)
+    hard_skill_score = hard_matched / hard_total if hard_total else 1.0
+    soft_skill_score = soft_matched / soft_total if soft_total else 1.0
+    return min(100, (education_score * JOB_MATCH_WEIGHTS['education'] +
+                     hard_skill_score * JOB_MATCH_WEIGHTS['hard_skills'] +
+                     soft_skill_score * JOB_MATCH_WEIGHTS['soft_skills']) * 100)
+
+def format_job_match_breakdown(found_degree: bool, found_field: bool, hard_matched: int, hard_total: int,
+                               soft_matched: int, soft_total: int,
+                               approximate: Optional[List[Tuple[str, str, float]]] = None) -> str:
+    """
+    Formats the education / hard skill / soft skill breakdown of a job match.
+    `approximate` lists the (required skill, resume skill, confidence) of hard skills matched only approximately.
+    """
+    education_score = (0.5 * found_degree) + (0.5 * found_field)
+    hard_skill_score = hard_matched / hard_total if hard_total else 1.0
+    soft_skill_score = soft_matched / soft_total if soft_total else 1.0
     feedback_parts = ["📊 JOB MATCH BREAKDOWN:"]
+    feedback_parts.append(f"• Education Match: {education_score*100:.0f}% (Degree: {'✓' if found_degree else '✗'}, Field: {'✓' if found_field else '✗'})")
+    feedback_parts.append(f"• Hard Skills Match: {hard_skill_score*100:.0f}% ({hard_matched}/{hard_total} found)")
+    feedback_parts.append(f"• Soft Skills Match: {soft_skill_score*100:.0f}% ({soft_matched}/{soft_total} found)")
+    if approximate:
+        matches = ", ".join(f"{required} ≈ {found} ({confidence*100:.0f}%)" for required, found, confidence in approximate)
+        feedback_parts.append(f"• Approximate Skill Matches: {matches}")
+    return "\n".join(feedback_parts)
+
+def calculate_job_match_score(extracted_info: Dict[str, Any], job_req: Union[Dict[str, Any], PreparedJob]) -> Tuple[float, str]:
+    """
+    Calculates a detailed job match score based on the new job data structure.
+    `job_req` may be a requirements dict or a PreparedJob, which skips re-lowercasing the requirements.
+    """
+    job = prepare_job(job_req)
 
     # --- 1. Education Match ---
-    education_reqs = job_req.get('essential', {})
-    degrees_req = [d.lower() for d in education_reqs.get('degrees', [])]
-    fields_req = [f.lower() for f in education_reqs.get('fields_of_study', [])]
-    
-    found_degree = False
-    found_field = False
-    
     extracted_degrees_text = " ".join(extracted_info.get('degrees', [])).lower()
-    
-    if any(req in extracted_degrees_text for req in degrees_req):
-        found_degree = True
-    if any(req in extracted_degrees_text for req in fields_req):
-        found_field = True
-        
-    education_score = (0.5 * found_degree) + (0.5 * found_field)
-    scores['education'] = education_score
-    feedback_parts.append(f"• Education Match: {education_score*100:.0f}% (Degree: {'✓' if found_degree else '✗'}, Field: {'✓' if found_field else '✗'})")
+    found_degree = any(req in extracted_degrees_text for req in job.degree_terms)
+    found_field = any(req in extracted_degrees_text for req in job.field_terms)
 
     # --- 2. Hard Skills Match ---
-    hard_skills_req = job_req.get('hard_skills', {})
-    all_hard_skills_req = [s.lower() for s in hard_skills_req.get('software', [])] + \
-                          [s.lower() for s in hard_skills_req.get('engineering_disciplines', [])] + \
-                          [s.lower() for s in hard_skills_req.get('technical_tasks', [])]
-    
+    # Equal, either containing the other, or a spelling variant / typo (see fuzzy_match)
     resume_tech_skills = {s.lower() for s in extracted_info.get('technical_skills', [])}
-    
-    matched_hard_skills_count = 0
-    for req_skill in all_hard_skills_req:
-        if req_skill in resume_tech_skills:
-            matched_hard_skills_count += 1
-        else:
-            for resume_skill in resume_tech_skills:
-                if req_skill in resume_skill or resume_skill in req_skill:
-                    matched_hard_skills_count += 1
-                    break
-    
-    hard_skill_score = matched_hard_skills_count / len(all_hard_skills_req) if all_hard_skills_req else 1.0
-    scores['hard_skills'] = hard_skill_score
-    feedback_parts.append(f"• Hard Skills Match: {hard_skill_score*100:.0f}% ({matched_hard_skills_count}/{len(all_hard_skills_req)} found)")
+    hard_matches = best_matches(job.hard_index, resume_tech_skills)
+    matched_hard_skills_count = sum(1 for req_skill in job.hard_terms if req_skill in hard_matches)
 
     # --- 3. Soft Skills Match ---
-    soft_skills_req_list = job_req.get('hard_matches', [])
-    soft_skills_map = job_req.get('soft_matches', {})
     resume_soft_skills = {s.lower() for s in extracted_info.get('soft_skills', [])}
-    
-    matched_soft_skills_count = 0
-    for req_skill_key in soft_skills_req_list:
-        req_skill_key_lower = req_skill_key.lower()
-        synonyms = [s.lower() for s in soft_skills_map.get(req_skill_key, [])]
-        search_terms = {req_skill_key_lower} | set(synonyms)
-        
-        if any(term in resume_soft_skills for term in search_terms):
-             matched_soft_skills_count += 1
-
-    soft_skill_score = matched_soft_skills_count / len(soft_skills_req_list) if soft_skills_req_list else 1.0
-    scores['soft_skills'] = soft_skill_score
-    feedback_parts.append(f"• Soft Skills Match: {soft_skill_score*100:.0f}% ({matched_soft_skills_count}/{len(soft_skills_req_list)} found)")
+    matched_soft_skills_count = sum(1 for search_terms in job.soft_groups if not search_terms.isdisjoint(resume_soft_skills))
     
     # --- Final Score ---
-    total_score = min(100, (scores['education'] * weights['education'] +
-                   scores['hard_skills'] * weights['hard_skills'] +
-                   scores['soft_skills'] * weights['soft_skills']) * 100)
-                   
-    return total_score, "\n".join(feedback_parts)
-
-
-def calculate_all_scores(text: str, extracted_info: Dict[str, Any], parsing_metadata: Dict[str, Any] = None) -> Dict[str, Any]:
-    """Calculate all scores and return consolidated results."""
+    total_score = job_match_percentage(found_degree, found_field,
+                                       matched_hard_skills_count, len(job.hard_terms),
+                                       matched_soft_skills_count, len(job.soft_groups))
+    feedback = format_job_match_breakdown(found_degree, found_field,
+                                          matched_hard_skills_count, len(job.hard_terms),
+                                          matched_soft_skills_count, len(job.soft_groups),
+                                          approximate_matches(job.hard_terms, hard_matches))
+    return total_score, feedback
+
+
+def calculate_all_scores(text: TextInput, extracted_info: Dict[str, Any], parsing_metadata: Dict[str, Any] = None,
+                         timings: Optional[Dict[str, int]] = None, job: Optional[PreparedJob] = None) -> Dict[str, Any]:
+    """
+    Calculate all scores and return consolidated results.
+    The job match is scored against `job` (the built-in job if None).
+    If `timings` is given, the nanoseconds spent in each scorer are recorded in it.
+    """
 
-    readability_score, readability_feedback = analyse_text_complexity(text, parsing_metadata)
-    formatting_score, formatting_feedback = calculate_formatting_score(extracted_info)
-    content_score, content_feedback = calculate_content_score(extracted_info)
+    with timed(timings, 'score.readability'):
+        readability_score, readability_feedback = analyse_text_complexity(text, parsing_metadata)
+    with timed(timings, 'score.formatting'):
+        formatting_score, formatting_feedback = calculate_formatting_score(extracted_info)
+    with timed(timings, 'score.content'):
+        content_score, content_feedback = calculate_content_score(extracted_info)
     
     # New, detailed job match score
-    job_req = get_job_requirements()
-    job_match_percentage, job_match_feedback = calculate_job_match_score(extracted_info, job_req)
+    with timed(timings, 'score.job_match'):
+        job = job or get_default_job()
+        match_percentage, job_match_feedback = calculate_job_match_score(extracted_info, job)
 
     return {
         'readability': {'score': readability_score, 'max_score': 10, 'feedback': readability_feedback},
         'formatting': {'score': formatting_score, 'max_score': 10, 'feedback': formatting_feedback},
         'content': {'score': content_score, 'max_score': 10, 'feedback': content_feedback},
-        'job_match': {'percentage': job_match_percentage, 'feedback': job_match_feedback},
+        'job_match': {'percentage': match_percentage, 'feedback': job_match_feedback,
+                      'job_id': job.job_id, 'job_title': job.title},
         'parsing_metadata': parsing_metadata or {}
     } 
\ No newline at end of file
@@ -0,0 +1,100 @@
+"""Compiled multi-pattern matcher for skill taxonomies."""
+
+import re
+import logging
+from typing import Dict, List, Tuple, Iterable, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+WORD_PATTERN = re.compile(r'\w+')
+
+def is_word_char(char: str) -> bool:
+    """Return True if the character counts as a word character for regex \\b purposes."""
+    return char.isalnum() or char == '_'
+
+def has_word_boundary(text: str, pos: int) -> bool:
+    """Replicate the semantics of the regex \\b assertion at a position in text."""
+    before = pos > 0 and is_word_char(text[pos - 1])
+    after = pos < len(text) and is_word_char(text[pos])
+    return before != after
+
+class SkillMatcher:
+    """
+    Finds every variation of a skill taxonomy in a single pass over the text.
+
+    Variations are indexed by their leading word, so the text is tokenised once and
+    each token is looked up in a hash table instead of running one regex per variation.
+    Results are identical to searching for r'\\b' + re.escape(variation) + r'\\b'.
+    """
+
+    def __init__(self, skill_map: Dict[str, List[str]]):
+        self.skills = list(skill_map.keys())
+        self._positions = {skill: index for index, skill in enumerate(self.skills)}
+        # Leading word -> list of (variation, skill index)
+        self._by_first_word: Dict[str, List[Tuple[str, int]]] = {}
+        # Variations that do not start with a word character cannot be anchored on a token
+        self._irregular: List[Tuple[re.Pattern, int]] = []
+        self.variation_count = 0
+
+        for skill_index, variations in enumerate(skill_map.values()):
+            for variation in variations:
+                variation = variation.lower()
+                self.variation_count += 1
+                first_word = WORD_PATTERN.match(variation)
+                if first_word is None:
+                    pattern = re.compile(r'\b' + re.escape(variation) + r'\b')
+                    self._irregular.append((pattern, skill_index))
+                    continue
+                self._by_first_word.setdefault(first_word.group(), []).append((variation, skill_index))
+
+        logger.debug(f"Compiled skill matcher: {len(self.skills)} skills, {self.variation_count} variations")
+
+    def sort_skills(self, skills: Iterable[str]) -> List[str]:
+        """Put canonical skill names found by this matcher into taxonomy order."""
+        return sorted(skills, key=self._positions.__getitem__)
+
+    def find_matches(self, text_lower: str, tokens: Optional[List[Tuple[str, int]]] = None) -> Dict[str, List[Tuple[int, int]]]:
+        """
+        Find all skill occurrences in already-lowercased text.
+        `tokens` may supply precomputed (word, start) pairs of the text to skip tokenising.
+        Returns a mapping of canonical skill name to (start, end) offsets, in taxonomy order.
+        """
+        spans: Dict[int, List[Tuple[int, int]]] = {}
+        by_first_word = self._by_first_word
+        if tokens is None:
+            tokens = [(match.group(), match.start()) for match in WORD_PATTERN.finditer(text_lower)]
+
+        for word, start in tokens:
+            candidates = by_first_word.get(word)
+            if not candidates:
+                continue
+            for variation, skill_index in candidates:
+                end = start + len(variation)
+                if text_lower.startswith(variation, start) and has_word_boundary(text_lower, end):
+                    spans.setdefault(skill_index, []).append((start, end))
+
+        for pattern, skill_index in self._irregular:
+            for match in pattern.finditer(text_lower):
+                spans.setdefault(skill_index, []).append(match.span())
+
+        return {self.skills[index]: sorted(set(spans[index])) for index in sorted(spans)}
+
+    def find_skills(self, text_lower: str, tokens: Optional[List[Tuple[str, int]]] = None) -> List[str]:
+        """Return the canonical names of all skills found in already-lowercased text."""
+        return list(self.find_matches(text_lower, tokens).keys())
+
+# Matchers are compiled once per taxonomy; the map itself is kept alive so its id stays unique
+_MATCHER_CACHE: Dict[int, Tuple[Dict[str, List[str]], SkillMatcher]] = {}
+
+def get_skill_matcher(skill_map: Union[Dict[str, List[str]], SkillMatcher]) -> SkillMatcher:
+    """
+    Return the compiled matcher for a taxonomy, building it on first use. Matchers (e.g. a
+    taxonomy.TaxonomyMatcher over a prebuilt artifact) are returned as they are.
+    """
+    if not isinstance(skill_map, dict):
+        return skill_map
+    cached = _MATCHER_CACHE.get(id(skill_map))
+    if cached is None or cached[0] is not skill_map:
+        cached = (skill_map, SkillMatcher(skill_map))
+        _MATCHER_CACHE[id(skill_map)] = cached
+    return cached[1]
@@ -0,0 +1,39 @@
+"""Memoization of analysis stage outputs across runs."""
+
+import logging
+from pathlib import Path
+from typing import Dict, Any, Optional, Union
+
+from .cache import DiskCache, hash_bytes
+
+logger = logging.getLogger(__name__)
+
+class StageCache:
+    """
+    Persists the output of each analysis stage under a key derived from the keys of the
+    stage's inputs and the stage's code version. Because keys chain from the input file's
+    content hash, changing one stage (its version or an extra input such as the target job)
+    changes the keys of that stage and everything after it, while earlier stages are reused.
+    """
+
+    def __init__(self, cache_dir: Union[str, Path], max_bytes: int = 256 * 1024 * 1024):
+        self.store = DiskCache(cache_dir, max_bytes)
+
+    @staticmethod
+    def make_key(stage: str, version: str, *input_keys: str) -> str:
+        """Build the key of a stage output from the stage, its code version and the keys of its inputs."""
+        return hash_bytes(":".join((stage, version) + input_keys).encode('utf-8'))
+
+    def get(self, stage: str, key: str) -> Optional[Dict[str, Any]]:
+        """Return a stored stage output, or None if the stage has to run."""
+        value = self.store.get(key)
+        logger.debug(f"Stage cache {'hit' if value is not None else 'miss'} for {stage}")
+        return value
+
+    def put(self, stage: str, key: str, value: Dict[str, Any]):
+        """Store a stage output."""
+        self.store.put(key, value)
+
+    def stats(self) -> Dict[str, int]:
+        """Return hit/miss counters and current size."""
+        return self.store.stats()
@@ -0,0 +1,431 @@
+"""Large skill taxonomies loaded from files and compiled into memory-mapped matcher artifacts."""
+
+import os
+import re
+import csv
+import sys
+import json
+import mmap
+import zlib
+import array
+import struct
+import hashlib
+import logging
+from pathlib import Path
+from typing import Dict, Any, List, Tuple, Iterable, Optional, Sequence, Union
+
+from .keywords import CIVIL_ENGINEERING_SKILLS, SOFT_SKILLS
+from .skill_matcher import WORD_PATTERN, has_word_boundary
+
+logger = logging.getLogger(__name__)
+
+# Bump whenever the artifact layout changes so older artifacts are rebuilt
+TAXONOMY_FORMAT_VERSION = 1
+
+ARTIFACT_MAGIC = b'RSKTAX\0\0'
+ARTIFACT_SUFFIX = '.skm'
+# Magic, format version and header length; the JSON header follows
+PREAMBLE = struct.Struct('<8sII')
+
+# Column names recognised in CSV/TSV taxonomies (e.g. ESCO's preferredLabel/altLabels)
+SKILL_COLUMNS = ('skill', 'preferredlabel', 'name', 'label')
+SYNONYM_COLUMNS = ('synonyms', 'altlabels', 'variations', 'aliases')
+
+# Decoded candidate lists kept per looked-up word; resumes share most of their vocabulary
+CANDIDATE_CACHE_SIZE = 200_000
+
+KINDS = ('technical', 'soft')
+
+def load_taxonomy(path: Union[str, Path]) -> Dict[str, List[str]]:
+    """
+    Read a taxonomy file into a skill map (canonical skill -> variations, as in keywords.py).
+    JSON files hold that object; CSV/TSV files have a skill column and an optional synonyms
+    column whose entries are separated by '|' or newlines, and rows naming the same skill are
+    merged. The lowercased canonical name is always one of a skill's variations.
+    """
+    path = Path(path)
+    if path.suffix.lower() == '.json':
+        with open(path, encoding='utf-8') as file:
+            data = json.load(file)
+        if not isinstance(data, dict):
+            raise ValueError(f"Taxonomy {path} must be a JSON object of skill -> variations")
+        rows = ((skill, variations if isinstance(variations, list) else [variations]) for skill, variations in data.items())
+    elif path.suffix.lower() in ('.csv', '.tsv'):
+        rows = _read_table(path)
+    else:
+        raise ValueError(f"Unsupported taxonomy file {path}: expected .json, .csv or .tsv")
+
+    skill_map: Dict[str, Dict[str, None]] = {}
+    for skill, variations in rows:
+        skill = skill.strip()
+        if not skill:
+            continue
+        # A dict keeps the variations unique and in file order
+        entry = skill_map.setdefault(skill, {skill.lower(): None})
+        for variation in variations:
+            variation = variation.strip().lower()
+            if variation:
+                entry[variation] = None
+    if not skill_map:
+        raise ValueError(f"Taxonomy {path} has no skills")
+    logger.info(f"Loaded taxonomy {path}: {len(skill_map)} skills")
+    return {skill: list(variations) for skill, variations in skill_map.items()}
+
+def _read_table(path: Path) -> Iterable[Tuple[str, List[str]]]:
+    with open(path, encoding='utf-8', newline='') as file:
+        reader = csv.reader(file, delimiter='\t' if path.suffix.lower() == '.tsv' else ',')
+        header = [column.strip().lower() for column in next(reader, [])]
+        skill_column = next((header.index(name) for name in SKILL_COLUMNS if name in header), None)
+        if skill_column is None:
+            raise ValueError(f"Taxonomy {path} needs one of the columns {', '.join(SKILL_COLUMNS)}")
+        synonym_column = next((header.index(name) for name in SYNONYM_COLUMNS if name in header), None)
+        for row in reader:
+            if len(row) <= skill_column:
+                continue
+            synonyms = row[synonym_column] if synonym_column is not None and len(row) > synonym_column else ''
+            yield row[skill_column], synonyms.replace('\n', '|').split('|')
+
+def taxonomy_digest(skill_map: Dict[str, List[str]]) -> str:
+    """Content hash of a skill map (order included, since results are reported in taxonomy order)."""
+    data = json.dumps(list(skill_map.items()), ensure_ascii=False, separators=(',', ':'))
+    return hashlib.sha256(data.encode('utf-8')).hexdigest()
+
+def variation_key(variation: str) -> Optional[str]:
+    """
+    Index key of a lowercased variation: its first word, joined with its second word if it has
+    one, or None if it does not start with a word character. A variation found in the text
+    starts at a token equal to its first word, followed by a token equal to its second.
+    """
+    if not variation or WORD_PATTERN.match(variation) is None:
+        return None
+    words = WORD_PATTERN.findall(variation)
+    return words[0] if len(words) == 1 else f"{words[0]} {words[1]}"
+
+def _uint32(values: Iterable[int]) -> array.array:
+    table = array.array('I', values)
+    assert table.itemsize == 4
+    return table
+
+def _hash_table(keys: List[Tuple[int, ...]], size: int, width: int) -> array.array:
+    """Open-addressing table of `width`-value (hash, values...) rows; a row whose last value is 0 is empty."""
+    table = _uint32([0]) * (size * width)
+    mask = size - 1
+    for key in keys:
+        slot = key[0] & mask
+        while table[slot * width + width - 1]:
+            slot = (slot + 1) & mask
+        table[slot * width:(slot + 1) * width] = _uint32(key)
+    return table
+
+def _table_size(count: int) -> int:
+    # At most half full, so probes stay short
+    size = 8
+    while size < count * 2:
+        size *= 2
+    return size
+
+def build_taxonomy_artifact(skill_map: Dict[str, List[str]], path: Union[str, Path],
+                            source: Optional[Dict[str, Any]] = None) -> Path:
+    """
+    Compile a skill map into a matcher artifact file that TaxonomyMatcher memory-maps.
+    Variations are grouped under the CRC-32 of their index key (variation_key) in a hash
+    table, whose rows also flag first words that start longer variations, so matching looks
+    up one key per text token (two where flagged) however large the taxonomy.
+    `source` describes the file the map was read from, to tell when the artifact is stale.
+    """
+    path = Path(path)
+    skill_names = bytearray()
+    skill_offsets = _uint32([0])
+    groups: Dict[int, List[Tuple[str, int]]] = {}
+    continued = set()
+    irregular: List[Tuple[str, int]] = []
+    for skill_index, (skill, variations) in enumerate(skill_map.items()):
+        skill_names += skill.encode('utf-8')
+        skill_offsets.append(len(skill_names))
+        for variation in dict.fromkeys(variation.lower() for variation in variations):
+            key = variation_key(variation)
+            if key is None:
+                if variation:
+                    irregular.append((variation, skill_index))
+                continue
+            groups.setdefault(zlib.crc32(key.encode('utf-8')), []).append((variation, skill_index))
+            if ' ' in key:
+                continued.add(zlib.crc32(key.split(' ', 1)[0].encode('utf-8')))
+
+    variations_blob = bytearray()
+    entries = _uint32([])
+    # Rows of (key hash, first entry, entry count, 1 + 2 if longer variations start with the key)
+    bucket_keys = []
+    for key_hash in continued.difference(groups):
+        bucket_keys.append((key_hash, 0, 0, 3))
+    for key_hash, group in groups.items():
+        bucket_keys.append((key_hash, len(entries) // 3, len(group), 3 if key_hash in continued else 1))
+        for variation, skill_index in group:
+            encoded = variation.encode('utf-8')
+            entries.extend((len(variations_blob), len(encoded), skill_index))
+            variations_blob += encoded
+    irregular_start = len(entries) // 3
+    for variation, skill_index in irregular:
+        encoded = variation.encode('utf-8')
+        entries.extend((len(variations_blob), len(encoded), skill_index))
+        variations_blob += encoded
+
+    table_size = _table_size(len(bucket_keys))
+    name_table_size = _table_size(len(skill_map))
+    # Skill name -> position + 1, to sort skills into taxonomy order
+    name_keys = [(zlib.crc32(skill.encode('utf-8')), index + 1) for index, skill in enumerate(skill_map)]
+    sections = [
+        ('skill_offsets', skill_offsets.tobytes()),
+        ('skill_names', bytes(skill_names)),
+        ('names', _hash_table(name_keys, name_table_size, 2).tobytes()),
+        ('buckets', _hash_table(bucket_keys, table_size, 4).tobytes()),
+        ('entries', entries.tobytes()),
+        ('variations', bytes(variations_blob))
+    ]
+    header = {
+        'byteorder': sys.byteorder,
+        'digest': taxonomy_digest(skill_map),
+        'skills': len(skill_map),
+        'variations': len(entries) // 3,
+        'table_size': table_size,
+        'name_table_size': name_table_size,
+        'irregular': [irregular_start, len(irregular)],
+        'source': source,
+        'sections': {}
+    }
+    # Sections start at 8-byte boundaries after the header, whose size depends on their offsets
+    header_length = 0
+    while True:
+        offset = _align(PREAMBLE.size + header_length)
+        for name, data in sections:
+            header['sections'][name] = [offset, len(data)]
+            offset = _align(offset + len(data))
+        header_bytes = json.dumps(header, separators=(',', ':')).encode('utf-8')
+        if len(header_bytes) == header_length:
+            break
+        header_length = len(header_bytes)
+    preamble = PREAMBLE.pack(ARTIFACT_MAGIC, TAXONOMY_FORMAT_VERSION, len(header_bytes))
+
+    temporary = path.with_name(path.name + '.tmp')
+    with open(temporary, 'wb') as file:
+        file.write(preamble + header_bytes)
+        for name, data in sections:
+            file.write(b'\0' * (header['sections'][name][0] - file.tell()))
+            file.write(data)
+    os.replace(temporary, path)
+    logger.info(f"Built taxonomy artifact {path}: {len(skill_map)} skills, {len(entries) // 3} variations, "
+                f"{path.stat().st_size / 1e6:.1f} MB")
+    return path
+
+def _align(offset: int) -> int:
+    return (offset + 7) & ~7
+
+class _StringTable(Sequence):
+    """Read-only sequence of the strings stored in an artifact, decoded on access."""
+
+    def __init__(self, offsets: memoryview, blob: memoryview):
+        self._offsets = offsets
+        self._blob = blob
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __getitem__(self, index: int) -> str:
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        return bytes(self._blob[self._offsets[index]:self._offsets[index + 1]]).decode('utf-8')
+
+class TaxonomyMatcher:
+    """
+    Skill matcher over a memory-mapped taxonomy artifact (see build_taxonomy_artifact), with the
+    interface and results of SkillMatcher. Opening only reads the header, and the mapped pages are
+    shared read-only by every process using the same file. Each text token is looked up under
+    its own index key and joined with the next token, and only the variations filed under
+    those keys are compared with the text, so per-resume cost barely grows with the taxonomy.
+    """
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        with open(self.path, 'rb') as file:
+            self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            magic, version, header_length = PREAMBLE.unpack_from(self._mmap)
+            if magic != ARTIFACT_MAGIC or version != TAXONOMY_FORMAT_VERSION:
+                raise ValueError(f"{self.path} is not a version {TAXONOMY_FORMAT_VERSION} taxonomy artifact")
+            header = json.loads(self._mmap[PREAMBLE.size:PREAMBLE.size + header_length].decode('utf-8'))
+            if header['byteorder'] != sys.byteorder:
+                raise ValueError(f"Taxonomy artifact {self.path} was built on a {header['byteorder']}-endian machine")
+        except (ValueError, struct.error):
+            self._mmap.close()
+            raise
+        self.header = header
+        self.digest = header['digest']
+        self.source = header.get('source')
+        self.variation_count = header['variations']
+        self._table_mask = header['table_size'] - 1
+        self._name_mask = header['name_table_size'] - 1
+        # Every view is released before the mapping is closed
+        self._views = [memoryview(self._mmap)]
+        sections = {}
+        for name, (offset, length) in header['sections'].items():
+            sections[name] = self._views[0][offset:offset + length]
+            self._views.append(sections[name])
+        for name in ('skill_offsets', 'names', 'buckets', 'entries'):
+            sections[name] = sections[name].cast('I')
+            self._views.append(sections[name])
+        self._skill_offsets = sections['skill_offsets']
+        self._names = sections['names']
+        self._buckets = sections['buckets']
+        self._entries = sections['entries']
+        self._variations = sections['variations']
+        self.skills = _StringTable(self._skill_offsets, sections['skill_names'])
+        self._candidates: Dict[str, Tuple[Tuple[Tuple[str, int], ...], bool]] = {}
+        irregular_start, irregular_count = header['irregular']
+        self._irregular = [(re.compile(r'\b' + re.escape(variation) + r'\b'), skill_index)
+                           for variation, skill_index in self._entry_range(irregular_start, irregular_count)]
+        logger.debug(f"Opened taxonomy artifact {self.path}: {len(self.skills)} skills, {self.variation_count} variations")
+
+    def close(self):
+        """Release the mapping; the matcher cannot be used afterwards."""
+        self._candidates.clear()
+        for view in reversed(self._views):
+            view.release()
+        self._mmap.close()
+
+    def _entry_range(self, start: int, count: int) -> Tuple[Tuple[str, int], ...]:
+        entries = self._entries
+        variations = self._variations
+        return tuple((bytes(variations[entries[i * 3]:entries[i * 3] + entries[i * 3 + 1]]).decode('utf-8'),
+                      entries[i * 3 + 2]) for i in range(start, start + count))
+
+    def _lookup(self, key: str) -> Tuple[Tuple[Tuple[str, int], ...], bool]:
+        """The (variation, skill index) pairs filed under an index key, and whether longer variations start with it."""
+        found = self._candidates.get(key)
+        if found is not None:
+            return found
+        key_hash = zlib.crc32(key.encode('utf-8'))
+        buckets = self._buckets
+        slot = key_hash & self._table_mask
+        found = ((), False)
+        while buckets[slot * 4 + 3]:
+            if buckets[slot * 4] == key_hash:
+                found = (self._entry_range(buckets[slot * 4 + 1], buckets[slot * 4 + 2]), buckets[slot * 4 + 3] == 3)
+                break
+            slot = (slot + 1) & self._table_mask
+        if len(self._candidates) >= CANDIDATE_CACHE_SIZE:
+            self._candidates.clear()
+        self._candidates[key] = found
+        return found
+
+    def skill_position(self, skill: str) -> Optional[int]:
+        """Position of a canonical skill in the taxonomy, or None if it is not in it."""
+        names = self._names
+        key_hash = zlib.crc32(skill.encode('utf-8'))
+        slot = key_hash & self._name_mask
+        while names[slot * 2 + 1]:
+            if names[slot * 2] == key_hash and self.skills[names[slot * 2 + 1] - 1] == skill:
+                return names[slot * 2 + 1] - 1
+            slot = (slot + 1) & self._name_mask
+        return None
+
+    def sort_skills(self, skills: Iterable[str]) -> List[str]:
+        """Put canonical skill names found by this matcher into taxonomy order."""
+        return sorted(skills, key=self.skill_position)
+
+    def find_matches(self, text_lower: str, tokens: Optional[List[Tuple[str, int]]] = None) -> Dict[str, List[Tuple[int, int]]]:
+        """
+        Find all skill occurrences in already-lowercased text.
+        `tokens` may supply precomputed (word, start) pairs of the text to skip tokenising.
+        Returns a mapping of canonical skill name to (start, end) offsets, in taxonomy order.
+        """
+        spans: Dict[int, List[Tuple[int, int]]] = {}
+        lookup = self._lookup
+        if tokens is None:
+            tokens = [(match.group(), match.start()) for match in WORD_PATTERN.finditer(text_lower)]
+
+        last = len(tokens) - 1
+        for position, (word, start) in enumerate(tokens):
+            candidates, continued = lookup(word)
+            if continued and position < last:
+                candidates += lookup(f"{word} {tokens[position + 1][0]}")[0]
+            for variation, skill_index in candidates:
+                end = start + len(variation)
+                if text_lower.startswith(variation, start) and has_word_boundary(text_lower, end):
+                    spans.setdefault(skill_index, []).append((start, end))
+
+        for pattern, skill_index in self._irregular:
+            for match in pattern.finditer(text_lower):
+                spans.setdefault(skill_index, []).append(match.span())
+
+        return {self.skills[index]: sorted(set(spans[index])) for index in sorted(spans)}
+
+    def find_skills(self, text_lower: str, tokens: Optional[List[Tuple[str, int]]] = None) -> List[str]:
+        """Return the canonical names of all skills found in already-lowercased text."""
+        return list(self.find_matches(text_lower, tokens).keys())
+
+def is_taxonomy_artifact(path: Union[str, Path]) -> bool:
+    """Whether a file starts like a taxonomy artifact."""
+    with open(path, 'rb') as file:
+        return file.read(len(ARTIFACT_MAGIC)) == ARTIFACT_MAGIC
+
+def source_signature(path: Path) -> Dict[str, Any]:
+    """Size and modification time of a taxonomy file, recorded in the artifact built from it."""
+    stat = path.stat()
+    return {'path': str(path.resolve()), 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+def open_taxonomy(path: Union[str, Path]) -> TaxonomyMatcher:
+    """
+    Open a taxonomy artifact, or a taxonomy file through the artifact kept next to it
+    (`<file>.skm`), which is built on first use and rebuilt when the file changes.
+    """
+    path = Path(path)
+    if is_taxonomy_artifact(path):
+        return TaxonomyMatcher(path)
+    artifact = path.with_name(path.name + ARTIFACT_SUFFIX)
+    signature = source_signature(path)
+    if artifact.exists():
+        try:
+            matcher = TaxonomyMatcher(artifact)
+            if matcher.source == signature:
+                return matcher
+            matcher.close()
+        except (OSError, ValueError) as e:
+            logger.warning(f"Rebuilding unreadable taxonomy artifact {artifact}: {str(e)}")
+    build_taxonomy_artifact(load_taxonomy(path), artifact, source=signature)
+    return TaxonomyMatcher(artifact)
+
+# The taxonomies the extractors use; the built-in maps from keywords.py unless replaced
+_ACTIVE: Dict[str, Union[Dict[str, List[str]], TaxonomyMatcher]] = {
+    'technical': CIVIL_ENGINEERING_SKILLS,
+    'soft': SOFT_SKILLS
+}
+_BUILTIN = dict(_ACTIVE)
+_DIGESTS: Dict[str, str] = {kind: 'builtin' for kind in KINDS}
+
+def get_taxonomy(kind: str) -> Union[Dict[str, List[str]], TaxonomyMatcher]:
+    """The active 'technical' or 'soft' taxonomy: a skill map or a TaxonomyMatcher."""
+    return _ACTIVE[kind]
+
+def set_taxonomy(kind: str, taxonomy: Union[None, str, Path, Dict[str, List[str]], TaxonomyMatcher]):
+    """
+    Replace the 'technical' or 'soft' taxonomy used by the extractors with a skill map, a matcher,
+    or a taxonomy or artifact file (see open_taxonomy); None restores the built-in one.
+    """
+    if kind not in KINDS:
+        raise ValueError(f"Unknown taxonomy kind {kind!r}; expected one of {', '.join(KINDS)}")
+    if isinstance(taxonomy, (str, Path)):
+        taxonomy = open_taxonomy(taxonomy)
+    if taxonomy is None or taxonomy is _BUILTIN[kind]:
+        _ACTIVE[kind] = _BUILTIN[kind]
+        _DIGESTS[kind] = 'builtin'
+    else:
+        _ACTIVE[kind] = taxonomy
+        _DIGESTS[kind] = taxonomy.digest if isinstance(taxonomy, TaxonomyMatcher) else taxonomy_digest(taxonomy)
+
+def taxonomy_key() -> Optional[str]:
+    """Identifies the active taxonomies for cached extraction results; None while both are built in."""
+    if all(_DIGESTS[kind] == 'builtin' for kind in KINDS):
+        return None
+    return ";".join(f"{kind}={_DIGESTS[kind]}" for kind in KINDS)
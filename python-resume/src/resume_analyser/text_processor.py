@@ -2,38 +2,66 @@
 
 import re
 import logging
-from typing import Tuple, Dict, Any, List
+from typing import Tuple, Dict, Any, List, Iterable, Iterator
+
+from .document import ResumeDocument, TextInput, as_document
 
 logger = logging.getLogger(__name__)
 
+# Bump whenever the cleaning output change so memoized stage results are not reused
+TEXT_PROCESSOR_VERSION = "1"
+
 def clean_text(text: str) -> str:
     """Clean and normalise text content."""
     if not text:
         return ""
     
-    # First, collapse multiple newlines into a single one to preserve paragraph breaks
-    text = re.sub(r'[\r\n]+', '\n', text)
-    
-    # Split into individual lines
-    lines = text.split('\n')
-    cleaned_lines = []
-    
-    # Process each line to remove extra spaces without destroying the line itself
-    for line in lines:
-        # Replace multiple spaces/tabs with a single space and strip leading/trailing whitespace
-        cleaned_line = re.sub(r'[ \t]+', ' ', line).strip()
-        if cleaned_line:
-            cleaned_lines.append(cleaned_line)
-            
     # Join the cleaned lines back together
-    return '\n'.join(cleaned_lines)
+    return '\n'.join(clean_lines(text))
+
+def clean_lines(text: str) -> List[str]:
+    """Clean text content and return the non-empty, whitespace-normalised lines."""
+    if not text:
+        return []
+    
+    return list(iter_clean_lines([text]))
+
+# Runs of newlines are collapsed, which preserves paragraph breaks as single line breaks
+LINE_BREAK_PATTERN = re.compile(r'[\r\n]+')
+INLINE_SPACE_PATTERN = re.compile(r'[ \t]+')
 
-def analyse_text_complexity(text: str, parsing_metadata: Dict[str, Any] = None) -> Tuple[int, str]:
+def iter_clean_lines(chunks: Iterable[str]) -> Iterator[str]:
+    """
+    Clean text arriving in chunks (e.g. the pages of a ParseStream) and yield the non-empty,
+    whitespace-normalised lines as soon as they are complete. Produces the same lines as
+    `clean_lines` on the joined chunks; only the unfinished last line is held between chunks.
+    """
+    pending = ""
+    for chunk in chunks:
+        segments = LINE_BREAK_PATTERN.split(pending + chunk)
+        pending = segments.pop()
+        for line in segments:
+            # Replace multiple spaces/tabs with a single space and strip leading/trailing whitespace
+            cleaned_line = INLINE_SPACE_PATTERN.sub(' ', line).strip()
+            if cleaned_line:
+                yield cleaned_line
+    
+    cleaned_line = INLINE_SPACE_PATTERN.sub(' ', pending).strip()
+    if cleaned_line:
+        yield cleaned_line
+
+def create_document(raw_text: str) -> ResumeDocument:
+    """Clean raw text and wrap it in a ResumeDocument, reusing the cleaned lines."""
+    lines = clean_lines(raw_text)
+    return ResumeDocument('\n'.join(lines), lines=lines)
+
+def analyse_text_complexity(text: TextInput, parsing_metadata: Dict[str, Any] = None) -> Tuple[int, str]:
     """
     Analyses text for readability and ATS compatibility.
     Returns a score (1-10) and detailed feedback string.
     """
-    if not text or len(text.strip()) < 50:
+    document = as_document(text)
+    if document.text_statistics['stripped_length'] < 50:
         return 0, "Very little text content found. The file may be mostly images or have parsing issues."
     
     score = 10  # Start with full points
@@ -69,8 +97,7 @@ def analyse_text_complexity(text: str, parsing_metadata: Dict[str, Any] = None)
                 feedback_parts.append(f"❌ {issue}")
     
     # Word count analysis
-    words = text.split()
-    word_count = len(words)
+    word_count = document.text_statistics['word_count']
     
     if word_count > 800:  # Too verbose
         score -= 2
@@ -88,7 +115,7 @@ def analyse_text_complexity(text: str, parsing_metadata: Dict[str, Any] = None)
         detailed_analysis.append(f"Word Count: {word_count} (Good)")
     
     # Career profile/summary analysis
-    career_profile_analysis = analyse_career_profile(text)
+    career_profile_analysis = document.text_statistics['career_profile']
     if career_profile_analysis['too_long']:
         score -= 1
         feedback_parts.append("❌ Career profile/summary section too wordy - keep to 3-4 lines")
@@ -97,7 +124,7 @@ def analyse_text_complexity(text: str, parsing_metadata: Dict[str, Any] = None)
         detailed_analysis.append("Career Profile: Appropriate Length")
     
     # Sentence length analysis
-    sentence_analysis = analyse_sentence_complexity(text)
+    sentence_analysis = analyse_sentence_complexity(document)
     if sentence_analysis['overly_long_sentences'] > 3:
         score -= 2
         feedback_parts.append(f"❌ {sentence_analysis['overly_long_sentences']} overly long sentences - break into bullet points")
@@ -110,7 +137,7 @@ def analyse_text_complexity(text: str, parsing_metadata: Dict[str, Any] = None)
         detailed_analysis.append("Sentence Structure: Good")
     
     # Bullet point usage analysis
-    bullet_analysis = analyse_bullet_point_usage(text)
+    bullet_analysis = analyse_bullet_point_usage(document)
     if bullet_analysis['total_bullets'] < 5:
         score -= 1
         feedback_parts.append("❌ Few bullet points detected - use more bullets for better readability")
@@ -119,7 +146,7 @@ def analyse_text_complexity(text: str, parsing_metadata: Dict[str, Any] = None)
         detailed_analysis.append(f"Bullet Points: {bullet_analysis['total_bullets']} (Good)")
     
     # Text formatting and special characters
-    special_char_analysis = analyse_special_characters(text)
+    special_char_analysis = analyse_special_characters(document)
     if special_char_analysis['problematic_ratio'] > 0.1:
         score -= 2
         feedback_parts.append("❌ High ratio of special characters - may indicate formatting issues")
@@ -132,7 +159,7 @@ def analyse_text_complexity(text: str, parsing_metadata: Dict[str, Any] = None)
         detailed_analysis.append("Special Characters: Low Ratio (Good)")
     
     # Line break analysis
-    line_analysis = analyse_line_structure(text)
+    line_analysis = analyse_line_structure(document)
     if line_analysis['very_long_lines'] > 5:
         score -= 1
         feedback_parts.append("❌ Many lines without proper breaks - use more line breaks for readability")
@@ -170,107 +197,34 @@ def analyse_text_complexity(text: str, parsing_metadata: Dict[str, Any] = None)
     logger.debug(f"Readability score: {score}/10. Analysis complete.")
     return score, feedback_message
 
-def analyse_career_profile(text: str) -> Dict[str, Any]:
-    """Analyse career profile/summary section for length and wordiness."""
-    # Look for career profile/summary sections
-    profile_patterns = [
-        r'(?i)(career\s+(?:profile|summary|objective)|professional\s+summary|executive\s+summary|profile)',
-        r'(?i)(summary|objective)'
-    ]
-    
-    analysis = {'found': False, 'too_long': False, 'word_count': 0}
-    
-    for pattern in profile_patterns:
-        match = re.search(pattern + r'[:\n]([^\\n]*(?:\\n[^\\n]*){0,6})', text)
-        if match:
-            analysis['found'] = True
-            profile_text = match.group(1) if len(match.groups()) > 0 else ""
-            profile_words = len(profile_text.split())
-            analysis['word_count'] = profile_words
-            
-            # Check if too long (more than 80 words or 4+ lines)
-            lines = profile_text.count('\n') + 1
-            if profile_words > 80 or lines > 4:
-                analysis['too_long'] = True
-            break
-    
-    return analysis
-
-def analyse_sentence_complexity(text: str) -> Dict[str, int]:
+def analyse_sentence_complexity(text: TextInput) -> Dict[str, int]:
     """Analyse sentence length and complexity."""
-    # Split into sentences (simple approach)
-    sentences = re.split(r'[.!?]+', text)
-    
-    analysis = {
-        'total_sentences': 0,
-        'overly_long_sentences': 0,
-        'average_length': 0
+    statistics = as_document(text).text_statistics
+    return {
+        'total_sentences': statistics['total_sentences'],
+        'overly_long_sentences': statistics['overly_long_sentences'],
+        'average_length': statistics['average_sentence_length']
     }
-    
-    sentence_lengths = []
-    for sentence in sentences:
-        sentence = sentence.strip()
-        if len(sentence) > 10:  # Filter out very short fragments
-            words = len(sentence.split())
-            sentence_lengths.append(words)
-            
-            # Consider 25+ words as overly long
-            if words > 25:
-                analysis['overly_long_sentences'] += 1
-    
-    analysis['total_sentences'] = len(sentence_lengths)
-    analysis['average_length'] = sum(sentence_lengths) / len(sentence_lengths) if sentence_lengths else 0
-    
-    return analysis
 
-def analyse_bullet_point_usage(text: str) -> Dict[str, int]:
+def analyse_bullet_point_usage(text: TextInput) -> Dict[str, int]:
     """Analyse bullet point usage for better readability."""
-    # Common bullet point indicators
-    bullet_patterns = [
-        r'^\s*[•·▪▫◦‣⁃]\s+',  # Bullet symbols
-        r'^\s*[-*+]\s+',        # Dash/asterisk bullets
-        r'^\s*\d+\.\s+',        # Numbered lists
-        r'^\s*[a-zA-Z]\.\s+',   # Lettered lists
-    ]
-    
-    lines = text.split('\n')
-    total_bullets = 0
-    
-    for line in lines:
-        for pattern in bullet_patterns:
-            if re.match(pattern, line):
-                total_bullets += 1
-                break
-    
-    return {'total_bullets': total_bullets}
+    return {'total_bullets': as_document(text).text_statistics['total_bullets']}
 
-def analyse_special_characters(text: str) -> Dict[str, float]:
+def analyse_special_characters(text: TextInput) -> Dict[str, float]:
     """Analyse special character usage that might confuse ATS."""
-    if not text:
+    document = as_document(text)
+    if not len(document):
         return {'problematic_ratio': 0.0}
     
-    # Characters that are often problematic for ATS
-    problematic_chars = set('©®™§¶†‡•‰‱′″‴‵‶‷‸‹›«»¡¿¦¨ª¯°±²³¹¼½¾×÷')
-    
-    total_chars = len(text)
-    problematic_count = sum(1 for char in text if char in problematic_chars)
-    
+    statistics = document.text_statistics
     return {
-        'problematic_ratio': problematic_count / total_chars if total_chars > 0 else 0.0,
-        'problematic_count': problematic_count
+        'problematic_ratio': statistics['problematic_ratio'],
+        'problematic_count': statistics['char_classes']['problematic']
     }
 
-def analyse_line_structure(text: str) -> Dict[str, int]:
+def analyse_line_structure(text: TextInput) -> Dict[str, int]:
     """Analyse line structure for readability."""
-    lines = text.split('\n')
-    
-    very_long_lines = 0
-    for line in lines:
-        # Lines with 100+ characters might be too long
-        if len(line.strip()) > 100:
-            very_long_lines += 1
-    
-    return {'very_long_lines': very_long_lines}
+    return {'very_long_lines': as_document(text).text_statistics['very_long_lines']}
 
 def generate_readability_recommendations(score: int, word_count: int, parsing_metadata: Dict[str, Any] = None) -> List[str]:
     """Generate specific recommendations based on analysis."""
@@ -298,9 +252,9 @@ def generate_readability_recommendations(score: int, word_count: int, parsing_me
     
     return recommendations
 
-def detect_sections(text: str) -> dict:
+def detect_sections(text: TextInput) -> dict:
     """Detect major resume sections in the text."""
-    text_lower = text.lower()
+    text_lower = as_document(text).lower_text
     sections = {}
     
     # Common section headers and their variations
@@ -0,0 +1,219 @@
+"""Single-pass text statistics shared by the readability analysis and the parsers."""
+
+import re
+from collections import Counter, deque
+from typing import Dict, Any, List, Optional, Tuple
+
+# Sentences are the spans between terminators (simple approach)
+SENTENCE_PATTERN = re.compile(r'[^.!?]+')
+
+# Bullet symbols, dash/asterisk bullets, numbered lists and lettered lists in one pattern
+BULLET_PATTERN = re.compile(r'\s*(?:[•·▪▫◦‣⁃]|[-*+]|\d+\.|[a-zA-Z]\.)\s+')
+
+# Characters that are often problematic for ATS
+PROBLEMATIC_CHARS = frozenset('©®™§¶†‡•‰‱′″‴‵‶‷‸‹›«»¡¿¦¨ª¯°±²³¹¼½¾×÷')
+
+# ASCII characters that are alphanumeric or whitespace by str.isalnum / str.isspace
+_ASCII_PLAIN = ''.join(chr(code) for code in range(128) if chr(code).isalnum() or chr(code).isspace())
+_ASCII_PLAIN_BYTES = _ASCII_PLAIN.encode('ascii')
+_DELETE_ASCII_PLAIN = str.maketrans('', '', _ASCII_PLAIN)
+
+SENTENCE_TERMINATOR_PATTERN = re.compile(r'[.!?]')
+
+# Career profile/summary headers, most specific first; the first pattern found anywhere wins
+PROFILE_PATTERNS = [
+    re.compile(r'(?i)(career\s+(?:profile|summary|objective)|professional\s+summary|executive\s+summary|profile)'
+               r'[:\n]([^\\n]*(?:\\n[^\\n]*){0,6})'),
+    re.compile(r'(?i)(summary|objective)[:\n]([^\\n]*(?:\\n[^\\n]*){0,6})')
+]
+# Lines of streamed text a career profile header and its separator may span
+PROFILE_WINDOW_LINES = 4
+
+LONG_SENTENCE_WORDS = 25
+LONG_LINE_CHARS = 100
+
+def count_character_classes(text: str) -> Dict[str, int]:
+    """
+    Count special characters (neither alphanumeric nor whitespace) and ATS-problematic characters.
+    ASCII letters, digits and whitespace are deleted with a translate table first, so only the
+    few remaining characters are classified individually.
+    """
+    if text.isascii():
+        special = len(text.encode('ascii').translate(None, _ASCII_PLAIN_BYTES))
+        return {'total': len(text), 'special': special, 'problematic': 0}
+
+    remainder = Counter(text.translate(_DELETE_ASCII_PLAIN))
+    special = 0
+    problematic = 0
+    for char, count in remainder.items():
+        if not char.isalnum() and not char.isspace():
+            special += count
+        if char in PROBLEMATIC_CHARS:
+            problematic += count
+    return {'total': len(text), 'special': special, 'problematic': problematic}
+
+def count_special_characters(text: str) -> int:
+    """Number of characters that are neither alphanumeric nor whitespace."""
+    return count_character_classes(text)['special']
+
+def line_flags(line: str) -> Tuple[bool, bool]:
+    """Whether a line is a list item, and whether it is very long."""
+    return (BULLET_PATTERN.match(line) is not None,
+            len(line) > LONG_LINE_CHARS and len(line.strip()) > LONG_LINE_CHARS)
+
+def _career_profile(match: Optional[re.Match]) -> Dict[str, Any]:
+    analysis = {'found': False, 'too_long': False, 'word_count': 0}
+    if match:
+        analysis['found'] = True
+        profile_text = match.group(1)
+        profile_words = len(profile_text.split())
+        analysis['word_count'] = profile_words
+        
+        # Check if too long (more than 80 words or 4+ lines)
+        lines = profile_text.count('\n') + 1
+        if profile_words > 80 or lines > 4:
+            analysis['too_long'] = True
+    return analysis
+
+def analyse_career_profile(text: str) -> Dict[str, Any]:
+    """Analyse career profile/summary section for length and wordiness."""
+    for pattern in PROFILE_PATTERNS:
+        match = pattern.search(text)
+        if match:
+            return _career_profile(match)
+    return _career_profile(None)
+
+def compute_text_statistics(text: str, lines: Optional[List[str]] = None,
+                            flags: Optional[List[Tuple[bool, bool]]] = None) -> Dict[str, Any]:
+    """
+    Collect everything the readability analysis needs in one go: word count, sentence
+    lengths, bullet and long-line counts, character-class counts, the stripped length and
+    the career profile analysis.
+    `flags` may supply the line_flags of every line (e.g. from a line cache).
+    """
+    if lines is None:
+        lines = text.split('\n')
+
+    sentence_lengths = []
+    for sentence in SENTENCE_PATTERN.findall(text):
+        # Filter out very short fragments
+        if len(sentence.strip()) > 10:
+            sentence_lengths.append(len(sentence.split()))
+
+    if flags is None:
+        flags = [line_flags(line) for line in lines]
+    total_bullets = sum(1 for is_bullet, _ in flags if is_bullet)
+    very_long_lines = sum(1 for _, is_very_long in flags if is_very_long)
+
+    char_classes = count_character_classes(text)
+    return _statistics(len(text.split()), sentence_lengths, total_bullets, len(lines), very_long_lines,
+                       char_classes, len(text.strip()), analyse_career_profile(text))
+
+def _statistics(word_count: int, sentence_lengths: List[int], total_bullets: int, line_count: int,
+                very_long_lines: int, char_classes: Dict[str, int], stripped_length: int,
+                career_profile: Dict[str, Any]) -> Dict[str, Any]:
+    total_chars = char_classes['total']
+    return {
+        'word_count': word_count,
+        'sentence_lengths': sentence_lengths,
+        'total_sentences': len(sentence_lengths),
+        'overly_long_sentences': sum(1 for words in sentence_lengths if words > LONG_SENTENCE_WORDS),
+        'average_sentence_length': sum(sentence_lengths) / len(sentence_lengths) if sentence_lengths else 0,
+        'total_bullets': total_bullets,
+        'line_count': line_count,
+        'very_long_lines': very_long_lines,
+        'char_classes': char_classes,
+        'special_ratio': char_classes['special'] / total_chars if total_chars > 0 else 0.0,
+        'problematic_ratio': char_classes['problematic'] / total_chars if total_chars > 0 else 0.0,
+        'stripped_length': stripped_length,
+        'career_profile': career_profile
+    }
+
+class TextStatisticsBuilder:
+    """
+    Computes compute_text_statistics for a text fed one line at a time (the lines it would be
+    split into), without keeping the text: only counters, the sentence still open and the last
+    PROFILE_WINDOW_LINES lines, in which a career profile header is looked for, are held.
+    """
+
+    def __init__(self):
+        self.word_count = 0
+        self.sentence_lengths: List[int] = []
+        self.total_bullets = 0
+        self.line_count = 0
+        self.very_long_lines = 0
+        self.char_classes = {'total': 0, 'special': 0, 'problematic': 0}
+        # Offsets of the first and one past the last non-whitespace character of the text
+        self._first: Optional[int] = None
+        self._last_end = 0
+        # Word count and stripped extent of the sentence still open at the end of the text so far
+        self._sentence_words = 0
+        self._sentence_length = 0
+        self._sentence_first: Optional[int] = None
+        self._sentence_last_end = 0
+        self._window: deque = deque(maxlen=PROFILE_WINDOW_LINES)
+        self._profile_matches: List[Optional[re.Match]] = [None] * len(PROFILE_PATTERNS)
+
+    def feed(self, line: str, flags: Optional[Tuple[bool, bool]] = None):
+        """Add the next line; `flags` may supply its line_flags (e.g. from a line cache)."""
+        # Lines after the first are joined to the text by a line break
+        chunk = line if self.line_count == 0 else '\n' + line
+        self.line_count += 1
+        self.word_count += len(line.split())
+        is_bullet, is_very_long = flags if flags is not None else line_flags(line)
+        self.total_bullets += is_bullet
+        self.very_long_lines += is_very_long
+        for name, count in count_character_classes(chunk).items():
+            self.char_classes[name] += count
+
+        stripped_left = chunk.lstrip()
+        if stripped_left:
+            if self._first is None:
+                self._first = self.char_classes['total'] - len(stripped_left)
+            self._last_end = self.char_classes['total'] - len(chunk) + len(chunk.rstrip())
+
+        pieces = SENTENCE_TERMINATOR_PATTERN.split(chunk)
+        self._extend_sentence(pieces[0])
+        for piece in pieces[1:]:
+            self._end_sentence()
+            self._extend_sentence(piece)
+
+        self._window.append(chunk)
+        self._find_career_profile()
+
+    def _extend_sentence(self, piece: str):
+        stripped_left = piece.lstrip()
+        if stripped_left:
+            if self._sentence_first is None:
+                self._sentence_first = self._sentence_length + len(piece) - len(stripped_left)
+            self._sentence_last_end = self._sentence_length + len(piece.rstrip())
+            self._sentence_words += len(piece.split())
+        self._sentence_length += len(piece)
+
+    def _end_sentence(self):
+        # Filter out very short fragments, as compute_text_statistics does
+        if self._sentence_first is not None and self._sentence_last_end - self._sentence_first > 10:
+            self.sentence_lengths.append(self._sentence_words)
+        self._sentence_words = 0
+        self._sentence_length = 0
+        self._sentence_first = None
+        self._sentence_last_end = 0
+
+    def _find_career_profile(self):
+        if self._profile_matches[0] is not None:
+            # The most specific pattern wins wherever the others match
+            return
+        window = "".join(self._window)
+        for index, pattern in enumerate(PROFILE_PATTERNS):
+            if self._profile_matches[index] is None:
+                # The trailing text of a match may be empty, so a header followed by its separator is
+                # already the leftmost match however the text goes on
+                self._profile_matches[index] = pattern.search(window)
+
+    def result(self) -> Dict[str, Any]:
+        """The statistics of the lines fed so far, as compute_text_statistics returns them."""
+        self._end_sentence()
+        profile = next((match for match in self._profile_matches if match is not None), None)
+        stripped_length = 0 if self._first is None else self._last_end - self._first
+        return _statistics(self.word_count, self.sentence_lengths, self.total_bullets, self.line_count,
+                           self.very_long_lines, dict(self.char_classes), stripped_length, _career_profile(profile))
@@ -0,0 +1,331 @@
+"""Quick ATS triage of resumes from the PDF page tree and content streams, without text extraction."""
+
+import re
+import logging
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Tuple, Union
+
+from .layout import detect_columns
+from .parsers import ResumeSource, Buffer, DEFAULT_DOCX_BACKEND, resolve_source, pdf_stream, parse_by_extension
+
+logger = logging.getLogger(__name__)
+
+# Bounds on the work done per page: content stream bytes read and text runs sampled for layout analysis
+SAMPLE_BYTES = 256 * 1024
+MAX_RUNS_PER_PAGE = 2000
+# Pages inspected; the page count itself always comes from the page tree
+MAX_PAGES = 10
+
+# Below this many estimated characters per page the file is most likely scanned or unparseable
+MIN_TEXT_DENSITY = 50
+
+# Average glyph width as a fraction of the font size, for estimating run widths
+GLYPH_WIDTH = 0.5
+
+# The operators that place text; their operands are read back from the bytes preceding them
+TEXT_OPERATOR_PATTERN = re.compile(rb'[\s\]>)](T[mdDLfJj*]|cm|BT|q|Q)(?=\s)')
+STRING_PATTERN = re.compile(rb'\((?:\\.|[^\\)])*\)|<[0-9A-Fa-f\s]*>', re.S)
+LITERAL_CONTENT_PATTERN = re.compile(rb'\(((?:\\.|[^\\)])*)\)', re.S)
+HEX_CONTENT_PATTERN = re.compile(rb'<([0-9A-Fa-f]*)>')
+
+IDENTITY = (1.0, 0.0, 0.0, 1.0, 0.0, 0.0)
+
+def _multiply(m1: Tuple[float, ...], m2: Tuple[float, ...]) -> Tuple[float, ...]:
+    """Product m1 x m2 of two PDF transformation matrices."""
+    a1, b1, c1, d1, e1, f1 = m1
+    a2, b2, c2, d2, e2, f2 = m2
+    return (a1 * a2 + b1 * c2, a1 * b2 + b1 * d2,
+            c1 * a2 + d1 * c2, c1 * b2 + d1 * d2,
+            e1 * a2 + f1 * c2 + e2, e1 * b2 + f1 * d2 + f2)
+
+def _string_length(token: bytes, hex_digits: int = 4) -> int:
+    """Estimated number of glyphs a shown string holds."""
+    if token[:1] == b'(':
+        # Each escape sequence stands for a single character
+        return len(token) - 2 - token.count(b'\\')
+    digits = len(token) - 2 - sum(token.count(ws) for ws in (b' ', b'\n', b'\r', b'\t'))
+    return digits // hex_digits
+
+def hex_digits_per_glyph(page) -> Dict[bytes, int]:
+    """Hex digits per glyph for each font resource of a page: 4 for two-byte (Identity) CID fonts, else 2."""
+    return {('/' + font[4]).encode('latin-1'): 4 if font[5].startswith('Identity') else 2
+            for font in page.get_fonts()}
+
+def _show_end(segment: bytes) -> int:
+    """Offset of the first Tj/TJ operator of a content stream segment, or -1 if it shows no text."""
+    end = segment.find(b'Tj')
+    array_end = segment.find(b'TJ')
+    if end < 0 or 0 <= array_end < end:
+        end = array_end
+    return end
+
+def _last_font(segment: bytes, end: int, fonts: Dict[bytes, int]) -> Optional[Tuple[float, int]]:
+    """Font size and hex digits per glyph set by the last Tf before `end` in a segment, if any."""
+    tf = segment.rfind(b' Tf', 0, end)
+    if tf < 0:
+        return None
+    font_name, size = segment[:tf].rsplit(None, 2)[-2:]
+    return abs(float(size)), fonts.get(font_name, 4)
+
+def _shown_glyphs(segment: bytes, hex_digits: int = 4) -> int:
+    """Estimated glyphs shown by the first Tj/TJ of a content stream segment."""
+    end = _show_end(segment)
+    if end < 0:
+        return 0
+    literal = b''.join(LITERAL_CONTENT_PATTERN.findall(segment, 0, end))
+    if literal:
+        # Each escape sequence stands for a single character
+        return len(literal) - literal.count(b'\\')
+    return len(b''.join(HEX_CONTENT_PATTERN.findall(segment, 0, end))) // hex_digits
+
+def sample_positioned_runs(content: bytes, fonts: Optional[Dict[bytes, int]] = None,
+                           max_runs: int = MAX_RUNS_PER_PAGE) -> Optional[Tuple[List[Tuple[float, float, float, float]], int]]:
+    """
+    Fast path for the common case of text placed with absolute text matrices (one Tm per run,
+    as written by word processors): the stream is split on Tm with a single bytes operation,
+    and each run's position, font size and glyph count are read from its own segment, with
+    no text state to track. A font set between a run's Tm and its Tj/TJ (as PyMuPDF writes
+    them) applies to that run. `fonts` maps font resource names to hex digits per glyph.
+    Returns the boxes (PDF user space) of at most `max_runs` runs and
+    their glyph count, or None if the stream positions text some other way.
+    """
+    segments = content.split(b' Tm', max_runs)
+    if len(segments) == 1:
+        return None
+
+    runs = []
+    glyph_count = 0
+    fonts = fonts or {}
+    font_size = 10.0
+    hex_digits = 4
+    for index in range(1, len(segments)):
+        before = segments[index - 1]
+        segment = segments[index]
+        try:
+            font = _last_font(before, len(before), fonts)
+            if font:
+                font_size, hex_digits = font
+            x, y = (float(value) for value in before.rsplit(None, 2)[-2:])
+            show = _show_end(segment)
+            font = _last_font(segment, show, fonts) if show >= 0 else None
+            if font:
+                font_size, hex_digits = font
+        except ValueError:
+            continue
+        glyphs = _shown_glyphs(segment, hex_digits)
+        if glyphs:
+            glyph_count += glyphs
+            runs.append((x, y, x + glyphs * font_size * GLYPH_WIDTH, y + font_size))
+    if len(segments) > max_runs:
+        # Extrapolate the glyph count of the sampled runs to the rest of the stream
+        sampled_bytes = len(content) - len(segments[-1])
+        glyph_count = round(glyph_count * len(content) / max(sampled_bytes, 1))
+    return runs, glyph_count
+
+def scan_text_runs(content: bytes, fonts: Optional[Dict[bytes, int]] = None, max_runs: int = MAX_RUNS_PER_PAGE) -> Tuple[List[Tuple[float, float, float, float]], int]:
+    """
+    Interpret the text operators of a page content stream just enough to place each shown
+    string: returns estimated (x0, y0, x1, y1) run boxes in PDF user space (y up) and the
+    estimated number of glyphs shown. Fonts are not loaded, so widths are approximations.
+    """
+    fonts = fonts or {}
+    runs = []
+    glyphs = 0
+    hex_digits = 4
+    ctm = IDENTITY
+    ctm_stack = []
+    text_matrix = line_matrix = IDENTITY
+    font_size = 0.0
+    leading = 0.0
+    operands_start = 0
+
+    for match in TEXT_OPERATOR_PATTERN.finditer(content):
+        operator = match.group(1)
+        # Everything since the previous text operator; the operands are at its end
+        operands = content[operands_start:match.start(1)]
+        operands_start = match.end()
+
+        try:
+            if operator == b'TJ' or operator == b'Tj':
+                length = sum(_string_length(token, hex_digits) for token in STRING_PATTERN.findall(
+                    operands, operands.rfind(b'[') if operator == b'TJ' else 0))
+                if not length:
+                    continue
+                glyphs += length
+                width = length * font_size * GLYPH_WIDTH
+                a, b, c, d, e, f = _multiply(text_matrix, ctm)
+                x1 = e + a * width
+                y1 = f + d * font_size
+                runs.append((min(e, x1), min(f, y1), max(e, x1), max(f, y1)))
+                text_matrix = _multiply((1.0, 0.0, 0.0, 1.0, width, 0.0), text_matrix)
+                if len(runs) >= max_runs:
+                    break
+            elif operator == b'Tm':
+                text_matrix = line_matrix = tuple(float(value) for value in operands.split()[-6:])
+            elif operator == b'Td' or operator == b'TD':
+                tx, ty = (float(value) for value in operands.split()[-2:])
+                if operator == b'TD':
+                    leading = -ty
+                line_matrix = text_matrix = _multiply((1.0, 0.0, 0.0, 1.0, tx, ty), line_matrix)
+            elif operator == b'Tf':
+                font_name, size = operands.split()[-2:]
+                font_size = float(size)
+                hex_digits = fonts.get(font_name, 4)
+            elif operator == b'BT':
+                text_matrix = line_matrix = IDENTITY
+            elif operator == b'q':
+                ctm_stack.append(ctm)
+            elif operator == b'Q':
+                ctm = ctm_stack.pop() if ctm_stack else IDENTITY
+            elif operator == b'cm':
+                ctm = _multiply(tuple(float(value) for value in operands.split()[-6:]), ctm)
+            elif operator == b'TL':
+                leading = float(operands.split()[-1])
+            elif operator == b'T*':
+                line_matrix = text_matrix = _multiply((1.0, 0.0, 0.0, 1.0, 0.0, -leading), line_matrix)
+        except ValueError:
+            # Malformed operands; skip the operator as a viewer would
+            continue
+
+    return runs, glyphs
+
+def group_runs_into_blocks(runs: List[Tuple[float, float, float, float]], page_height: float) -> List[Tuple[float, float, float, float]]:
+    """
+    Merge text runs, in content stream order, into block-like boxes in top-down page
+    coordinates the way PyMuPDF builds blocks: a run on the baseline of the current line
+    extends it (right-aligned dates included), and a new line directly below the current
+    block that overlaps it horizontally joins the block; anything else starts a new block.
+    """
+    blocks: List[List[float]] = []
+    block = None
+    baseline = None
+    for x0, y0, x1, y1 in runs:
+        top, bottom = page_height - y1, page_height - y0
+        if block is not None and abs(bottom - baseline) < 1.0:
+            block[0] = min(block[0], x0)
+            block[2] = max(block[2], x1)
+            continue
+        baseline = bottom
+        if block is not None and 0 <= top - block[3] < 0.5 * (bottom - top) and x0 < block[2] and block[0] < x1:
+            block[0] = min(block[0], x0)
+            block[2] = max(block[2], x1)
+            block[3] = bottom
+        else:
+            block = [x0, top, x1, bottom]
+            blocks.append(block)
+    return [tuple(block) for block in blocks]
+
+def triage_pdf(file_path: Union[Path, Buffer], max_pages: int = MAX_PAGES,
+               sample_bytes: int = SAMPLE_BYTES) -> Optional[Dict[str, Any]]:
+    """
+    ATS triage of a PDF: page count, images, estimated columns and text density, read from
+    the page tree, the image XObjects and a bounded sample of each page's content stream.
+    Returns None if the PDF cannot be opened.
+    """
+    try:
+        import fitz  # PyMuPDF
+
+        if isinstance(file_path, Path):
+            doc = fitz.open(file_path)
+        else:
+            doc = fitz.open(stream=pdf_stream(file_path), filetype="pdf")
+    except ImportError:
+        logger.error("PyMuPDF (fitz) not installed. Please install it to parse PDF files.")
+        return None
+    except Exception as e:
+        logger.error(f"Error opening PDF file: {str(e)}")
+        return None
+
+    result = {
+        'has_images': False,
+        'image_count': 0,
+        'has_columns': False,
+        'column_count': 0,
+        'page_count': len(doc),
+        'sampled_pages': 0,
+        'text_density': 0.0,
+        'parsing_issues': []
+    }
+    total_glyphs = 0.0
+    try:
+        for page_num in range(min(len(doc), max_pages)):
+            page = doc.load_page(page_num)
+
+            image_count = len(page.get_images(full=True))
+            if image_count:
+                result['has_images'] = True
+                result['image_count'] += image_count
+
+            content = page.read_contents()
+            sample = content[:sample_bytes]
+            fonts = hex_digits_per_glyph(page)
+            positioned = sample_positioned_runs(sample, fonts)
+            if positioned is not None:
+                runs, glyphs = positioned
+            else:
+                runs, glyphs = scan_text_runs(sample, fonts)
+            if len(sample) < len(content):
+                # Extrapolate the glyph count of a truncated sample to the whole stream
+                glyphs = glyphs * len(content) / max(len(sample), 1)
+            total_glyphs += glyphs
+
+            layout = detect_columns(group_runs_into_blocks(runs, page.rect.height))
+            result['column_count'] = max(result['column_count'], layout['column_count'])
+            if layout['has_columns']:
+                result['has_columns'] = True
+            result['sampled_pages'] += 1
+    except Exception as e:
+        logger.error(f"Error reading PDF page tree: {str(e)}")
+        result['parsing_issues'].append("Page content could not be read - possible parsing problems")
+    finally:
+        doc.close()
+
+    if result['sampled_pages']:
+        result['text_density'] = round(total_glyphs / result['sampled_pages'], 1)
+    if result['page_count'] == 0:
+        result['parsing_issues'].append("PDF has no pages")
+    elif result['text_density'] < MIN_TEXT_DENSITY:
+        result['parsing_issues'].append("Very little text found - likely a scanned or image-only PDF")
+    result['likely_unparseable'] = bool(result['parsing_issues'])
+
+    logger.debug(f"PDF triage: {result['page_count']} pages, {result['image_count']} images, "
+                 f"columns: {result['has_columns']}, ~{result['text_density']} chars/page")
+    return result
+
+def triage_resume_file(file_path: ResumeSource, docx_backend: str = DEFAULT_DOCX_BACKEND) -> Optional[Dict[str, Any]]:
+    """
+    Quick ATS triage of a resume: the image, column and page flags of a full parse plus an
+    estimated text density (characters per page) and whether the file is likely unparseable.
+    PDFs are triaged without text extraction; DOCX and TXT files, which are cheap to parse,
+    are parsed normally. Returns None if the file cannot be read.
+    """
+    resolved = resolve_source(file_path)
+    if resolved is None:
+        return None
+    source, extension = resolved
+    if extension == '.pdf':
+        return triage_pdf(source)
+
+    parse_result = parse_by_extension(source, extension, docx_backend)
+    if parse_result is None:
+        return None
+    metadata = parse_result.metadata
+    # DOCX and TXT have no fixed pagination; treat the whole document as one page
+    text_density = float(len(parse_result.text))
+    parsing_issues = list(metadata.get('parsing_issues', []))
+    # Like triage_pdf, only missing or sparse text makes a file likely unparseable; layout
+    # warnings such as columns are reported but do not
+    too_little_text = text_density < MIN_TEXT_DENSITY or not parse_result.text.strip()
+    if too_little_text:
+        parsing_issues.append("Very little text found - possible parsing problems")
+    return {
+        'has_images': metadata.get('has_images', False),
+        'image_count': metadata.get('image_count', 0),
+        'has_columns': metadata.get('has_columns', False),
+        'column_count': 2 if metadata.get('has_columns') else 1,
+        'page_count': 1,
+        'sampled_pages': 1,
+        'text_density': text_density,
+        'parsing_issues': parsing_issues,
+        'likely_unparseable': too_little_text
+    }
@@ -0,0 +1,308 @@
+"""Watch a folder and analyse new or changed resumes as they arrive."""
+
+import os
+import json
+import time
+import select
+import struct
+import logging
+import ctypes
+import ctypes.util
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Callable, Iterable, Tuple, Union
+
+from .cache import hash_bytes
+from .parsers import SUPPORTED_EXTENSIONS
+
+logger = logging.getLogger(__name__)
+
+# A file is analysed once it has not changed for this long (writers may still be copying it)
+DEBOUNCE_SECONDS = 0.3
+POLL_INTERVAL = 0.5
+MANIFEST_NAME = '.resume_manifest.json'
+# Manifest changes are appended to a journal with this suffix, and the manifest rewritten
+# once the journal has at least this many entries and as many as the manifest has files
+JOURNAL_SUFFIX = '.log'
+MIN_JOURNAL_ENTRIES = 100
+
+# inotify(7) constants
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_Q_OVERFLOW = 0x00004000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+WATCH_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+EVENT_HEADER = struct.Struct('iIII')
+
+def is_resume_file(path: Path) -> bool:
+    """Whether a path names a supported resume file (hidden and temporary files are skipped)."""
+    return path.suffix.lower() in SUPPORTED_EXTENSIONS and not path.name.startswith(('.', '~'))
+
+class InotifyWatcher:
+    """Reports files created, written or moved into a directory, using Linux inotify through libc."""
+
+    def __init__(self, directory: Path):
+        self.directory = directory
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        self.fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        if libc.inotify_add_watch(self.fd, os.fsencode(str(directory)), WATCH_MASK) < 0:
+            error = ctypes.get_errno()
+            os.close(self.fd)
+            raise OSError(error, f"inotify_add_watch failed for {directory}")
+
+    def changes(self, timeout: float) -> Optional[List[Path]]:
+        """Wait up to `timeout` seconds for events; returns the changed paths, or None if events were lost."""
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return []
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+        paths = []
+        offset = 0
+        while offset < len(data):
+            _, mask, _, name_length = EVENT_HEADER.unpack_from(data, offset)
+            offset += EVENT_HEADER.size
+            name = data[offset:offset + name_length].rstrip(b'\0')
+            offset += name_length
+            if mask & IN_Q_OVERFLOW:
+                return None
+            if name:
+                paths.append(self.directory / os.fsdecode(name))
+        return paths
+
+    def close(self):
+        os.close(self.fd)
+
+class PollingWatcher:
+    """Reports files whose size or modification time changed, by listing the directory periodically."""
+
+    def __init__(self, directory: Path, interval: float = POLL_INTERVAL):
+        self.directory = directory
+        self.interval = interval
+        self._seen = self._scan()
+
+    def _scan(self) -> Dict[Path, Tuple[int, int]]:
+        seen = {}
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                try:
+                    if entry.is_file():
+                        stat = entry.stat()
+                        seen[Path(entry.path)] = (stat.st_size, stat.st_mtime_ns)
+                except OSError:
+                    continue
+        return seen
+
+    def changes(self, timeout: float) -> Optional[List[Path]]:
+        time.sleep(min(timeout, self.interval))
+        current = self._scan()
+        changed = [path for path, signature in current.items() if self._seen.get(path) != signature]
+        self._seen = current
+        return changed
+
+    def close(self):
+        pass
+
+def open_watcher(directory: Path, use_inotify: bool = True):
+    """An inotify watcher where available, otherwise a polling one."""
+    if use_inotify:
+        try:
+            return InotifyWatcher(directory)
+        except (OSError, AttributeError) as e:
+            # AttributeError: libc without inotify (not Linux)
+            logger.info(f"inotify unavailable ({str(e)}); polling {directory} every {POLL_INTERVAL}s")
+    return PollingWatcher(directory)
+
+class WatchManifest:
+    """
+    Which content has been analysed: file path -> content hash, and content hash plus analysis
+    settings -> result summary. A file is only queued when its content hash has no result under
+    the current settings yet, so unchanged, renamed or copied files are not analysed again, but
+    all files are once the job, taxonomy or code versions (`settings`) change; results under other
+    settings are dropped when the manifest is opened. Changes are appended to a journal next
+    to the JSON manifest as they happen, and folded into the manifest when it is opened or
+    closed, or once the journal has grown as long as the manifest.
+    """
+
+    def __init__(self, path: Union[str, Path], settings: str = ''):
+        self.path = Path(path)
+        self.settings = hash_bytes(settings.encode('utf-8'))[:16]
+        self.journal_path = self.path.with_name(self.path.name + JOURNAL_SUFFIX)
+        self.files: Dict[str, str] = {}
+        self.results: Dict[str, Dict[str, Any]] = {}
+        self._journal = None
+        self._journal_entries = 0
+        try:
+            with open(self.path, encoding='utf-8') as file:
+                data = json.load(file)
+            self.files = data.get('files', {})
+            self.results = data.get('results', {})
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable manifest {self.path}: {str(e)}")
+        replayed = self._replay_journal()
+        stale = [key for key in self.results if not key.endswith(':' + self.settings)]
+        for key in stale:
+            del self.results[key]
+        if stale:
+            logger.info(f"Dropped {len(stale)} manifest result(s) of other analysis settings")
+        if replayed or stale:
+            self.save()
+
+    def _replay_journal(self) -> int:
+        """Apply the changes journaled since the manifest was last saved; returns how many there were."""
+        replayed = 0
+        try:
+            with open(self.journal_path, encoding='utf-8') as journal:
+                for line in journal:
+                    try:
+                        self._apply(json.loads(line))
+                    except (ValueError, KeyError):
+                        # A line cut short by a crash; it can only be the last one
+                        logger.warning(f"Ignoring a truncated entry in {self.journal_path}")
+                        break
+                    replayed += 1
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logger.warning(f"Ignoring unreadable manifest journal {self.journal_path}: {str(e)}")
+        return replayed
+
+    def _apply(self, entry: Dict[str, Any]):
+        self.files[entry['file']] = entry['digest']
+        if 'result' in entry:
+            self.results[entry['key']] = entry['result']
+
+    def _key(self, digest: str) -> str:
+        return f"{digest}:{self.settings}"
+
+    def result_for(self, digest: str) -> Optional[Dict[str, Any]]:
+        return self.results.get(self._key(digest))
+
+    def record(self, file_path: Path, digest: str, result: Optional[Dict[str, Any]] = None):
+        """Remember the content of a file and, for newly analysed content, its result."""
+        entry = {'file': str(file_path), 'digest': digest}
+        if result is not None:
+            entry['key'] = self._key(digest)
+            entry['result'] = result
+        self._apply(entry)
+        if self._journal is None:
+            self._journal = open(self.journal_path, 'a', encoding='utf-8')
+        self._journal.write(json.dumps(entry, ensure_ascii=False) + '\n')
+        self._journal.flush()
+        self._journal_entries += 1
+        # Saving costs as much as the manifest is long, so doing it once the journal is as long keeps recording linear
+        if self._journal_entries >= max(len(self.files), MIN_JOURNAL_ENTRIES):
+            self.save()
+
+    def save(self):
+        """Write the whole manifest and start a new journal."""
+        # Write-and-rename so a crash never leaves a truncated manifest
+        temporary = self.path.with_name(self.path.name + '.tmp')
+        with open(temporary, 'w', encoding='utf-8') as file:
+            json.dump({'files': self.files, 'results': self.results}, file, indent=2)
+        os.replace(temporary, self.path)
+        # Replaying the journal again after a crash here is harmless, so it goes only after the manifest is in place
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
+        try:
+            os.remove(self.journal_path)
+        except FileNotFoundError:
+            pass
+        self._journal_entries = 0
+
+    def close(self):
+        """Fold the journal into the manifest."""
+        if self._journal is not None:
+            self.save()
+
+def _file_signature(path: Path) -> Optional[Tuple[int, int]]:
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+    return stat.st_size, stat.st_mtime_ns
+
+def watch_folder(directory: Union[str, Path], analyse: Callable[[Path], Dict[str, Any]],
+                 manifest: WatchManifest, debounce: float = DEBOUNCE_SECONDS, use_inotify: bool = True,
+                 should_stop: Optional[Callable[[], bool]] = None, exclude: Iterable[Path] = ()) -> int:
+    """
+    Analyse the resumes in `directory` whose content the manifest has no result for, then keep
+    watching and analyse files as they are added or changed. A file is analysed once it has
+    been unchanged for `debounce` seconds. `analyse(path)` returns the result summary kept in
+    the manifest; only summaries whose 'ok' is true are kept, so failed files are retried later.
+    Files in `exclude` (e.g. reports written into the folder) are ignored. Runs until
+    `should_stop()` returns True (or forever); returns the number of files analysed.
+    """
+    directory = Path(directory)
+    excluded = {Path(path).resolve() for path in exclude}
+    watcher = open_watcher(directory, use_inotify)
+    # path -> (time it becomes ready, size and mtime when it was last seen changing)
+    pending: Dict[Path, Tuple[float, Optional[Tuple[int, int]]]] = {}
+    analysed = 0
+
+    def queue(paths: List[Path]):
+        now = time.monotonic()
+        for path in paths:
+            if is_resume_file(path) and path.resolve() not in excluded:
+                pending[path] = (now + debounce, _file_signature(path))
+
+    # Files that arrived while nobody was watching
+    queue(sorted(path for path in directory.iterdir() if path.is_file()))
+    try:
+        while should_stop is None or not should_stop():
+            timeout = max(0.0, min(deadline for deadline, _ in pending.values()) - time.monotonic()) if pending else POLL_INTERVAL
+            changed = watcher.changes(timeout)
+            if changed is None:
+                logger.warning("Watch events were lost; rescanning the folder")
+                changed = [path for path in directory.iterdir() if path.is_file()]
+            queue(changed)
+
+            now = time.monotonic()
+            for path, (deadline, signature) in sorted(pending.items(), key=lambda item: item[1][0]):
+                if deadline > now:
+                    continue
+                current = _file_signature(path)
+                if current is None:
+                    # Deleted or moved away before it settled
+                    del pending[path]
+                    continue
+                if current != signature:
+                    # Still being written
+                    pending[path] = (now + debounce, current)
+                    continue
+                del pending[path]
+                if _analyse_if_new(path, analyse, manifest):
+                    analysed += 1
+    finally:
+        watcher.close()
+    return analysed
+
+def _analyse_if_new(path: Path, analyse: Callable[[Path], Dict[str, Any]], manifest: WatchManifest) -> bool:
+    try:
+        digest = hash_bytes(path.read_bytes())
+    except OSError as e:
+        logger.warning(f"Could not read {path}: {str(e)}")
+        return False
+    known = manifest.result_for(digest)
+    if known is not None:
+        if manifest.files.get(str(path)) != digest:
+            logger.info(f"{path.name} has the same content as {Path(known['path']).name}; not analysing it again")
+            manifest.record(path, digest)
+        return False
+    result = analyse(path)
+    if not result.get('ok'):
+        # Not recorded, so the file is analysed again when it changes or the watch restarts
+        return True
+    result.setdefault('path', str(path))
+    result.setdefault('analysed_at', time.time())
+    manifest.record(path, digest, result)
+    return True
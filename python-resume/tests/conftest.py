@@ -0,0 +1,72 @@
+"""Shared fixtures: the package on sys.path and random jobs and resumes for the matcher checks."""
+
+import sys
+import random
+from pathlib import Path
+from typing import Dict, Any, List
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'src'))
+
+from resume_analyser.keywords import CIVIL_ENGINEERING_SKILLS, SOFT_SKILLS  # noqa: E402
+from resume_analyser.job_data import get_job_requirements  # noqa: E402
+
+HARD_VOCABULARY = sorted({variation for variations in CIVIL_ENGINEERING_SKILLS.values() for variation in variations}
+                         | set(CIVIL_ENGINEERING_SKILLS))
+SOFT_VOCABULARY = sorted({variation for variations in SOFT_SKILLS.values() for variation in variations} | set(SOFT_SKILLS))
+# Spelling variants, near misses that must not match, and edits that do
+SPELLING_PAIRS = [('modeling', 'Modelling'), ('Tunneling', 'tunnelling'), ('pile', 'Pipe'), ('2D drafting', '3D drafting'),
+                  ('organisation', 'organizaton'), ('AutoCAD', 'AutoCAD 2D')]
+DEGREES = ['Bachelor of Civil Engineering', 'Master of Structural Engineering', 'Diploma of Surveying',
+           'PhD in Environmental Science', 'Bachelor of Arts']
+
+
+def typo(rng: random.Random, term: str) -> str:
+    """Drop, double or swap one character of a term."""
+    if len(term) < 2:
+        return term
+    i = rng.randrange(len(term) - 1)
+    edit = rng.choice(('drop', 'double', 'swap'))
+    if edit == 'drop':
+        return term[:i] + term[i + 1:]
+    if edit == 'double':
+        return term[:i] + term[i] + term[i:]
+    return term[:i] + term[i + 1] + term[i] + term[i + 2:]
+
+
+@pytest.fixture
+def make_job():
+    """Factory of random job requirements in the shape of job_data.get_job_requirements()."""
+    base = get_job_requirements()
+
+    def make(rng: random.Random, title: str = 'Job') -> Dict[str, Any]:
+        hard = rng.sample(HARD_VOCABULARY, rng.randint(0, 8)) + [pair[0] for pair in rng.sample(SPELLING_PAIRS, 2)]
+        soft_keys = rng.sample(base['hard_matches'], rng.randint(0, 6))
+        return {
+            'title': title,
+            'essential': {
+                'degrees': rng.sample(['Bachelor', 'Master', 'PhD', 'Diploma'], rng.randint(0, 2)),
+                'fields_of_study': rng.sample(['Civil Engineering', 'Surveying', 'Structural', 'Environmental'],
+                                              rng.randint(0, 2))
+            },
+            'hard_skills': {'software': hard[:3], 'engineering_disciplines': hard[3:6], 'technical_tasks': hard[6:]},
+            'hard_matches': soft_keys,
+            'soft_matches': {key: base['soft_matches'].get(key, []) for key in soft_keys}
+        }
+    return make
+
+
+@pytest.fixture
+def make_resume():
+    """Factory of random extract_all_information-like outputs, with typos and spelling variants."""
+    def make(rng: random.Random) -> Dict[str, Any]:
+        technical: List[str] = [typo(rng, skill) if rng.random() < 0.3 else skill
+                                for skill in rng.sample(HARD_VOCABULARY, rng.randint(0, 10))]
+        technical += [pair[1] for pair in rng.sample(SPELLING_PAIRS, 2)]
+        return {
+            'technical_skills': technical,
+            'soft_skills': rng.sample(SOFT_VOCABULARY, rng.randint(0, 6)),
+            'degrees': rng.sample(DEGREES, rng.randint(0, 2))
+        }
+    return make
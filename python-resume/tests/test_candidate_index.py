@@ -0,0 +1,51 @@
+"""CandidateIndex.query must return the same top k as scoring every stored resume with calculate_job_match_score."""
+
+import random
+
+import pytest
+
+from resume_analyser.candidate_index import CandidateIndex
+from resume_analyser.scorers import calculate_job_match_score
+
+
+def brute_force_top_k(resumes, job, k):
+    """(resume ID, percentage, feedback) of the k best resumes, ties in insertion order."""
+    scored = [(resume_id, *calculate_job_match_score(resume, job)) for resume_id, resume in resumes.items()]
+    order = sorted(range(len(scored)), key=lambda index: (-scored[index][1], index))
+    return [scored[index] for index in order[:k]]
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_query_matches_the_scorer(seed, make_job, make_resume):
+    rng = random.Random(seed)
+    resumes = {f"resume-{index}": make_resume(rng) for index in range(60)}
+    index = CandidateIndex()
+    index.add_many(resumes.items())
+    for _ in range(10):
+        job = make_job(rng)
+        for k in (1, 3, 10, len(resumes)):
+            expected = brute_force_top_k(resumes, job, k)
+            results = index.query(job, k)
+            # Tied percentages may come from other resumes when the k-th place is shared
+            assert [entry['percentage'] for entry in results] == pytest.approx([entry[1] for entry in expected], abs=1e-9)
+            for entry in results:
+                assert entry['feedback'] == calculate_job_match_score(resumes[entry['resume_id']], job)[1]
+
+
+def test_query_after_replacing_and_removing(make_job, make_resume):
+    rng = random.Random(7)
+    resumes = {f"resume-{index}": make_resume(rng) for index in range(40)}
+    index = CandidateIndex()
+    index.add_many(resumes.items())
+    for resume_id in rng.sample(sorted(resumes), 10):
+        assert index.remove(resume_id)
+        del resumes[resume_id]
+    for resume_id in rng.sample(sorted(resumes), 10):
+        resumes[resume_id] = make_resume(rng)
+        index.add(resume_id, resumes[resume_id])
+    assert len(index) == len(resumes)
+    for _ in range(10):
+        job = make_job(rng)
+        expected = brute_force_top_k(resumes, job, 5)
+        results = index.query(job, 5)
+        assert [entry['percentage'] for entry in results] == pytest.approx([entry[1] for entry in expected], abs=1e-9)
@@ -0,0 +1,51 @@
+"""FuzzySkillIndex must find exactly the names match_confidence accepts, as comparing every pair would."""
+
+import random
+
+import pytest
+
+from resume_analyser.fuzzy_match import FuzzySkillIndex, match_confidence
+from conftest import HARD_VOCABULARY, SOFT_VOCABULARY, SPELLING_PAIRS, typo
+
+NAMES = sorted({name.lower() for name in HARD_VOCABULARY + SOFT_VOCABULARY + [pair[0] for pair in SPELLING_PAIRS]})
+
+
+def brute_force(term, names):
+    matches = {}
+    for name in names:
+        confidence = match_confidence(term, name)
+        if confidence > 0:
+            matches[name] = confidence
+    return matches
+
+
+def random_terms(rng, count):
+    """Indexed names, spelling variants and names with up to two typos."""
+    terms = [pair[1].lower() for pair in SPELLING_PAIRS]
+    for _ in range(count):
+        term = rng.choice(NAMES)
+        for _ in range(rng.randint(0, 2)):
+            term = typo(rng, term)
+        terms.append(term)
+    return terms
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_matches_equal_brute_force(seed):
+    rng = random.Random(seed)
+    index = FuzzySkillIndex(NAMES)
+    for term in random_terms(rng, 200):
+        assert index.matches(term) == pytest.approx(brute_force(term, NAMES)), term
+
+
+def test_matches_after_removing(seed=11):
+    rng = random.Random(seed)
+    index = FuzzySkillIndex(NAMES)
+    removed = set(rng.sample(NAMES, len(NAMES) // 3))
+    for name in removed:
+        assert index.remove(name)
+    assert not index.remove(next(iter(removed)))
+    names = [name for name in NAMES if name not in removed]
+    assert len(index) == len(names)
+    for term in random_terms(rng, 200):
+        assert index.matches(term) == pytest.approx(brute_force(term, names)), term
@@ -0,0 +1,36 @@
+"""JobMatchEngine must rank jobs exactly as calculate_job_match_score scores them one by one."""
+
+import random
+
+import pytest
+
+from resume_analyser.job_matching import JobMatchEngine
+from resume_analyser.scorers import calculate_job_match_score
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_top_k_matches_the_scorer(seed, make_job, make_resume):
+    rng = random.Random(seed)
+    jobs = [make_job(rng, f"Job {index}") for index in range(25)]
+    engine = JobMatchEngine(jobs)
+    for _ in range(20):
+        resume = make_resume(rng)
+        expected = [calculate_job_match_score(resume, job) for job in jobs]
+        ranked = engine.top_k(resume, len(jobs))
+        assert sorted(entry['job_index'] for entry in ranked) == list(range(len(jobs)))
+        for entry in ranked:
+            percentage, feedback = expected[entry['job_index']]
+            assert entry['percentage'] == pytest.approx(percentage, abs=1e-9)
+            assert entry['feedback'] == feedback
+        # Best first, ties in job order
+        order = sorted(range(len(jobs)), key=lambda index: (-expected[index][0], index))
+        assert [entry['job_index'] for entry in ranked] == order
+
+
+def test_top_k_truncates(make_job, make_resume):
+    rng = random.Random(42)
+    jobs = [make_job(rng) for _ in range(10)]
+    engine = JobMatchEngine(jobs)
+    resume = make_resume(rng)
+    assert engine.top_k(resume, 3) == engine.top_k(resume, 10)[:3]
+    assert engine.top_k(resume, 0) == []